@@ -163,7 +163,7 @@ export default function ChatInterface() {
         data.forEach((msg) => {
           // Check if appointment confirmed in the message
           if (msg.text?.includes('APPOINTMENT CONFIRMED')) {
-            const confirmMatch = msg.text.match(/Confirmation: (HC\d+)/)
+            const confirmMatch = msg.text.match(/Confirmation: (HC[0-9A-Z]+)/)
             const dateMatch = msg.text.match(/Date: (.+?)\n/)
             const doctorMatch = msg.text.match(/Doctor: (.+?)\n/)
             const departmentMatch = msg.text.match(/Department: (.+?)\n/)
@@ -186,7 +186,7 @@ export default function ChatInterface() {
 
           // Check if appointment rescheduled
           if (msg.text?.includes('APPOINTMENT RESCHEDULED')) {
-            const confirmMatch = msg.text.match(/Confirmation: (HC\d+)/)
+            const confirmMatch = msg.text.match(/Confirmation: (HC[0-9A-Z]+)/)
             const newTimeMatch = msg.text.match(/New time: (.+?)\n/)
             const doctorMatch = msg.text.match(/Doctor: (.+?)\n/)
 
@@ -205,7 +205,7 @@ export default function ChatInterface() {
 
           // Check if appointment cancelled
           if (msg.text?.includes('APPOINTMENT CANCELLED')) {
-            const idMatch = msg.text.match(/Confirmation: (HC\d+)/)
+            const idMatch = msg.text.match(/Confirmation: (HC[0-9A-Z]+)/)
             if (idMatch) {
               setAppointments(prev => prev.filter(apt => apt.id !== idMatch[1]))
             }
@@ -301,7 +301,7 @@ export default function ChatInterface() {
       // Process responses
       data.forEach((msg) => {
         if (msg.text?.includes('APPOINTMENT CONFIRMED')) {
-          const confirmMatch = msg.text.match(/Confirmation: (HC\d+)/)
+          const confirmMatch = msg.text.match(/Confirmation: (HC[0-9A-Z]+)/)
           const dateMatch = msg.text.match(/Date: (.+?)\n/)
           const doctorMatch = msg.text.match(/Doctor: (.+?)\n/)
 
@@ -320,7 +320,7 @@ export default function ChatInterface() {
         }
 
         if (msg.text?.includes('APPOINTMENT RESCHEDULED')) {
-          const confirmMatch = msg.text.match(/Confirmation: (HC\d+)/)
+          const confirmMatch = msg.text.match(/Confirmation: (HC[0-9A-Z]+)/)
           const newTimeMatch = msg.text.match(/New time: (.+?)\n/)
           const doctorMatch = msg.text.match(/Doctor: (.+?)\n/)
 
@@ -337,7 +337,7 @@ export default function ChatInterface() {
         }
 
         if (msg.text?.includes('APPOINTMENT CANCELLED')) {
-          const idMatch = msg.text.match(/Confirmation: (HC\d+)/)
+          const idMatch = msg.text.match(/Confirmation: (HC[0-9A-Z]+)/)
           if (idMatch) {
             setAppointments(prev => prev.filter(apt => apt.id !== idMatch[1]))
           }
@@ -0,0 +1,347 @@
+"""
+Appointment indexes
+AppointmentIndex holds appointments in memory once, by confirmation ID,
+with secondary indexes by sender, doctor, department and day that are
+updated together on every create, reschedule and cancel. Lookups are dict
+hits; day ranges use a sorted list of days, so no query walks every
+booking. SharedAppointmentIndex keeps each sender's appointments as one
+record in a shared session backend instead, so every worker sees them
+"""
+import bisect
+import datetime
+import json
+import threading
+
+# Dates as the booking flow writes them, besides "Today" and "Tomorrow"
+DATE_FORMATS = ('%A, %B %d, %Y', '%B %d, %Y', '%Y-%m-%d')
+
+
+def appointment_day(date, base=None):
+    """ISO day of an appointment date such as "Tomorrow", or None if unparseable
+
+    Relative dates count from base, the day they were chosen
+    """
+    base = base or datetime.date.today()
+    text = (date or '').strip()
+    if text.lower() == 'today':
+        return base.isoformat()
+    if text.lower() == 'tomorrow':
+        return (base + datetime.timedelta(days=1)).isoformat()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+def created_day(apt):
+    """Day an appointment was booked, from its created_at timestamp"""
+    try:
+        return datetime.datetime.fromisoformat(apt.get('created_at', '')).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def retention_day(apt, booked_on=None):
+    """Later of an appointment's day and the day it was booked, or None if neither is known"""
+    booked_on = booked_on or created_day(apt)
+    days = [day for day in (apt.get('day'), booked_on.isoformat() if booked_on else None) if day]
+    return max(days) if days else None
+
+
+def retention_cutoff(retention_days, today=None):
+    """Appointments whose retention day is before this ISO day are dropped"""
+    return ((today or datetime.date.today()) - datetime.timedelta(days=retention_days)).isoformat()
+
+
+def _add(index, key, apt_id):
+    if key is not None:
+        index.setdefault(key, {})[apt_id] = None  # dict as an insertion-ordered set
+
+
+def _discard(index, key, apt_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.pop(apt_id, None)
+        if not ids:
+            del index[key]
+
+
+class DayIndex:
+    """Appointment IDs by ISO day, with the days kept sorted for range scans"""
+
+    def __init__(self):
+        self.ids = {}
+        self.days = []
+
+    def __len__(self):
+        return len(self.days)
+
+    def add(self, day, apt_id):
+        if day is None:
+            return
+        if day not in self.ids:
+            bisect.insort(self.days, day)
+        _add(self.ids, day, apt_id)
+
+    def discard(self, day, apt_id):
+        if day is None or day not in self.ids:
+            return
+        _discard(self.ids, day, apt_id)
+        if day not in self.ids:
+            del self.days[bisect.bisect_left(self.days, day)]
+
+    def get(self, day):
+        return self.ids.get(day, {})
+
+    def between(self, first_day, last_day):
+        """IDs on days first_day to last_day inclusive, by day"""
+        start = bisect.bisect_left(self.days, first_day)
+        end = bisect.bisect_right(self.days, last_day)
+        return [apt_id for day in self.days[start:end] for apt_id in self.ids[day]]
+
+    def first(self):
+        return self.days[0] if self.days else None
+
+
+class AppointmentIndex:
+    """Live appointments by ID, sender, doctor, department and day
+
+    Appointments whose day, and booking day, are both more than
+    retention_days past are dropped from memory on the next create;
+    upcoming ones are never dropped
+    """
+
+    def __init__(self, retention_days=30):
+        self.retention_days = retention_days
+        self.lock = threading.RLock()
+        self.by_id = {}
+        self.senders = {}  # appointment id -> sender id
+        self.by_sender = {}
+        self.by_doctor = {}
+        self.by_department = {}
+        self.by_day = DayIndex()
+        # Keyed by the later of the appointment's day and its booking day,
+        # so a booking for a past date isn't dropped as soon as it is made
+        self.by_expiry = DayIndex()
+        self.expiry = {}  # appointment id -> its by_expiry day
+        self.pruned = 0
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, apt_id):
+        return apt_id in self.by_id
+
+    def add(self, sender_id, apt):
+        """Index a new appointment; its 'day' is resolved if missing"""
+        if 'day' not in apt:
+            apt['day'] = appointment_day(apt.get('date'), created_day(apt))
+        apt_id = apt['id']
+        with self.lock:
+            if apt_id in self.by_id:
+                self._remove(apt_id)
+            self.by_id[apt_id] = apt
+            self.senders[apt_id] = sender_id
+            _add(self.by_sender, sender_id, apt_id)
+            _add(self.by_doctor, apt.get('doctor'), apt_id)
+            _add(self.by_department, apt.get('department'), apt_id)
+            self.by_day.add(apt['day'], apt_id)
+            self._set_expiry(apt_id, apt['day'], created_day(apt))
+            self.prune()
+
+    def get(self, apt_id, sender_id=None):
+        """Appointment by ID, or None; with sender_id, only if it is that sender's"""
+        with self.lock:
+            apt = self.by_id.get(apt_id)
+            if apt is None or (sender_id is not None and self.senders[apt_id] != sender_id):
+                return None
+            return apt
+
+    def for_sender(self, sender_id):
+        """A sender's appointments, oldest booking first"""
+        with self.lock:
+            return [self.by_id[apt_id] for apt_id in self.by_sender.get(sender_id, ())]
+
+    def for_doctor(self, doctor, day=None):
+        """A doctor's appointments, optionally on one ISO day"""
+        with self.lock:
+            ids = self.by_doctor.get(doctor, {})
+            if day is not None:
+                # Walk the smaller of the two sets
+                on_day = self.by_day.get(day)
+                smaller, larger = (ids, on_day) if len(ids) < len(on_day) else (on_day, ids)
+                ids = [apt_id for apt_id in smaller if apt_id in larger]
+            return [self.by_id[apt_id] for apt_id in ids]
+
+    def for_department(self, department):
+        with self.lock:
+            return [self.by_id[apt_id] for apt_id in self.by_department.get(department, ())]
+
+    def between(self, first_day, last_day):
+        """Appointments on ISO days first_day to last_day inclusive, by day"""
+        with self.lock:
+            return [self.by_id[apt_id] for apt_id in self.by_day.between(first_day, last_day)]
+
+    def restore(self, by_sender):
+        """Index {sender id: appointments} loaded at startup; returns the ones that were new"""
+        added = []
+        with self.lock:
+            for sender_id, apts in by_sender.items():
+                for apt in apts:
+                    if apt['id'] not in self.by_id:
+                        self.add(sender_id, apt)
+                        added.append(apt)
+        return added
+
+    def reschedule(self, apt_id, date, time, day, sender_id=None):
+        """Move an appointment to a new date and time; returns it"""
+        with self.lock:
+            apt = self.by_id[apt_id]
+            self.by_day.discard(apt.get('day'), apt_id)
+            apt.update(date=date, time=time, day=day)
+            self.by_day.add(day, apt_id)
+            self._set_expiry(apt_id, day, datetime.date.today())
+            return apt
+
+    def remove(self, apt_id, sender_id=None):
+        """Drop a cancelled appointment; returns it, or None if unknown"""
+        with self.lock:
+            if self.get(apt_id, sender_id) is None:
+                return None
+            return self._remove(apt_id)
+
+    def prune(self, today=None):
+        """Drop appointments more than retention_days past; returns how many"""
+        cutoff = retention_cutoff(self.retention_days, today)
+        pruned = 0
+        with self.lock:
+            while self.by_expiry.first() is not None and self.by_expiry.first() < cutoff:
+                for apt_id in list(self.by_expiry.get(self.by_expiry.first())):
+                    self._remove(apt_id)
+                    pruned += 1
+            self.pruned += pruned
+        return pruned
+
+    def snapshot_stats(self):
+        with self.lock:
+            return {
+                'size': len(self.by_id), 'senders': len(self.by_sender), 'days': len(self.by_day),
+                'first_day': self.by_day.first(), 'pruned': self.pruned,
+            }
+
+    def _remove(self, apt_id):
+        apt = self.by_id.pop(apt_id)
+        _discard(self.by_sender, self.senders.pop(apt_id), apt_id)
+        _discard(self.by_doctor, apt.get('doctor'), apt_id)
+        _discard(self.by_department, apt.get('department'), apt_id)
+        self.by_day.discard(apt.get('day'), apt_id)
+        self.by_expiry.discard(self.expiry.pop(apt_id, None), apt_id)
+        return apt
+
+    def _set_expiry(self, apt_id, day, booked_on):
+        """File an appointment under the later of its day and the day it was (re)booked"""
+        expiry = retention_day({'day': day}, booked_on)
+        if expiry is None:
+            return  # no known day: kept until cancelled
+        self.by_expiry.discard(self.expiry.get(apt_id), apt_id)
+        self.expiry[apt_id] = expiry
+        self.by_expiry.add(expiry, apt_id)
+
+
+class SharedAppointmentIndex:
+    """Each sender's appointments as one record in a shared session backend
+
+    A sender's record is read when a turn needs it and written back when
+    the turn books, moves or cancels, so any worker can take the sender's
+    next turn. Records are only changed during their sender's turn, which
+    runs one at a time, so the read-modify-write needs no lock of its own.
+    Cancelling the last appointment leaves an empty record, so a worker
+    starting later doesn't restore it from an older copy
+    """
+
+    def __init__(self, store, retention_days=30):
+        self.store = store  # a backend with get/put/add_appointments
+        self.retention_days = retention_days
+        self.stats = {'reads': 0, 'writes': 0, 'restored': 0, 'pruned': 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, counter, amount=1):
+        with self.stats_lock:
+            self.stats[counter] += amount
+
+    def _load(self, sender_id):
+        self.count('reads')
+        data = self.store.get_appointments(sender_id)
+        return json.loads(data) if data else []
+
+    def _save(self, sender_id, apts):
+        self.count('writes')
+        self.store.put_appointments(sender_id, encode_appointments(apts))
+
+    def add(self, sender_id, apt):
+        """Record a new appointment; its 'day' is resolved if missing"""
+        if 'day' not in apt:
+            apt['day'] = appointment_day(apt.get('date'), created_day(apt))
+        cutoff = retention_cutoff(self.retention_days)
+        apts = []
+        for other in self._load(sender_id):
+            if other['id'] == apt['id']:
+                continue
+            expiry = retention_day(other)
+            if expiry is not None and expiry < cutoff:
+                self.count('pruned')
+                continue
+            apts.append(other)
+        apts.append(apt)
+        self._save(sender_id, apts)
+
+    def get(self, apt_id, sender_id):
+        """One of a sender's appointments by ID, or None"""
+        return next((apt for apt in self._load(sender_id) if apt['id'] == apt_id), None)
+
+    def for_sender(self, sender_id):
+        """A sender's appointments, oldest booking first"""
+        return self._load(sender_id)
+
+    def reschedule(self, apt_id, date, time, day, sender_id):
+        """Move one of a sender's appointments to a new date and time; returns it"""
+        apts = self._load(sender_id)
+        apt = next(apt for apt in apts if apt['id'] == apt_id)
+        apt.update(date=date, time=time, day=day)
+        self._save(sender_id, apts)
+        return apt
+
+    def remove(self, apt_id, sender_id):
+        """Drop one of a sender's appointments; returns it, or None if unknown"""
+        apts = self._load(sender_id)
+        kept = [apt for apt in apts if apt['id'] != apt_id]
+        if len(kept) == len(apts):
+            return None
+        self._save(sender_id, kept)
+        return next(apt for apt in apts if apt['id'] == apt_id)
+
+    def restore(self, by_sender):
+        """Store {sender id: appointments} loaded at startup for senders with no record yet
+
+        A sender with a record keeps it: it was written by a turn, so it is
+        newer than this worker's log or Firebase. Returns the appointments stored
+        """
+        items = list(by_sender.items())
+        for _, apts in items:
+            for apt in apts:
+                if 'day' not in apt:
+                    apt['day'] = appointment_day(apt.get('date'), created_day(apt))
+        stored = self.store.add_appointments([(sender_id, encode_appointments(apts)) for sender_id, apts in items])
+        added = [apt for (_, apts), new in zip(items, stored) if new for apt in apts]
+        self.count('restored', len(added))
+        return added
+
+    def snapshot_stats(self):
+        with self.stats_lock:
+            return dict(self.stats, shared=True)
+
+
+def encode_appointments(apts):
+    return json.dumps(apts, separators=(',', ':'))
@@ -0,0 +1,62 @@
+"""
+Bulk load of /appointments from Firebase at startup
+One shallow read lists every key; the keys are cut into pages and each
+page is fetched with orderBy="$key"/startAt/limitToFirst, several pages
+at a time, so a large database loads in a few round trips instead of one
+huge response
+"""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_client import key_order
+from firebase_outbox import APPOINTMENTS_PATH
+
+
+class LoadProgress:
+    """Pages and appointments loaded so far, readable while the load runs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = 0
+        self.pages = 0
+        self.pages_done = 0
+        self.loaded = 0
+
+    def page_done(self, count):
+        with self.lock:
+            self.pages_done += 1
+            self.loaded += count
+
+    def snapshot(self):
+        with self.lock:
+            return {'keys': self.keys, 'pages': self.pages, 'pages_done': self.pages_done, 'loaded': self.loaded}
+
+
+def page_starts(keys, page_size):
+    """First key of each page, in key order"""
+    return sorted(keys, key=key_order)[::page_size]
+
+
+def load_appointments(client, page_size=500, workers=8, progress=None):
+    """Every appointment in Firebase, as {id: appointment}"""
+    progress = progress or LoadProgress()
+    keys = client.get(APPOINTMENTS_PATH, {'shallow': 'true'}) or {}
+    starts = page_starts(keys, page_size)
+    progress.keys = len(keys)
+    progress.pages = len(starts)
+
+    def fetch(start):
+        page = client.get(APPOINTMENTS_PATH, {
+            'orderBy': json.dumps('$key'),
+            'startAt': json.dumps(start),
+            'limitToFirst': page_size,
+        }) or {}
+        progress.page_done(len(page))
+        return page
+
+    appointments = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='appointment-load') as executor:
+        for page in executor.map(fetch, starts):
+            appointments.update(page)
+    return appointments
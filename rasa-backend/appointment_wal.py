@@ -0,0 +1,295 @@
+"""
+Write-ahead log for appointment mutations
+A booking, reschedule or cancellation is appended and fsynced before the
+patient is told it happened. Writers that arrive while an fsync is running
+are committed together by the next one, so a burst of bookings shares a
+handful of syncs. Once the outbox gets a write into Firebase a 'sent'
+marker is logged, and on startup the log is replayed to rebuild
+appointments and to queue again whatever never reached Firebase. A
+segment left by a worker that is gone, such as after scaling down, is
+merged into the segment of the worker that starts next
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+import structured_log
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per WAL directory
+    fcntl = None
+
+# Mutations, and the marker saying Firebase has everything up to a seq
+MUTATIONS = ('create', 'reschedule', 'cancel')
+SENT = 'sent'
+
+log = structured_log.get_logger('wal')
+
+
+def encode_record(record):
+    return json.dumps(record, separators=(',', ':')).encode() + b'\n'
+
+
+def apply_record(entry, record):
+    """Fold one mutation into an appointment's replay entry"""
+    op = record['op']
+    if record['seq'] <= entry['seq']:
+        return  # written again after a failed sync
+    if op == 'create':
+        entry['sender'] = record['sender']
+        entry['data'] = dict(record['data'])
+    elif entry.get('data') is None:
+        return  # mutation of an appointment this segment never created
+    elif op == 'reschedule':
+        entry['data'].update(record['data'])
+    elif op == 'cancel':
+        entry['data']['status'] = 'cancelled'
+    entry['seq'] = record['seq']
+
+
+def lock_segment(directory, index):
+    """Lock segment index if no other live process holds it; the lock file or None"""
+    lock_file = open(os.path.join(directory, f"wal-{index}.lock"), 'w')
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+
+def claim_segment(directory):
+    """Lock the first segment no other live process holds: (index, lock file)
+
+    Each worker appends to its own segment, so workers never interleave writes
+    """
+    index = 0
+    while True:
+        lock_file = lock_segment(directory, index)
+        if lock_file is not None:
+            return index, lock_file
+        index += 1
+
+
+def segment_indexes(directory):
+    """Indexes of the wal-<n>.log segments in directory"""
+    indexes = []
+    for name in os.listdir(directory):
+        number = name[len('wal-'):-len('.log')]
+        if name.startswith('wal-') and name.endswith('.log') and number.isdigit():
+            indexes.append(int(number))
+    return sorted(indexes)
+
+
+def read_segment(path):
+    """Replay a segment's entries by appointment id: (entries, next seq)
+
+    A torn last line from a crash mid-write is dropped
+    """
+    entries = {}
+    next_seq = 1
+    if not os.path.exists(path):
+        return entries, next_seq
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                log.warning('wal_torn_record', path=path)
+                break
+            next_seq = max(next_seq, record['seq'] + 1)
+            entry = entries.setdefault(record['id'], {'sender': None, 'data': None, 'seq': 0, 'sent': 0})
+            if record['op'] == SENT:
+                entry['sent'] = max(entry['sent'], record['seq'])
+            elif record['op'] in MUTATIONS:
+                apply_record(entry, record)
+    return {key: entry for key, entry in entries.items() if entry['data'] is not None}, next_seq
+
+
+def fsync_directory(directory):
+    """Make a rename in directory durable"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AppointmentWAL:
+    """Append-only, group-committed log of one worker's appointment mutations"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.index, self.lock_file = claim_segment(directory)
+        self.path = os.path.join(directory, f"wal-{self.index}.log")
+
+        self.cond = threading.Condition()
+        self.buffer = []  # encoded records not yet written
+        self.next_seq = 1
+        self.durable_seq = 0  # every record up to here is on disk
+        self.syncing = False
+        self.stats = {'appends': 0, 'markers': 0, 'syncs': 0, 'sync_ms_total': 0.0, 'sync_ms_max': 0.0,
+                      'adopted': 0}
+
+        self.orphans = []  # (path, lock file) of segments whose worker is gone
+        self.entries = self._read()
+        self._compact()
+        self._release_orphans()
+        self.file = open(self.path, 'ab')
+        atexit.register(self.close)
+
+    def append(self, op, appointment_id, sender_id=None, data=None):
+        """Log a mutation and return its seq once it is on disk"""
+        with self.cond:
+            seq = self.next_seq
+            self.next_seq += 1
+            record = {'seq': seq, 'op': op, 'id': appointment_id}
+            if sender_id is not None:
+                record['sender'] = sender_id
+            if data is not None:
+                record['data'] = data
+            self.buffer.append(encode_record(record))
+            self.stats['appends'] += 1
+            # Whoever finds no sync running writes everything buffered so far,
+            # including records of writers that queued behind it
+            while self.durable_seq < seq:
+                if self.syncing:
+                    self.cond.wait()
+                else:
+                    self._sync()
+        return seq
+
+    def mark_sent(self, flushed):
+        """Log that Firebase has every write of each (appointment id, seq) pair
+
+        Not waited on: a lost marker only means the write is sent again
+        """
+        with self.cond:
+            for appointment_id, seq in flushed:
+                self.buffer.append(encode_record({'seq': seq, 'op': SENT, 'id': appointment_id}))
+            self.stats['markers'] += len(flushed)
+
+    def _sync(self):
+        """Write and fsync the buffer; called with the condition held"""
+        records, self.buffer = self.buffer, []
+        last_seq = self.next_seq - 1
+        self.syncing = True
+        self.cond.release()
+        started = time.perf_counter()
+        try:
+            self.file.write(b''.join(records))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except BaseException:
+            self.cond.acquire()
+            self.syncing = False
+            # Keep them for the next sync; replay tolerates a record written twice
+            self.buffer[:0] = records
+            self.cond.notify_all()
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.cond.acquire()
+        self.syncing = False
+        self.durable_seq = max(self.durable_seq, last_seq)
+        self.stats['syncs'] += 1
+        self.stats['sync_ms_total'] += elapsed_ms
+        self.stats['sync_ms_max'] = max(self.stats['sync_ms_max'], elapsed_ms)
+        self.cond.notify_all()
+
+    def _read(self):
+        """Replay this worker's segment, then adopt the segments of workers that are gone"""
+        entries, self.next_seq = read_segment(self.path)
+        for index in segment_indexes(self.directory):
+            if index == self.index:
+                continue
+            lock_file = lock_segment(self.directory, index)
+            if lock_file is None:
+                continue  # a live worker's segment
+            path = os.path.join(self.directory, f"wal-{index}.log")
+            orphaned, _ = read_segment(path)
+            # Seqs are per segment, so adopted entries are renumbered into this one
+            for appointment_id, entry in orphaned.items():
+                if appointment_id in entries:
+                    continue
+                sent = entry['sent'] >= entry['seq']
+                entry['seq'] = self.next_seq
+                entry['sent'] = self.next_seq if sent else 0
+                self.next_seq += 1
+                entries[appointment_id] = entry
+            self.stats['adopted'] += len(orphaned)
+            self.orphans.append((path, lock_file))
+            log.info('wal_segment_adopted', path=path, appointments=len(orphaned))
+        self.durable_seq = self.next_seq - 1
+        return entries
+
+    def _release_orphans(self):
+        """Remove adopted segments once their entries are compacted into this one"""
+        for path, lock_file in self.orphans:
+            os.remove(path)
+            lock_file.close()
+        if self.orphans:
+            fsync_directory(self.directory)
+        self.orphans = []
+
+    def _compact(self):
+        """Rewrite the segment as one record per appointment still worth keeping
+
+        Cancellations Firebase already has are dropped, so the log only grows
+        with the bookings made since the last start
+        """
+        records = []
+        for appointment_id, entry in self.entries.items():
+            if entry['data'].get('status') == 'cancelled' and entry['sent'] >= entry['seq']:
+                continue
+            records.append(encode_record({
+                'seq': entry['seq'], 'op': 'create', 'id': appointment_id,
+                'sender': entry['sender'], 'data': entry['data'],
+            }))
+            if entry['sent'] >= entry['seq']:
+                records.append(encode_record({'seq': entry['seq'], 'op': SENT, 'id': appointment_id}))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        fsync_directory(self.directory)
+
+    def replay(self):
+        """(sender id, appointment, unsent seq or None) for each logged appointment, oldest first"""
+        entries = sorted(self.entries.values(), key=lambda entry: entry['data'].get('created_at', ''))
+        self.entries = {}
+        return [
+            (entry['sender'], entry['data'], entry['seq'] if entry['sent'] < entry['seq'] else None)
+            for entry in entries
+        ]
+
+    def snapshot_stats(self):
+        """Appends, syncs and how many appends each sync covered"""
+        with self.cond:
+            stats = dict(self.stats)
+            stats['pending'] = len(self.buffer)
+        stats['appends_per_sync'] = stats['appends'] / stats['syncs'] if stats['syncs'] else 0.0
+        stats['sync_ms_avg'] = stats['sync_ms_total'] / stats['syncs'] if stats['syncs'] else 0.0
+        stats['segment'] = self.path
+        return stats
+
+    def close(self):
+        """Write out buffered markers and release the segment"""
+        with self.cond:
+            if self.file.closed:
+                return
+            while self.syncing:
+                self.cond.wait()
+            if self.buffer:
+                self._sync()
+            self.file.close()
+        self.lock_file.close()
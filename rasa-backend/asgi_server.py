@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the healthcare triage bot
+Serves the same routes as rasa_server.py with async handlers; booking
+writes go to the Firebase outbox, so a reply never waits on Firebase and
+one process can hold many in-flight chats. Turns block on the appointment
+log's fsync, the session backend and the NLU model, so they run on a pool
+of TURN_WORKERS threads and a slow turn never stalls the event loop. Run with:
+    uvicorn asgi_server:app --host 0.0.0.0 --port 5005
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from profiler import profile_response
+from rasa_server import NOT_READY, SERVER_INFO, TEMPLATES, HealthcareBot, batch_entries, group_by_sender, metrics_text
+from response_cache import ResponseCache, encode_json
+import structured_log
+
+bot = HealthcareBot()
+response_cache = ResponseCache(list(TEMPLATES.values()) + bot.dialogue_engine.templates())
+bot.start_warm_up()
+
+# Threads running turns; more of them lets more turns wait on I/O at once
+TURN_WORKERS = int(os.environ.get("TURN_WORKERS", 32))
+turn_pool = ThreadPoolExecutor(TURN_WORKERS, thread_name_prefix='turn')
+
+# Webhook events are sampled by sender
+request_log = structured_log.get_logger('webhook', sample=True)
+
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+    (b'access-control-allow-headers', b'Content-Type'),
+]
+
+
+class BadRequest(Exception):
+    """Request body the route cannot use; answered with 400"""
+
+
+class NotReady(Exception):
+    """Appointments are still loading; answered with 503"""
+
+
+def run_turns(sender_id, messages):
+    """One sender's replies, on a turn thread; its stage timings are flushed there"""
+    try:
+        return bot.process_messages(sender_id, messages)
+    finally:
+        bot.metrics.flush()
+
+
+async def webhook(data):
+    """Main webhook endpoint compatible with Rasa REST channel"""
+    if not bot.ready.is_set():
+        raise NotReady()
+    if not isinstance(data, dict):
+        raise BadRequest("Expected a {sender, message} object")
+    started = time.perf_counter()
+    sender_id = data.get('sender', 'default')
+    message = data.get('message', '')
+
+    loop = asyncio.get_running_loop()
+    responses = await loop.run_in_executor(turn_pool, run_turns, sender_id, [message])
+
+    processed = time.perf_counter()
+    body = response_cache.encode(responses)
+    finished = time.perf_counter()
+    bot.metrics.observe('encode', finished - processed)
+    bot.metrics.observe('request', finished - started)
+    bot.metrics.flush()
+    request_log.info('webhook', sample_key=sender_id, sender=sender_id, message=message,
+                     responses=len(responses), ms=round((finished - started) * 1000, 3))
+    return body
+
+
+async def webhook_batch(data):
+    """Batch webhook: many {sender, message} pairs in one request, replies keyed by sender"""
+    if not bot.ready.is_set():
+        raise NotReady()
+    try:
+        entries = batch_entries(data)
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+    started = time.perf_counter()
+    # Senders run in parallel, each sender's messages in order
+    messages_by_sender = group_by_sender(entries)
+    loop = asyncio.get_running_loop()
+    replies = await asyncio.gather(*(
+        loop.run_in_executor(turn_pool, run_turns, sender_id, messages)
+        for sender_id, messages in messages_by_sender.items()
+    ))
+    responses_by_sender = dict(zip(messages_by_sender, replies))
+    processed = time.perf_counter()
+    body = response_cache.encode_batch(responses_by_sender)
+    finished = time.perf_counter()
+    bot.metrics.observe('encode_batch', finished - processed)
+    bot.metrics.observe('batch_request', finished - started)
+    bot.metrics.flush()
+    request_log.info('webhook_batch', messages=len(entries), senders=len(responses_by_sender),
+                     ms=round((finished - started) * 1000, 3))
+    return body
+
+
+async def health(data):
+    """Health check endpoint: 503 until existing appointments are loaded"""
+    status, code = bot.health()
+    if code != 200:
+        raise NotReady(status)
+    return encode_json(status)
+
+
+async def session_stats(data):
+    """Session store sizes, hits, expiries and evictions"""
+    return encode_json(bot.session_stats())
+
+
+async def cache_stats(data):
+    """Response cache hits and misses"""
+    return encode_json(response_cache.snapshot_stats())
+
+
+async def outbox_stats(data):
+    """Firebase write queue depth and flush latency"""
+    return encode_json(bot.firebase.snapshot_stats())
+
+
+async def wal_stats(data):
+    """Appointment log appends and group-commit syncs"""
+    return encode_json(bot.wal.snapshot_stats())
+
+
+async def metrics(data):
+    """Stage latency histograms, handler counts and stats in Prometheus format"""
+    return metrics_text(bot, response_cache)
+
+
+async def index(data):
+    """Root endpoint"""
+    return encode_json(SERVER_INFO)
+
+
+ROUTES = {
+    ('POST', '/webhooks/rest/webhook'): webhook,
+    ('POST', '/webhooks/rest/webhook/batch'): webhook_batch,
+    ('GET', '/health'): health,
+    ('GET', '/stats/sessions'): session_stats,
+    ('GET', '/stats/cache'): cache_stats,
+    ('GET', '/stats/outbox'): outbox_stats,
+    ('GET', '/stats/wal'): wal_stats,
+    ('GET', '/metrics'): metrics,
+    ('GET', '/'): index,
+}
+
+# Routes answering something other than JSON
+CONTENT_TYPES = {
+    '/metrics': METRICS_CONTENT_TYPE.encode(),
+}
+
+
+async def admin_profile(scope, send):
+    """Sampled stacks, pstats and allocations over a window; needs ADMIN_TOKEN
+
+    The window runs on a worker thread so the event loop keeps serving,
+    and is sampled, while it lasts
+    """
+    headers = dict(scope['headers'])
+    authorization = headers.get(b'authorization', b'').decode('latin-1')
+    params = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+    loop = asyncio.get_running_loop()
+    status, content_type, body = await loop.run_in_executor(None, profile_response, bot.profiler, authorization, params)
+    await send_json(send, status, body, content_type.encode())
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, status, body, content_type=b'application/json'):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode()),
+        ] + CORS_HEADERS,
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # Send whatever is still queued, then log what was sent
+            turn_pool.shutdown()
+            bot.firebase.close()
+            bot.wal.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    method = scope['method']
+    if method == 'OPTIONS':
+        await send_json(send, 204, b'')
+        return
+
+    if (method, scope['path']) == ('POST', '/admin/profile'):
+        await admin_profile(scope, send)
+        return
+
+    route = ROUTES.get((method, scope['path']))
+    if route is None:
+        await send_json(send, 404, encode_json({"error": "Not found"}))
+        return
+
+    data = None
+    if method == 'POST':
+        try:
+            data = json.loads(await read_body(receive))
+        except ValueError:
+            await send_json(send, 400, encode_json({"error": "Request body must be JSON"}))
+            return
+
+    try:
+        body = await route(data)
+    except BadRequest as e:
+        await send_json(send, 400, encode_json({"error": str(e)}))
+        return
+    except NotReady as e:
+        await send_json(send, 503, encode_json(e.args[0] if e.args else NOT_READY))
+        return
+    await send_json(send, 200, body, CONTENT_TYPES.get(scope['path'], b'application/json'))
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Webhook load test and latency benchmark
+Drives /webhooks/rest/webhook with multi-turn conversations: symptom
+triage, the booking flow through name, surname, phone and department,
+cancellation and rescheduling. Runs in-process through the Flask test
+client, with Firebase replaced by the local stand-in, or against a
+running server over real sockets. Reports throughput and p50/p95/p99
+latency per scenario and writes the results as JSON. Run with:
+    python benchmark.py --conversations 200 --concurrency 8
+    python benchmark.py --url http://127.0.0.1:5005 --concurrency 32
+    python benchmark.py --compare results/bench-previous.json
+    python benchmark.py --corpus corpus/conversations-0.jsonl.gz
+A corpus from corpus_generator.py is replayed as one mixed run, so each
+scenario's rate there is its share of the mix; "all" totals the run.
+"""
+import argparse
+import datetime
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WEBHOOK_PATH = '/webhooks/rest/webhook'
+CONFIRMATION = re.compile(r'Confirmation: (HC[0-9A-Z]+)')
+
+FIRST_NAMES = ['Ann', 'Ben', 'Chloe', 'David', 'Ella', 'Farid', 'Grace', 'Hugo']
+SURNAMES = ['Lee', 'Patel', 'Okafor', 'Smith', 'Nowak', 'Garcia', 'Khan', 'Murphy']
+DEPARTMENTS = ['Cardiology', 'Neurology', 'General Medicine', 'Orthopedics', 'Pediatrics']
+
+
+def booking_turns(rng):
+    """The booking flow for a random calendar slot, so bookings rarely clash"""
+    day = datetime.date.today() + datetime.timedelta(days=rng.randint(2, 365))
+    slot = f"{rng.randint(8, 17):02d}:{rng.choice(['00', '15', '30', '45'])}"
+    return [
+        f"book appointment for {day.strftime('%A, %B %d, %Y')} at {slot}",
+        rng.choice(FIRST_NAMES),
+        rng.choice(SURNAMES),
+        f"07{rng.randint(100000000, 999999999)}",
+        f"/select_{rng.choice(DEPARTMENTS)}",
+    ]
+
+
+def triage(rng):
+    return [
+        "hello",
+        rng.choice(["I have a headache", "I have a fever", "my stomach hurts", "I have a bad cough"]),
+        rng.choice(["/mild_symptoms", "/moderate_symptoms", "/mild_headache"]),
+        "I feel tired and dizzy",
+        "/self_care",
+    ]
+
+
+def booking(rng):
+    return booking_turns(rng) + ["/view_appointments"]
+
+
+def cancellation(rng):
+    return booking_turns(rng) + ["/cancel_apt_{confirmation}"]
+
+
+def rescheduling(rng):
+    return booking_turns(rng) + [
+        "/reschedule_apt_{confirmation}",
+        rng.choice(["/reschedule_today_430pm", "/reschedule_tomorrow_9am", "/reschedule_tomorrow_2pm"]),
+    ]
+
+
+SCENARIOS = {
+    'triage': triage,
+    'booking': booking,
+    'cancel': cancellation,
+    'reschedule': rescheduling,
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class InProcessClient:
+    """Posts through the Flask test client; one per thread"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, body):
+        response = self.client.post(WEBHOOK_PATH, data=body, content_type='application/json')
+        return response.status_code, response.get_data()
+
+
+class SocketClient:
+    """Posts over one keep-alive HTTP connection; one per thread"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+    def post(self, body):
+        try:
+            self.connection.request('POST', WEBHOOK_PATH, body, {'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()  # reconnects on the next request
+            return 0, b''
+
+
+def run_conversation(client, sender_id, turns, latencies):
+    """Send one conversation's turns in order; returns the number of failed turns"""
+    errors = 0
+    confirmation = ''
+    for turn in turns:
+        message = turn.format(confirmation=confirmation)
+        body = json.dumps({'sender': sender_id, 'message': message}).encode()
+        started = time.perf_counter()
+        status, reply = client.post(body)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if status != 200:
+            errors += 1
+            continue
+        match = CONFIRMATION.search(reply.decode('utf-8', 'replace'))
+        if match:
+            confirmation = match.group(1)
+    return errors
+
+
+def scripted(name, conversations, seed, run_id):
+    """(scenario, sender id, turns) of each of a scenario's generated conversations"""
+    script = SCENARIOS[name]
+    rng = random.Random()
+    for index in range(conversations):
+        rng.seed(f"{seed}-{name}-{index}")
+        yield name, f"bench-{run_id}-{name}-{index}", script(rng)
+
+
+def from_corpus(path, conversations, run_id):
+    """(scenario, sender id, turns) of the first conversations of a corpus file"""
+    from corpus_generator import read_corpus
+
+    for conversation in itertools.islice(read_corpus(path), conversations):
+        yield conversation['scenario'], f"bench-{run_id}-{conversation['sender']}", conversation['turns']
+
+
+def run_conversations(conversations, make_client, concurrency):
+    """Run (scenario, sender id, turns) conversations from concurrency threads
+
+    Returns ({scenario: (latencies, errors, conversations)}, elapsed seconds)
+    """
+    source = iter(conversations)
+    source_lock = threading.Lock()
+    totals = {}
+    results_lock = threading.Lock()
+
+    def worker():
+        client = make_client()
+        own = {}
+        while True:
+            with source_lock:
+                conversation = next(source, None)
+            if conversation is None:
+                break
+            scenario, sender_id, turns = conversation
+            latencies, counts = own.setdefault(scenario, ([], [0, 0]))
+            counts[0] += run_conversation(client, sender_id, turns, latencies)
+            counts[1] += 1
+        with results_lock:
+            for scenario, (latencies, (errors, count)) in own.items():
+                total = totals.setdefault(scenario, [[], 0, 0])
+                total[0].extend(latencies)
+                total[1] += errors
+                total[2] += count
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {scenario: tuple(total) for scenario, total in totals.items()}, time.perf_counter() - started
+
+
+def summarize(latencies, errors, conversations, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'conversations': conversations,
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'conversations_per_second': round(conversations / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
+def in_process_app(firebase_latency_ms):
+    """Flask app with Firebase replaced by an in-process stand-in and a throwaway log"""
+    from firebase_standin import Faults, FirebaseStandIn
+
+    standin = FirebaseStandIn(('127.0.0.1', 0), faults=Faults(latency_ms=firebase_latency_ms)).start()
+    os.environ['FIREBASE_URL'] = standin.url
+    os.environ.setdefault('APPOINTMENT_WAL_DIR', tempfile.mkdtemp(prefix='bench-wal-'))
+    sys.path.insert(0, BASE_DIR)
+    import rasa_server
+
+    app = rasa_server.create_app()
+    rasa_server.bot.ready.wait()
+    return app
+
+
+def wait_until_healthy(url, timeout=60):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=5)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"{url} did not become healthy within {timeout}s")
+
+
+def compare(results, baseline_path):
+    """Print each scenario's change against an earlier results file"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['scenarios']
+    print(f"\nAgainst {baseline_path}:")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        changes = [
+            f"{key} {before['latency_ms'][key]:.2f} -> {result['latency_ms'][key]:.2f} ms"
+            for key in ('p50', 'p95', 'p99')
+        ]
+        rate = f"{before['requests_per_second']:.0f} -> {result['requests_per_second']:.0f} req/s"
+        print(f"  {name:<11} {rate}, " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help="benchmark a running server over sockets instead of in-process")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="comma-separated, from: " + ', '.join(SCENARIOS))
+    parser.add_argument('--conversations', type=int, help="conversations per scenario (default 200), or from the corpus (default all)")
+    parser.add_argument('--concurrency', type=int, default=8, help="conversations in flight at once")
+    parser.add_argument('--seed', default='0', help="seed for the generated conversations")
+    parser.add_argument('--firebase-latency-ms', type=float, default=20.0, help="stand-in latency for in-process runs")
+    parser.add_argument('--output', help="results file, default results/bench-<time>.json")
+    parser.add_argument('--corpus', help="replay a corpus_generator.py file instead of the built-in scenarios")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.url:
+        wait_until_healthy(args.url)
+        make_client = lambda: SocketClient(args.url)
+        mode = 'sockets'
+    else:
+        app = in_process_app(args.firebase_latency_ms)
+        make_client = lambda: InProcessClient(app)
+        mode = 'in-process'
+
+    run_id = f"{int(time.time())}-{os.getpid()}"
+    results = {}
+    if args.corpus:
+        print(f"[OK] {mode} benchmark: {args.corpus}, concurrency {args.concurrency}")
+        totals, elapsed = run_conversations(from_corpus(args.corpus, args.conversations, run_id), make_client, args.concurrency)
+        for name in sorted(totals):
+            results[name] = summarize(*totals[name], elapsed)
+        results['all'] = summarize(
+            [latency for latencies, _, _ in totals.values() for latency in latencies],
+            sum(errors for _, errors, _ in totals.values()),
+            sum(count for _, _, count in totals.values()),
+            elapsed,
+        )
+    else:
+        conversations = args.conversations or 200
+        print(f"[OK] {mode} benchmark: {conversations} conversations per scenario, concurrency {args.concurrency}")
+        for name in names:
+            totals, elapsed = run_conversations(scripted(name, conversations, args.seed, run_id), make_client, args.concurrency)
+            results[name] = summarize(*totals.get(name, ([], 0, 0)), elapsed)
+    for name, result in results.items():
+        latency = result['latency_ms']
+        print(f"  {name:<11} {result['requests_per_second']:>8.1f} req/s  p50 {latency['p50']:.2f} ms  "
+              f"p95 {latency['p95']:.2f} ms  p99 {latency['p99']:.2f} ms  errors {result['errors']}")
+
+    output = args.output or os.path.join('results', f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'mode': mode,
+            'url': args.url,
+            'corpus': args.corpus,
+            'conversations': args.conversations,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'scenarios': results,
+        }, f, indent=2)
+    print(f"[OK] Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
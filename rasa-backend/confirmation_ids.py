@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Confirmation number generator
+An ID packs milliseconds since 2025, a node number and a per-millisecond
+sequence into 60 bits, written as 12 Crockford base32 characters after
+"HC" (digits and capitals without I, L, O or U, so it reads out clearly
+over the phone). Nodes never talk to each other or to Firebase: IDs are
+unique as long as every live process has its own node number, so
+NODE_ID must be unique per host. Benchmark with:
+    python confirmation_ids.py
+"""
+import os
+import socket
+import threading
+import time
+import zlib
+
+PREFIX = 'HC'
+EPOCH_MS = 1735689600000  # 2025-01-01T00:00:00Z
+TIME_BITS = 40  # milliseconds, enough until 2059
+NODE_BITS = 10
+SEQUENCE_BITS = 10
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# A node number is a host number in the high bits and a worker number in the low ones
+WORKER_BITS = 4
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_HOST = (1 << (NODE_BITS - WORKER_BITS)) - 1
+
+# Crockford base32: 5 bits per character
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+DIGITS = {char: value for value, char in enumerate(ALPHABET)}
+# The sequence is exactly the last two characters, so they are looked up
+SUFFIXES = [ALPHABET[sequence >> 5] + ALPHABET[sequence & 31] for sequence in range(MAX_SEQUENCE + 1)]
+
+
+def encode(value, length):
+    """length Crockford base32 characters of value, most significant first"""
+    return ''.join(ALPHABET[value >> shift & 31] for shift in range(5 * (length - 1), -1, -5))
+
+
+def decode(text):
+    value = 0
+    for char in text.upper():
+        value = value << 5 | DIGITS[char]
+    return value
+
+
+def default_node(worker=0):
+    """Node number of a worker: the host's NODE_ID, or a hash of the host name,
+    with the worker number in the low bits
+
+    NODE_ID must differ between hosts; on one host the worker number (the
+    appointment log segment the worker claimed) keeps workers apart
+    """
+    if not 0 <= worker <= MAX_WORKER:
+        raise ValueError(f"worker {worker} does not fit in {WORKER_BITS} bits; run at most {MAX_WORKER + 1} workers per host")
+    if os.environ.get('NODE_ID'):
+        host = int(os.environ['NODE_ID'])
+        if not 0 <= host <= MAX_HOST:
+            raise ValueError(f"NODE_ID must be between 0 and {MAX_HOST}")
+    else:
+        host = zlib.crc32(socket.gethostname().encode()) & MAX_HOST
+    return host << WORKER_BITS | worker
+
+
+class ConfirmationIds:
+    """Time + node + sequence ID generator, safe to share between threads"""
+
+    def __init__(self, node=0):
+        if not 0 <= node <= MAX_NODE:
+            raise ValueError(f"node must be between 0 and {MAX_NODE}")
+        self.node = node
+        self.lock = threading.Lock()
+        self.last_ms = 0
+        self.sequence = 0
+        self.head = ''  # prefix, time and node characters for last_ms
+
+    def _reserve(self, count):
+        """(ID head, first sequence) of count consecutive IDs; called with the lock held
+
+        When a millisecond's sequence runs out, or the clock steps back, the
+        next IDs borrow the following millisecond instead of waiting
+        """
+        now_ms = time.time_ns() // 1000000 - EPOCH_MS
+        if now_ms > self.last_ms:
+            self._advance(now_ms)
+        elif self.sequence + count > MAX_SEQUENCE + 1:
+            self._advance(self.last_ms + 1)
+        first = self.sequence
+        self.sequence += count
+        return self.head, first
+
+    def _advance(self, ms):
+        self.last_ms, self.sequence = ms, 0
+        self.head = PREFIX + encode(ms << NODE_BITS | self.node, (TIME_BITS + NODE_BITS) // 5)
+
+    def next_id(self):
+        """A new confirmation number such as HC0Q2W8R1A0K4Z"""
+        with self.lock:
+            head, sequence = self._reserve(1)
+        return head + SUFFIXES[sequence]
+
+    def next_ids(self, count):
+        """count new confirmation numbers, drawing the lock and clock once per millisecond's worth"""
+        ids = []
+        while count:
+            batch = min(count, MAX_SEQUENCE + 1)
+            with self.lock:
+                head, first = self._reserve(batch)
+            ids.extend(head + suffix for suffix in SUFFIXES[first:first + batch])
+            count -= batch
+        return ids
+
+
+def parse(confirmation):
+    """(milliseconds since 2025, node, sequence) of a confirmation number"""
+    body = confirmation[len(PREFIX):]
+    if not confirmation.startswith(PREFIX) or len(body) != (TIME_BITS + NODE_BITS + SEQUENCE_BITS) // 5 \
+            or not all(char in DIGITS for char in body.upper()):
+        raise ValueError(f"Not a confirmation number: {confirmation}")
+    value = decode(body)
+    return (
+        value >> (NODE_BITS + SEQUENCE_BITS),
+        value >> SEQUENCE_BITS & MAX_NODE,
+        value & MAX_SEQUENCE,
+    )
+
+
+def main():
+    """Generate IDs as fast as possible and check none repeat"""
+    generator = ConfirmationIds(default_node())
+    for label, run, count in (
+        ("next_id", lambda n: [generator.next_id() for _ in range(n)], 1000000),
+        ("next_ids", generator.next_ids, 5000000),
+    ):
+        started = time.perf_counter()
+        ids = run(count)
+        elapsed = time.perf_counter() - started
+        assert len(set(ids)) == count, "duplicate IDs"
+        print(f"[OK] {label}: {count} IDs in {elapsed:.2f}s ({count / elapsed / 1e6:.2f}M IDs/s), e.g. {ids[-1]}")
+
+    # Threads sharing one generator, as Flask's request threads do
+    threads, per_thread = 8, 250000
+    results = [None] * threads
+    workers = [threading.Thread(target=lambda i: results.__setitem__(i, [generator.next_id() for _ in range(per_thread)]), args=(i,))
+               for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    total = threads * per_thread
+    assert len({confirmation for ids in results for confirmation in ids}) == total, "duplicate IDs"
+    print(f"[OK] {threads} threads: {total} IDs in {elapsed:.2f}s ({total / elapsed / 1e6:.2f}M IDs/s)")
+
+
+if __name__ == '__main__':
+    main()
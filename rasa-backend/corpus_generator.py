@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Synthetic conversation corpus
+Writes patient conversations as gzipped JSON lines, one conversation per
+line: {"sender", "scenario", "turns"}. Names and phone numbers come from
+Faker, symptom phrasing from the examples in nlu.yml and triage paths
+from stories.yml, so benchmarks and soak tests get production-sized input
+without any real patient data. Turns containing {confirmation} are filled
+in with the confirmation number the server replied with. Run with:
+    python corpus_generator.py --conversations 1000000
+    python benchmark.py --corpus corpus/conversations-0.jsonl.gz
+"""
+import argparse
+import datetime
+import gzip
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import yaml
+from faker import Faker
+
+from nlu_classifier import load_training_data
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORIES_PATH = os.path.join(BASE_DIR, 'stories.yml')
+# Conversations per chunk; each chunk is seeded on its own and written as
+# one gzip member, so the output doesn't depend on the number of workers
+CHUNK_SIZE = 10000
+# Faker is slow per call, so each worker draws this many names and phone
+# numbers once and conversations pick from them
+POOL_SIZE = 5000
+
+# Share of each scenario in the corpus
+SCENARIO_WEIGHTS = {
+    'story': 45,
+    'booking': 25,
+    'cancel': 15,
+    'reschedule': 10,
+    'view': 5,
+}
+
+DEPARTMENTS = ['Cardiology', 'Neurology', 'General Medicine', 'Orthopedics', 'Pediatrics']
+BOOKING_PAYLOADS = ['/book_today_430pm', '/book_tomorrow_9am', '/book_tomorrow_2pm']
+RESCHEDULE_PAYLOADS = ['/reschedule_today_430pm', '/reschedule_tomorrow_9am', '/reschedule_tomorrow_2pm']
+PREFIXES = ['', '', '', '', 'hi, ', 'hello, ', 'um ', 'so ', 'ok ', 'doctor, ']
+SUFFIXES = ['', '', '', '', '.', '!', '?', ' please', ' thanks']
+
+
+def load_phrases():
+    """Example texts by intent, from nlu.yml"""
+    phrases = {}
+    for text, intent in load_training_data():
+        phrases.setdefault(intent, []).append(text)
+    return phrases
+
+
+def load_story_paths(stories_path=STORIES_PATH):
+    """Intent sequence of each story in stories.yml"""
+    with open(stories_path, encoding='utf-8') as f:
+        stories = yaml.safe_load(f).get('stories', [])
+    paths = []
+    for story in stories:
+        intents = [step['intent'] for step in story.get('steps', []) if 'intent' in step]
+        if intents:
+            paths.append(intents)
+    return paths
+
+
+class ConversationFactory:
+    """Random conversations for each scenario, reproducible from a seed"""
+
+    def __init__(self, phrases, story_paths, locale='en_US', seed=0):
+        self.phrases = phrases
+        self.story_paths = story_paths
+        self.rng = random.Random()
+        faker = Faker(locale)
+        faker.seed_instance(seed)
+        self.first_names = [faker.first_name() for _ in range(POOL_SIZE)]
+        self.last_names = [faker.last_name() for _ in range(POOL_SIZE)]
+        self.phones = [faker.phone_number() for _ in range(POOL_SIZE)]
+        self.scenarios = list(SCENARIO_WEIGHTS)
+        self.weights = list(SCENARIO_WEIGHTS.values())
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
+    def say(self, intent):
+        """An example of an intent as a patient might type it"""
+        text = self.rng.choice(self.phrases[intent])
+        style = self.rng.random()
+        if style < 0.5:
+            text = text.lower()
+        elif style < 0.8:
+            text = text[:1].upper() + text[1:]
+        elif style < 0.83:
+            text = text.upper()
+        return self.rng.choice(PREFIXES) + text + self.rng.choice(SUFFIXES)
+
+    def turn(self, intent):
+        """A turn for an intent: usually typed, sometimes a button click"""
+        if self.rng.random() < 0.2 or intent not in self.phrases:
+            return f"/{intent}"
+        return self.say(intent)
+
+    def conversation(self, sender):
+        scenario = self.rng.choices(self.scenarios, self.weights)[0]
+        turns = getattr(self, scenario)()
+        if self.rng.random() < 0.3:
+            turns.append(self.say('goodbye'))
+        return {'sender': sender, 'scenario': scenario, 'turns': turns}
+
+    def story(self):
+        turns = [self.say('greet')] if self.rng.random() < 0.4 else []
+        return turns + [self.turn(intent) for intent in self.rng.choice(self.story_paths)]
+
+    def booking(self):
+        """Name, surname, phone and department for a calendar slot or a suggested one
+
+        Suggested slots are few and fill up quickly, so most bookings pick
+        a calendar slot within the next year
+        """
+        rng = self.rng
+        if rng.random() < 0.9:
+            day = datetime.date.today() + datetime.timedelta(days=rng.randint(1, 365))
+            slot = f"{rng.randint(8, 17):02d}:{rng.choice(['00', '15', '30', '45'])}"
+            turns = [f"book appointment for {day.strftime('%A, %B %d, %Y')} at {slot}"]
+        else:
+            turns = [self.say('schedule_appointment'), rng.choice(BOOKING_PAYLOADS)]
+        department = rng.choice(DEPARTMENTS)
+        turns += [
+            rng.choice(self.first_names),
+            rng.choice(self.last_names),
+            rng.choice(self.phones),
+            f"/select_{department}" if rng.random() < 0.7 else f"{department.lower()}{rng.choice(SUFFIXES)}",
+        ]
+        return turns
+
+    def view(self):
+        return self.booking() + [self.rng.choice(['/view_appointments', 'view my appointments', 'show my appointments'])]
+
+    def cancel(self):
+        turns = self.booking()
+        if self.rng.random() < 0.5:
+            turns.append(self.rng.choice(['cancel my appointment', 'I need to cancel my appointment']))
+        return turns + ['/cancel_apt_{confirmation}']
+
+    def reschedule(self):
+        return self.booking() + ['/reschedule_apt_{confirmation}', self.rng.choice(RESCHEDULE_PAYLOADS)]
+
+
+_factory = None
+
+
+def _init_worker(locale, seed):
+    global _factory
+    _factory = ConversationFactory(load_phrases(), load_story_paths(), locale, seed)
+
+
+def generate_chunk(job):
+    """One gzip member holding conversations start to end"""
+    seed, start, end = job
+    _factory.seed(f"{seed}-{start}")
+    lines = []
+    for index in range(start, end):
+        sender = f"synthetic-{seed}-{index}"
+        lines.append(json.dumps(_factory.conversation(sender), separators=(',', ':')))
+    return end - start, gzip.compress(('\n'.join(lines) + '\n').encode(), compresslevel=6)
+
+
+def read_corpus(path):
+    """Conversations from a corpus file, one at a time"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--conversations', type=int, default=100000, help="conversations to generate")
+    parser.add_argument('--seed', default='0', help="same seed, same corpus")
+    parser.add_argument('--locale', default='en_US', help="Faker locale for names and phone numbers")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="generator processes")
+    parser.add_argument('--output', help="output file, default corpus/conversations-<seed>.jsonl.gz")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join('corpus', f"conversations-{args.seed}.jsonl.gz")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    jobs = [(args.seed, start, min(start + CHUNK_SIZE, args.conversations))
+            for start in range(0, args.conversations, CHUNK_SIZE)]
+
+    started = time.perf_counter()
+    written = 0
+    with open(output, 'wb') as f, Pool(args.workers, _init_worker, (args.locale, args.seed)) as pool:
+        # Chunks come back in order, so the file streams out as they finish
+        for count, member in pool.imap(generate_chunk, jobs):
+            f.write(member)
+            written += count
+            if written % (CHUNK_SIZE * 20) == 0:
+                print(f"  {written} conversations...")
+    elapsed = time.perf_counter() - started
+    size_mb = os.path.getsize(output) / 1e6
+    print(f"[OK] {written} conversations in {elapsed:.1f}s ({written / elapsed:.0f}/s), {size_mb:.1f} MB: {output}")
+
+
+if __name__ == '__main__':
+    main()
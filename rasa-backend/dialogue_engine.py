@@ -0,0 +1,139 @@
+"""
+Declarative dialogue engine compiled from domain.yml and stories.yml
+Stories are merged into a tree of dialogue states once at startup; a turn
+is then one dict lookup on (state, intent), however many stories there are
+"""
+import random
+
+import yaml
+
+from response_templates import ResponseTemplate
+
+ROOT = 0
+
+
+class DialogueEngine:
+    """Transition table and response catalogue built from Rasa-style YAML"""
+
+    def __init__(self, domain_path, stories_path, actions=None):
+        with open(domain_path, encoding='utf-8') as f:
+            domain = yaml.safe_load(f)
+        with open(stories_path, encoding='utf-8') as f:
+            stories = yaml.safe_load(f).get('stories', [])
+
+        self.intents = frozenset(domain.get('intents', []))
+        self.catalogue = self._compile_responses(domain.get('responses', {}))
+        # action name -> callable(message, sender_id) returning responses;
+        # custom actions win over the domain's utter_ responses
+        self.actions = {
+            name: self._utter(variants) for name, variants in self.catalogue.items()
+        }
+        self.actions.update(actions or {})
+
+        self.transitions, self.continuations = self._compile_stories(stories)
+
+    def _compile_responses(self, responses):
+        """utter_ name -> tuple of ResponseTemplate variants"""
+        catalogue = {}
+        for name, variants in responses.items():
+            catalogue[name] = tuple(
+                ResponseTemplate(
+                    variant.get('text', ''),
+                    [(button['title'], button['payload']) for button in variant.get('buttons', [])]
+                )
+                for variant in variants
+            )
+        return catalogue
+
+    def _utter(self, variants):
+        """Action that sends one of a response's variants"""
+        if len(variants) == 1:
+            template = variants[0]
+            return lambda message, sender_id: [template.render(sender_id)]
+        return lambda message, sender_id: [random.choice(variants).render(sender_id)]
+
+    def _compile_stories(self, stories):
+        """Merge stories into a state tree and resolve it into lookup tables"""
+        # state -> {intent: (actions, next state)}, only the story's own edges
+        edges = [{}]
+        for story in stories:
+            state = ROOT
+            for intent, actions in self._turns(story):
+                known = edges[state].get(intent)
+                if known is None:
+                    known = (actions, len(edges))
+                    edges[state][intent] = known
+                    edges.append({})
+                elif known[0] != actions:
+                    raise ValueError(
+                        f"Story '{story.get('story')}' contradicts an earlier story after intent '{intent}'"
+                    )
+                state = known[1]
+
+        # Like fail links in Aho-Corasick: each state also falls back to the
+        # state reached by the longest suffix of its history that a story
+        # covers, so "describe symptoms, chest pain" continues like "chest pain"
+        fail = [ROOT] * len(edges)
+        merged = [None] * len(edges)
+        merged[ROOT] = dict(edges[ROOT])
+        queue = [ROOT]
+        for state in queue:
+            for intent, (actions, child) in edges[state].items():
+                if state != ROOT:
+                    fail[child] = merged[fail[state]].get(intent, ((), ROOT))[1]
+                merged[child] = dict(merged[fail[child]], **edges[child])
+                queue.append(child)
+
+        # Intents that continue a story, as opposed to starting a new one
+        continuations = [
+            frozenset(intent for intent, edge in table.items() if edge is not merged[ROOT].get(intent))
+            if state != ROOT else frozenset()
+            for state, table in enumerate(merged)
+        ]
+
+        # A story's last state has nowhere to go, so the dialogue ends at the root
+        transitions = [
+            {
+                intent: (actions, child if continuations[child] else ROOT)
+                for intent, (actions, child) in table.items()
+            }
+            for table in merged
+        ]
+        return transitions, continuations
+
+    def _turns(self, story):
+        """(intent, actions) pairs of one story"""
+        turns = []
+        for step in story.get('steps', []):
+            if 'intent' in step:
+                if step['intent'] not in self.intents:
+                    raise ValueError(f"Story '{story.get('story')}' uses unknown intent '{step['intent']}'")
+                turns.append((step['intent'], []))
+            elif 'action' in step:
+                if not turns:
+                    raise ValueError(f"Story '{story.get('story')}' starts with an action")
+                if step['action'] not in self.actions:
+                    raise ValueError(f"Story '{story.get('story')}' uses unknown action '{step['action']}'")
+                turns[-1][1].append(step['action'])
+            else:
+                raise ValueError(f"Story '{story.get('story')}' has an unsupported step: {step}")
+        return [(intent, tuple(actions)) for intent, actions in turns]
+
+    def continues(self, state, intent):
+        """Whether the intent is the next step of the story in progress"""
+        return intent in self.continuations[state]
+
+    def turn(self, state, intent, message, sender_id):
+        """Run one turn: (responses, next state), or None if no story handles it"""
+        transition = self.transitions[state].get(intent)
+        if transition is None:
+            return None
+        actions, next_state = transition
+        responses = []
+        for action in actions:
+            responses.extend(self.actions[action](message, sender_id))
+        return responses, next_state
+
+    def templates(self):
+        """Every ResponseTemplate in the catalogue"""
+        return [template for variants in self.catalogue.values() for template in variants]
@@ -0,0 +1,115 @@
+"""
+Firebase Realtime Database REST client
+Blocking; the bot's writes reach it through FirebaseOutbox, which sends
+them from a background thread. Connections are pooled and kept alive, and
+every call has a deadline that covers its retries
+"""
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth another attempt: throttling and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def key_order(key):
+    """Sort key matching orderBy="$key": integer-like keys first, by value, then the rest as strings"""
+    if key.isdigit() and len(key) < 10:
+        return (0, int(key), '')
+    return (1, 0, key)
+
+
+class DeadlineExceeded(requests.Timeout):
+    """A call ran out of time before any attempt succeeded"""
+
+
+class FirebaseClient:
+    """GET, PUT and PATCH on Realtime Database paths over a pooled session"""
+
+    def __init__(self, base_url, timeout=5.0, deadline=15.0, retries=3,
+                 backoff=0.2, max_backoff=2.0, pool_size=16):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout  # per attempt
+        self.deadline = deadline  # per call, retries included
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        # One keep-alive pool for the database host, sized for the outbox's
+        # parallel senders, so a booking spike reuses warm connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0}
+
+    def url(self, path):
+        return f"{self.base_url}/{path.strip('/')}.json"
+
+    def get(self, path, params=None, deadline=None):
+        """Decoded value at path, with query parameters such as shallow or orderBy"""
+        return self.request('GET', path, deadline, params=params).json()
+
+    def put(self, path, data, deadline=None):
+        """Replace the value at path; raises on failure"""
+        return self.request('PUT', path, deadline, json=data)
+
+    def patch(self, path, data, deadline=None):
+        """Update the given children at path; raises on failure"""
+        return self.request('PATCH', path, deadline, json=data)
+
+    def request(self, method, path, deadline=None, **kwargs):
+        """One call, retried with jittered backoff until it succeeds or the deadline passes"""
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        error = None
+        for attempt in range(self.retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            retry_after = 0
+            self._count('requests' if attempt == 0 else 'retries')
+            try:
+                response = self.session.request(method, self.url(path), timeout=min(self.timeout, remaining), **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} from Firebase", response=response)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except requests.HTTPError:
+                self._count('errors')
+                raise
+
+            # Full jitter keeps workers that failed together from retrying together
+            sleep = max(retry_after, random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            if attempt == self.retries or time.monotonic() + sleep >= deadline_at:
+                break
+            time.sleep(sleep)
+
+        self._count('errors')
+        if error is None:
+            error = DeadlineExceeded(f"{method} {path} ran out of its {deadline or self.deadline}s deadline")
+        raise error
+
+    def _count(self, counter):
+        with self.lock:
+            self.stats[counter] += 1
+
+    def snapshot_stats(self):
+        """Requests, retries and calls that failed for good"""
+        with self.lock:
+            return dict(self.stats)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header, 0 if absent or a date"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
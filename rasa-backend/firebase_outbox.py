@@ -0,0 +1,215 @@
+"""
+Write-behind outbox for Firebase appointment writes
+The bot queues a write and replies straight away; a background thread
+sends queued writes in batches. Writes to an appointment that is still
+queued are merged into one, and each batch goes out as multi-location
+PATCHes on /appointments, so one request carries many bookings,
+reschedules and cancellations and applies them atomically
+"""
+import atexit
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import structured_log
+
+APPOINTMENTS_PATH = 'appointments'
+
+log = structured_log.get_logger('outbox')
+
+
+def merge_writes(older, newer):
+    """One write with the effect of older followed by newer"""
+    wal_seq = max(older.get('wal_seq') or 0, newer.get('wal_seq') or 0) or None
+    if newer['method'] == 'put':
+        return dict(newer, wal_seq=wal_seq)
+    return dict(older, data=dict(older['data'], **newer['data']), wal_seq=wal_seq)
+
+
+def multipath_updates(appointment_id, write):
+    """Children of /appointments that a write sets, for a multi-location PATCH"""
+    if write['method'] == 'put':
+        return {appointment_id: write['data']}
+    return {f"{appointment_id}/{field}": value for field, value in write['data'].items()}
+
+
+class FirebaseOutbox:
+    """Queue of pending appointment writes, flushed by a background thread
+
+    The bot calls save/reschedule/cancel and never waits on Firebase. A
+    write may carry the WAL seq of the mutation it sends; on_flushed gets
+    (appointment id, seq) pairs once those writes are in Firebase. Such
+    writes are retried, with capped backoff, until they land: only writes
+    the log doesn't hold are dropped after max_attempts. At close, a
+    failing logged write is left for the log to send again on restart
+    """
+
+    def __init__(self, client, batch_size=1000, max_request_bytes=256 * 1024, flush_interval=0.05,
+                 senders=8, max_attempts=5, retry_delay=1.0, max_retry_delay=30.0, on_flushed=None):
+        self.client = client
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size  # writes taken off the queue per flush
+        self.max_request_bytes = max_request_bytes  # a flush is split into PATCHes of about this size
+        self.flush_interval = flush_interval  # how long a batch waits for more writes
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.pending = OrderedDict()  # appointment id -> write, oldest first
+        self.cond = threading.Condition()
+        self.closing = False
+        self.stats = {
+            'enqueued': 0, 'coalesced': 0, 'flushed': 0, 'failed': 0, 'dropped': 0, 'left_in_log': 0,
+            'batches': 0, 'requests': 0, 'flush_ms_total': 0.0, 'flush_ms_max': 0.0, 'flush_ms_last': 0.0,
+        }
+
+        self.senders = senders  # requests of a batch sent in parallel
+        self.thread = threading.Thread(target=self._run, name='firebase-outbox', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def save_appointment(self, appointment_id, appointment_data, wal_seq=None):
+        """Queue a new appointment"""
+        self._enqueue(appointment_id, 'put', dict(appointment_data), wal_seq)
+
+    def reschedule_appointment(self, appointment_id, date, time, day=None, wal_seq=None):
+        """Queue an appointment's new date, time and ISO day"""
+        self._enqueue(appointment_id, 'patch', {'date': date, 'time': time, 'day': day}, wal_seq)
+
+    def cancel_appointment(self, appointment_id, wal_seq=None):
+        """Queue an appointment's cancellation"""
+        self._enqueue(appointment_id, 'patch', {'status': 'cancelled'}, wal_seq)
+
+    def _enqueue(self, appointment_id, method, data, wal_seq=None):
+        write = {'method': method, 'data': data, 'queued_at': time.monotonic(), 'attempts': 0, 'wal_seq': wal_seq}
+        with self.cond:
+            queued = self.pending.get(appointment_id)
+            if queued is not None:
+                write = dict(merge_writes(queued, write), queued_at=queued['queued_at'])
+                self.stats['coalesced'] += 1
+            self.pending[appointment_id] = write
+            self.stats['enqueued'] += 1
+            self.cond.notify()
+
+    def _run(self):
+        delay = 0
+        while True:
+            with self.cond:
+                while not self.pending and not self.closing:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                # Give writes that arrive together a moment to join the batch
+                deadline = time.monotonic() + max(delay, self.flush_interval)
+                while not self.closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or (not delay and len(self.pending) >= self.batch_size):
+                        break
+                    self.cond.wait(remaining)
+                batch = [self.pending.popitem(last=False) for _ in range(min(self.batch_size, len(self.pending)))]
+
+            failed = self._flush(batch)
+            # Back off while Firebase is failing, instead of retrying in a hot loop
+            delay = min(max(delay * 2, self.retry_delay), self.max_retry_delay) if failed and not self.closing else 0
+
+    def _flush(self, batch):
+        """Send one batch; failed writes go back in the queue. Returns the failure count"""
+        started = time.perf_counter()
+        requests = self._requests(batch)
+        results = [None] * len(requests)
+
+        def send_every(offset):
+            for i in range(offset, len(requests), self.senders):
+                results[i] = self._send(requests[i][1])
+
+        # Plain threads rather than an executor, which refuses work once the
+        # interpreter starts shutting down and close() still has to flush
+        threads = [threading.Thread(target=send_every, args=(offset,)) for offset in range(1, min(self.senders, len(requests)))]
+        for thread in threads:
+            thread.start()
+        send_every(0)
+        for thread in threads:
+            thread.join()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        failed = 0
+        sent = []
+        with self.cond:
+            for (items, _), error in zip(requests, results):
+                if error is None:
+                    self.stats['flushed'] += len(items)
+                    sent.extend((appointment_id, write['wal_seq']) for appointment_id, write in items if write['wal_seq'])
+                    continue
+                for appointment_id, write in items:
+                    failed += 1
+                    self.stats['failed'] += 1
+                    write = dict(write, attempts=write['attempts'] + 1)
+                    if write['wal_seq']:
+                        if self.closing:
+                            self.stats['left_in_log'] += 1
+                            continue
+                        if write['attempts'] == self.max_attempts:
+                            log.warning('firebase_write_retrying', appointment_id=appointment_id,
+                                        attempts=write['attempts'], error=str(error))
+                    elif write['attempts'] >= self.max_attempts and not self.pending.get(appointment_id):
+                        self.stats['dropped'] += 1
+                        log.warning('firebase_write_dropped', appointment_id=appointment_id,
+                                    attempts=write['attempts'], error=str(error))
+                        continue
+                    # A newer write queued meanwhile still has to land after this one
+                    newer = self.pending.pop(appointment_id, None)
+                    self.pending[appointment_id] = merge_writes(write, newer) if newer else write
+            self.stats['batches'] += 1
+            self.stats['requests'] += len(requests)
+            self.stats['flush_ms_last'] = elapsed_ms
+            self.stats['flush_ms_total'] += elapsed_ms
+            self.stats['flush_ms_max'] = max(self.stats['flush_ms_max'], elapsed_ms)
+        if sent and self.on_flushed:
+            self.on_flushed(sent)
+        return failed
+
+    def _requests(self, batch):
+        """Split a batch into (writes, multi-path update) pairs of at most max_request_bytes"""
+        requests = []
+        items, updates, size = [], {}, 0
+        for appointment_id, write in batch:
+            write_updates = multipath_updates(appointment_id, write)
+            write_size = len(json.dumps(write_updates, separators=(',', ':')))
+            if items and size + write_size > self.max_request_bytes:
+                requests.append((items, updates))
+                items, updates, size = [], {}, 0
+            items.append((appointment_id, write))
+            updates.update(write_updates)
+            size += write_size
+        if items:
+            requests.append((items, updates))
+        return requests
+
+    def _send(self, updates):
+        try:
+            self.client.patch(APPOINTMENTS_PATH, updates)
+        except Exception as e:
+            return e
+        return None
+
+    def snapshot_stats(self):
+        """Queue depth, age of the oldest write and flush counters"""
+        with self.cond:
+            oldest = next(iter(self.pending.values()), None)
+            stats = dict(self.stats)
+            stats['queue_depth'] = len(self.pending)
+            # Logged writes still failing after max_attempts
+            stats['retrying'] = sum(1 for write in self.pending.values() if write['attempts'] >= self.max_attempts)
+            stats['oldest_age_ms'] = (time.monotonic() - oldest['queued_at']) * 1000 if oldest else 0.0
+        stats['flush_ms_avg'] = stats['flush_ms_total'] / stats['batches'] if stats['batches'] else 0.0
+        if hasattr(self.client, 'snapshot_stats'):
+            stats['client'] = self.client.snapshot_stats()
+        return stats
+
+    def close(self, timeout=10.0):
+        """Flush what is queued and stop the background thread"""
+        with self.cond:
+            self.closing = True
+            self.cond.notify()
+        self.thread.join(timeout)
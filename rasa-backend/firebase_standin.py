@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Firebase Realtime Database REST API
+Implements the subset the bot uses - GET, PUT, PATCH (including
+multi-location updates) and DELETE on .json paths, shallow reads and
+orderBy/startAt/endAt/limitToFirst/limitToLast queries - over an
+in-memory tree, with injectable latency, errors and throttling so booking
+paths can be load-tested without a live project. Run with:
+    python firebase_standin.py --port 9000 --latency-ms 40 --error-rate 0.01
+    FIREBASE_URL=http://127.0.0.1:9000 python rasa_server.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from firebase_client import key_order
+
+
+class StandInError(Exception):
+    """Request the real database would reject; answered with 400"""
+
+
+class Tree:
+    """JSON tree addressed by slash-separated paths"""
+
+    def __init__(self, data=None):
+        self.root = data if isinstance(data, dict) else {}
+        self.lock = threading.Lock()
+
+    def read(self, parts, params):
+        """Encoded JSON of the queried value at a path"""
+        with self.lock:
+            node = self.root
+            for part in parts:
+                if not isinstance(node, dict) or part not in node:
+                    return b'null'
+                node = node[part]
+            # Encoded under the lock, so a concurrent write can't change it midway
+            return json.dumps(query(node, params)).encode()
+
+    def set(self, parts, value):
+        with self.lock:
+            self._set(parts, value)
+
+    def update(self, parts, children):
+        """Multi-location update: every child path is set, all under one lock"""
+        paths = [[part for part in key.split('/') if part] for key in children]
+        for path in paths:
+            for other in paths:
+                if path is not other and other[:len(path)] == path:
+                    raise StandInError(f"Path '{'/'.join(path)}' is an ancestor of '{'/'.join(other)}'")
+        with self.lock:
+            for path, value in zip(paths, children.values()):
+                self._set(parts + path, value)
+
+    def _set(self, parts, value):
+        if not parts:
+            self.root = value if isinstance(value, dict) else {}
+            return
+        # Walk down, creating parents; remember them to prune empty ones on delete
+        node, trail = self.root, []
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = node[part] = {}
+            trail.append((node, part))
+            node = child
+        if value is None:
+            node.pop(parts[-1], None)
+            for parent, part in reversed(trail):
+                if parent[part]:
+                    break
+                del parent[part]
+        else:
+            node[parts[-1]] = value
+
+
+def query(value, params):
+    """Apply shallow and orderBy/startAt/endAt/limit query parameters"""
+    if not isinstance(value, dict):
+        return value
+    if params.get('shallow') == 'true':
+        return {key: True for key in value}
+    order_by = params.get('orderBy')
+    if order_by is None:
+        return value
+    order_by = json.loads(order_by)
+    if order_by == '$key':
+        sort_key = lambda item: key_order(item[0])
+    elif order_by == '$value':
+        sort_key = lambda item: (item[1] is not None, item[1])
+    else:
+        sort_key = lambda item: (child(item[1], order_by) is not None, child(item[1], order_by))
+    try:
+        items = sorted(value.items(), key=sort_key)
+    except TypeError:  # mixed types: fall back to their text form
+        items = sorted(value.items(), key=lambda item: str(sort_key(item)))
+    if 'startAt' in params:
+        start = json.loads(params['startAt'])
+        items = [item for item in items if _compare(_ordered_value(item, order_by), start, order_by) >= 0]
+    if 'endAt' in params:
+        end = json.loads(params['endAt'])
+        items = [item for item in items if _compare(_ordered_value(item, order_by), end, order_by) <= 0]
+    if 'limitToFirst' in params:
+        items = items[:int(params['limitToFirst'])]
+    if 'limitToLast' in params:
+        items = items[-int(params['limitToLast']):]
+    return dict(items)
+
+
+def child(value, path):
+    for part in path.split('/'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _compare(value, bound, order_by):
+    if order_by == '$key':
+        value, bound = key_order(value), key_order(str(bound))
+    try:
+        return (value > bound) - (value < bound)
+    except TypeError:
+        return (str(value) > str(bound)) - (str(value) < str(bound))
+
+
+def _ordered_value(item, order_by):
+    if order_by == '$key':
+        return item[0]
+    if order_by == '$value':
+        return item[1]
+    return child(item[1], order_by)
+
+
+class Faults:
+    """Injected latency, error rate and a requests-per-second throttle"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, max_rps=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.tokens = float(max_rps)
+        self.refilled_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def throttled(self):
+        """Token bucket; True when this request is over the rate limit"""
+        if not self.max_rps:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.max_rps, self.tokens + (now - self.refilled_at) * self.max_rps)
+            self.refilled_at = now
+            if self.tokens < 1:
+                return True
+            self.tokens -= 1
+            return False
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+    def fails(self):
+        return self.error_rate and random.random() < self.error_rate
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoint
+
+    def do_GET(self):
+        self._handle(lambda parts, params: self.server.tree.read(parts, params))
+
+    def do_PUT(self):
+        def put(parts, params):
+            value = self._body()
+            self.server.tree.set(parts, value)
+            return value
+        self._handle(put)
+
+    def do_PATCH(self):
+        def patch(parts, params):
+            children = self._body()
+            if not isinstance(children, dict):
+                raise StandInError("PATCH body must be an object")
+            self.server.tree.update(parts, children)
+            return children
+        self._handle(patch)
+
+    def do_DELETE(self):
+        self._handle(lambda parts, params: self.server.tree.set(parts, None))
+
+    def _handle(self, operation):
+        server = self.server
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        server.count(self.command)
+
+        if url.path == '/.stats':
+            return self._reply(200, server.snapshot_stats())
+        if not url.path.endswith('.json'):
+            return self._reply(404, {"error": "Paths must end in .json"})
+        if server.faults.throttled():
+            server.count('throttled')
+            return self._reply(429, {"error": "Too many requests"}, [('Retry-After', '1')])
+        server.faults.delay()
+        if server.faults.fails():
+            server.count('injected_errors')
+            return self._reply(503, {"error": "Injected failure"})
+
+        parts = [part for part in url.path[:-len('.json')].split('/') if part]
+        try:
+            result = operation(parts, params)
+        except (StandInError, ValueError) as e:
+            return self._reply(400, {"error": str(e)})
+        self._reply(200, result)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def _reply(self, status, payload, headers=()):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FirebaseStandIn(ThreadingHTTPServer):
+    """HTTP server holding one database tree"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, data=None, faults=None):
+        super().__init__(address, StandInHandler)
+        self.tree = Tree(data)
+        self.faults = faults or Faults()
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name):
+        with self.counts_lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot_stats(self):
+        with self.counts_lock:
+            return dict(self.counts)
+
+    def start(self):
+        """Serve from a daemon thread, for benchmarks that run in-process"""
+        threading.Thread(target=self.serve_forever, name='firebase-standin', daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--data', help="JSON file to start the database from")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="added to every request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="latency varies by up to this much")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument('--max-rps', type=int, default=0, help="requests per second before 429s, 0 for no limit")
+    args = parser.parse_args()
+
+    data = None
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            data = json.load(f)
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.max_rps)
+    server = FirebaseStandIn((args.host, args.port), data, faults)
+    print(f"[OK] Firebase stand-in on {server.url} (stats at {server.url}/.stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Multi-pattern keyword matching for the triage vocabularies
+Compiles every vocabulary into one Aho-Corasick automaton so a message
+is scanned once, however many keywords there are
+"""
+
+
+class KeywordHits:
+    """Keywords found in one message, grouped by category"""
+
+    __slots__ = ('_found', '_order')
+
+    def __init__(self, found, order):
+        self._found = found
+        self._order = order
+
+    def __contains__(self, category):
+        return category in self._found
+
+    def __bool__(self):
+        return bool(self._found)
+
+    def keywords(self, category):
+        """All keywords of a category found in the message"""
+        return self._found.get(category, set())
+
+    def first(self, category):
+        """Matched keyword that comes first in the category's vocabulary"""
+        found = self._found.get(category)
+        if not found:
+            return None
+        order = self._order[category]
+        return min(found, key=order.__getitem__)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over several named keyword vocabularies"""
+
+    def __init__(self, vocabularies):
+        # category -> {keyword: position in vocabulary}
+        self.order = {}
+        # keyword -> categories it belongs to
+        keyword_categories = {}
+        for category, keywords in vocabularies.items():
+            self.order[category] = {}
+            for keyword in keywords:
+                keyword = keyword.lower()
+                self.order[category].setdefault(keyword, len(self.order[category]))
+                categories = keyword_categories.setdefault(keyword, [])
+                if category not in categories:
+                    categories.append(category)
+
+        self.transitions, self.outputs = self._compile(keyword_categories)
+
+    def _compile(self, keyword_categories):
+        """Build the trie, fail links, and a fully resolved transition table"""
+        goto = [{}]
+        outputs = [()]
+        for keyword, categories in keyword_categories.items():
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] = outputs[state] + tuple((category, keyword) for category in categories)
+
+        # Breadth-first pass: fail links, inherited outputs, and transitions
+        # that already follow the fail links, so search is one lookup per char
+        fail = [0] * len(goto)
+        transitions = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = list(goto[0].values())
+        for state in queue:
+            transitions[state] = {}
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            # Inherit the fail state's moves, then override with our own edges
+            transitions[state].update(transitions[fail[state]])
+            for char, next_state in goto[state].items():
+                fail[next_state] = transitions[fail[state]].get(char, 0)
+                transitions[state][char] = next_state
+                transitions[next_state] = {}
+                queue.append(next_state)
+
+        return transitions, [out or None for out in outputs]
+
+    def search(self, text):
+        """Scan text once and return every keyword hit with its category"""
+        transitions = self.transitions
+        outputs = self.outputs
+        found = {}
+        state = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            out = outputs[state]
+            if out:
+                for category, keyword in out:
+                    keywords = found.get(category)
+                    if keywords is None:
+                        found[category] = {keyword}
+                    else:
+                        keywords.add(keyword)
+        return KeywordHits(found, self.order)
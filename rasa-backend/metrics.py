@@ -0,0 +1,164 @@
+"""
+Request metrics in Prometheus text format
+Each stage of a webhook request is timed with perf_counter and recorded
+into a fixed-bucket histogram: one bisect and two additions per
+observation, so timing every stage costs a few microseconds against a
+request of hundreds. Turns are also counted and timed per handler: the
+booking state, payload handler or dialogue story that answered them
+"""
+import bisect
+import threading
+import time
+
+PREFIX = 'healthbot'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds, from 10 microseconds to 2.5 seconds
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+# Handler of a turn that no state, payload handler or story claimed
+FREE_TEXT = 'free_text'
+
+
+class Histogram:
+    """Observation counts per bucket, plus their sum; guarded by Metrics.lock"""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last bucket is +Inf
+        self.sum = 0.0
+
+    def snapshot(self):
+        """(cumulative bucket counts, sum)"""
+        cumulative, running = [], 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, self.sum
+
+
+class Timer:
+    """Context manager recording its block's duration under a stage"""
+
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Stage and handler histograms, shared by all request threads
+
+    Observations are kept per thread until flush() at the end of the
+    request, so a request takes the shared lock once however many stages
+    it times
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.handlers = {}
+        self.local = threading.local()  # this thread's pending observations and turn handler
+
+    def _pending(self):
+        local = self.local
+        if not hasattr(local, 'stages'):
+            local.stages, local.handlers, local.handler = [], [], FREE_TEXT
+        return local
+
+    def observe(self, stage, seconds):
+        self._pending().stages.append((stage, seconds))
+
+    def timer(self, stage):
+        """with metrics.timer('keywords'): ..."""
+        return Timer(self, stage)
+
+    def handled(self, handler):
+        """Name the handler answering the current turn"""
+        self.local.handler = handler
+
+    def start_turn(self):
+        self._pending().handler = FREE_TEXT
+
+    def end_turn(self, seconds):
+        """Record a finished turn under the handler that answered it"""
+        local = self.local
+        local.handlers.append((local.handler, seconds))
+
+    def flush(self):
+        """Record this thread's pending observations"""
+        local = self._pending()
+        # Bucket indexes are found before taking the lock
+        pending = [(self.stages, name, bisect.bisect_left(BUCKETS, seconds), seconds) for name, seconds in local.stages]
+        pending += [(self.handlers, name, bisect.bisect_left(BUCKETS, seconds), seconds) for name, seconds in local.handlers]
+        local.stages.clear()
+        local.handlers.clear()
+        with self.lock:
+            for histograms, name, index, seconds in pending:
+                histogram = histograms.get(name)
+                if histogram is None:
+                    histogram = histograms[name] = Histogram()
+                histogram.counts[index] += 1
+                histogram.sum += seconds
+
+    def snapshot(self):
+        """{stage: (cumulative counts, sum)} and the same by handler"""
+        with self.lock:
+            return (
+                {name: histogram.snapshot() for name, histogram in self.stages.items()},
+                {name: histogram.snapshot() for name, histogram in self.handlers.items()},
+            )
+
+    def render(self, stats=None):
+        """Prometheus text exposition of every histogram, then stats as gauges
+
+        stats maps a metric group to a snapshot_stats() dict; nested dicts
+        are flattened into the metric name and non-numeric values skipped
+        """
+        stages, handlers = self.snapshot()
+        lines = []
+        for name, label, histograms, help_text in (
+            ('stage_seconds', 'stage', stages, "Time spent in each stage of a webhook request"),
+            ('handler_seconds', 'handler', handlers, "Time of turns by the handler that answered them"),
+        ):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for key, (cumulative, total) in sorted(histograms.items()):
+                for bound, count in zip(BUCKETS + ('+Inf',), cumulative):
+                    lines.append(f'{PREFIX}_{name}_bucket{{{label}="{key}",le="{bound}"}} {count}')
+                lines.append(f'{PREFIX}_{name}_sum{{{label}="{key}"}} {total:.9f}')
+                lines.append(f'{PREFIX}_{name}_count{{{label}="{key}"}} {cumulative[-1]}')
+
+        lines.append(f"# HELP {PREFIX}_handler_turns_total Turns answered by each handler")
+        lines.append(f"# TYPE {PREFIX}_handler_turns_total counter")
+        for key, (cumulative, _) in sorted(handlers.items()):
+            lines.append(f'{PREFIX}_handler_turns_total{{handler="{key}"}} {cumulative[-1]}')
+
+        for group, values in (stats or {}).items():
+            for name, value in flatten(values, f"{PREFIX}_{group}"):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def flatten(stats, prefix):
+    """(metric name, value) of every number in a nested stats dict"""
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
@@ -0,0 +1,296 @@
+"""
+Lightweight intent classifier trained from nlu.yml
+Hashed char_wb n-grams (the featurizer config.yml describes) feed a NumPy
+softmax model; the weights live in a .npy file that workers memory-map
+"""
+import contextlib
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import yaml
+
+from structured_log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: workers may each retrain, which is slower but still safe
+    fcntl = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NLU_PATH = os.path.join(BASE_DIR, 'nlu.yml')
+CONFIG_PATH = os.path.join(BASE_DIR, 'config.yml')
+MODEL_DIR = os.environ.get('NLU_MODEL_DIR', os.path.join(BASE_DIR, 'models', 'nlu'))
+
+# 2^14 hash buckets keeps the weight matrix around 1 MB
+HASH_BITS = 14
+# Fibonacci hashing multiplier, spreads polynomial hashes over the top bits
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+POLY = np.uint64(1000003)
+SPACE = ord(' ')
+
+# Rasa entity annotations, e.g. "[severe](severity) chest pain"
+ENTITY_PATTERN = re.compile(r'\[([^\]]+)\]\([^)]*\)')
+
+log = get_logger('nlu')
+
+
+def load_training_data(nlu_path=NLU_PATH):
+    """(text, intent) pairs from a Rasa nlu.yml file"""
+    with open(nlu_path, encoding='utf-8') as f:
+        nlu = yaml.safe_load(f).get('nlu', [])
+
+    examples = []
+    for block in nlu:
+        if 'intent' not in block:
+            continue
+        for line in block.get('examples', '').splitlines():
+            line = line.strip()
+            if line.startswith('- '):
+                examples.append((ENTITY_PATTERN.sub(r'\1', line[2:]), block['intent']))
+    return examples
+
+
+def ngram_range_from_config(config_path=CONFIG_PATH):
+    """n-gram range of the char_wb CountVectorsFeaturizer in config.yml"""
+    try:
+        with open(config_path, encoding='utf-8') as f:
+            pipeline = yaml.safe_load(f).get('pipeline', [])
+    except OSError:
+        pipeline = []
+    for component in pipeline:
+        if component.get('name') == 'CountVectorsFeaturizer' and component.get('analyzer') == 'char_wb':
+            return component.get('min_ngram', 1), component.get('max_ngram', 4)
+    return 1, 4
+
+
+def file_digest(path):
+    """SHA-256 of a file, to tell whether a saved model is stale"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def hash_ngrams(texts, min_ngram, max_ngram, hash_bits=HASH_BITS):
+    """Hashed char_wb n-grams for a batch of texts
+
+    Returns (doc_ids, buckets, counts): one entry per n-gram, ordered by
+    document, plus the number of n-grams in each document
+    """
+    # Lowercase, collapse whitespace and pad so every word is " word ";
+    # NUL separates documents, so it can't be left inside one
+    padded = []
+    for text in texts:
+        words = text.replace('\0', ' ').lower().split()
+        padded.append(' ' + ' '.join(words) + ' ' if words else '')
+    codes = np.frombuffer('\0'.join(padded).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+    length = len(codes)
+    if length == 0:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(len(texts), np.int64)
+
+    # Separators mark document boundaries; spaces may only sit at an n-gram's ends
+    doc_of_position = np.cumsum(codes == 0)
+    not_separator = codes != 0
+    not_space = codes != SPACE
+
+    # One row per start position, one column per n-gram length, so the
+    # flattened result is already grouped by document
+    width = max_ngram - min_ngram + 1
+    hashes = np.zeros((length, width), np.uint64)
+    valid = np.zeros((length, width), bool)
+
+    h = codes.copy()
+    no_separator = not_separator.copy()
+    interior_ok = np.ones(length, bool)
+    for n in range(1, max_ngram + 1):
+        if n > 1:
+            h = h[:-1] * POLY + codes[n - 1:]
+            no_separator = no_separator[:-1] & not_separator[n - 1:]
+            interior_ok = interior_ok[:-1]
+            if n > 2:
+                interior_ok = interior_ok & not_space[n - 2:length - 1]
+        if n < min_ngram:
+            continue
+        ok = no_separator & interior_ok
+        if n == 1:
+            ok = ok & not_space
+        hashes[:len(h), n - min_ngram] = h
+        valid[:len(h), n - min_ngram] = ok
+
+    valid = valid.ravel()
+    buckets = ((hashes.ravel()[valid] * GOLDEN) >> np.uint64(64 - hash_bits)).astype(np.int64)
+    doc_ids = np.repeat(doc_of_position, width)[valid]
+    counts = np.bincount(doc_ids, minlength=len(texts))
+    return doc_ids, buckets, counts
+
+
+class IntentClassifier:
+    """Softmax model over hashed char n-grams, scores many texts at once"""
+
+    def __init__(self, intents, weights, bias, min_ngram=1, max_ngram=4):
+        self.intents = list(intents)
+        self.weights = weights  # (n_intents, 2^HASH_BITS), may be memory-mapped
+        self.bias = np.asarray(bias, np.float32)
+        self.min_ngram = min_ngram
+        self.max_ngram = max_ngram
+
+    @classmethod
+    def train(cls, examples, min_ngram=1, max_ngram=4, epochs=300, learning_rate=2.0, l2=1e-4):
+        """Fit the model with full-batch gradient descent"""
+        intents = sorted({intent for _, intent in examples})
+        labels = np.array([intents.index(intent) for _, intent in examples])
+        texts = [text for text, _ in examples]
+
+        doc_ids, buckets, counts = hash_ngrams(texts, min_ngram, max_ngram)
+        # Only buckets seen in training can get a weight, so train on those
+        used, columns = np.unique(buckets, return_inverse=True)
+        features = np.zeros((len(texts), len(used)), np.float32)
+        np.add.at(features, (doc_ids, columns), 1.0)
+        features /= np.sqrt(np.maximum(counts, 1))[:, None]
+
+        targets = np.eye(len(intents), dtype=np.float32)[labels]
+        weights = np.zeros((len(used), len(intents)), np.float32)
+        bias = np.zeros(len(intents), np.float32)
+        for _ in range(epochs):
+            probs = softmax(features @ weights + bias)
+            error = (probs - targets) / len(texts)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        full_weights = np.zeros((len(intents), 1 << HASH_BITS), np.float32)
+        full_weights[:, used] = weights.T
+        return cls(intents, full_weights, bias, min_ngram, max_ngram)
+
+    def save(self, model_dir, source_digest=None):
+        """Write the weights (one row per intent, bias in the last column) and meta.json
+
+        Both files are renamed into place once complete, and meta.json names
+        its weights file, so a worker never maps a half-written or mismatched model
+        """
+        os.makedirs(model_dir, exist_ok=True)
+        weights_name = f"weights-{(source_digest or 'untracked')[:16]}.npy"
+        matrix = np.column_stack([self.weights, self.bias])
+        write_atomic(os.path.join(model_dir, weights_name), lambda f: np.save(f, matrix))
+        meta = {
+            'intents': self.intents,
+            'min_ngram': self.min_ngram,
+            'max_ngram': self.max_ngram,
+            'hash_bits': HASH_BITS,
+            'source_digest': source_digest,
+            'weights': weights_name,
+        }
+        write_atomic(os.path.join(model_dir, 'meta.json'), lambda f: f.write(json.dumps(meta, indent=2).encode()))
+
+        # Workers still mapping an older file keep their pages after the unlink
+        for name in os.listdir(model_dir):
+            if name.startswith('weights') and name.endswith('.npy') and name != weights_name:
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(model_dir, name))
+
+    @classmethod
+    def load(cls, model_dir):
+        """Memory-map a saved model, so workers share its pages"""
+        with open(os.path.join(model_dir, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(os.path.join(model_dir, meta.get('weights', 'weights.npy')), mmap_mode='r')
+        model = cls(meta['intents'], matrix[:, :-1], matrix[:, -1], meta['min_ngram'], meta['max_ngram'])
+        model.source_digest = meta.get('source_digest')
+        model.hash_bits = meta.get('hash_bits')
+        return model
+
+    def predict_proba(self, texts):
+        """Intent probabilities, one row per text"""
+        doc_ids, buckets, counts = hash_ngrams(texts, self.min_ngram, self.max_ngram)
+        scores = np.zeros((len(texts), len(self.intents)), np.float32)
+        nonempty = np.flatnonzero(counts)
+        if len(nonempty):
+            # n-grams are grouped by document, so each intent's row is summed
+            # per document with one contiguous reduceat
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+            for i, row in enumerate(self.weights):
+                scores[nonempty, i] = np.add.reduceat(row[buckets], starts)
+            scores[nonempty] /= np.sqrt(counts[nonempty])[:, None]
+        return softmax(scores + self.bias)
+
+    def predict_batch(self, texts):
+        """(intent, confidence) for every text"""
+        probs = self.predict_proba(texts)
+        best = probs.argmax(axis=1)
+        return [(self.intents[i], float(p)) for i, p in zip(best, probs[np.arange(len(texts)), best])]
+
+    def predict(self, text):
+        """(intent, confidence) for one text"""
+        return self.predict_batch([text])[0]
+
+
+def softmax(scores):
+    """Row-wise softmax"""
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def write_atomic(path, write):
+    """Write a file under a temporary name, then rename it over path"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def training_lock(model_dir):
+    """Exclusive lock on the model directory, held while one worker trains"""
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, '.train.lock'), 'w') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def train_and_save(nlu_path=NLU_PATH, config_path=CONFIG_PATH, model_dir=MODEL_DIR):
+    """Train from nlu.yml and write the model artifact"""
+    min_ngram, max_ngram = ngram_range_from_config(config_path)
+    model = IntentClassifier.train(load_training_data(nlu_path), min_ngram, max_ngram)
+    model.save(model_dir, file_digest(nlu_path))
+    return model
+
+
+def load_saved(nlu_path=NLU_PATH, model_dir=MODEL_DIR):
+    """The saved model if it was trained on the current nlu.yml, else None"""
+    try:
+        model = IntentClassifier.load(model_dir)
+    except (OSError, ValueError, KeyError):
+        return None
+    if model.source_digest == file_digest(nlu_path) and model.hash_bits == HASH_BITS:
+        return model
+    return None
+
+
+def load_or_train(nlu_path=NLU_PATH, config_path=CONFIG_PATH, model_dir=MODEL_DIR):
+    """Memory-map the saved model, retraining first if nlu.yml has changed"""
+    model = load_saved(nlu_path, model_dir)
+    if model is not None:
+        return model
+    # Workers starting together take turns: the first one trains, the
+    # others then find its model and map it
+    with training_lock(model_dir):
+        model = load_saved(nlu_path, model_dir)
+        if model is None:
+            log.info('nlu_training', reason="no model for the current nlu.yml", nlu_path=nlu_path)
+            model = train_and_save(nlu_path, config_path, model_dir)
+    return model
+
+
+if __name__ == '__main__':
+    examples = load_training_data()
+    model = train_and_save()
+    predictions = model.predict_batch([text for text, _ in examples])
+    correct = sum(intent == expected for (intent, _), (_, expected) in zip(predictions, examples))
+    print(f"[OK] Trained on {len(examples)} examples, {len(model.intents)} intents")
+    print(f"[OK] Training accuracy: {correct}/{len(examples)}")
+    print(f"[OK] Model saved to {MODEL_DIR}")
@@ -0,0 +1,240 @@
+"""
+On-demand sampling profiler for live workers
+POST /admin/profile samples the stack of every thread through
+sys._current_frames() at a fixed interval, for a number of seconds or
+until a number of turns have been processed. Workers run at full speed
+outside a window and are never traced inside one: a sample is a stack
+walk per thread, a few microseconds every interval. The result is given
+three ways:
+- collapsed stacks for flame graphs
+- a pstats file built from the samples, which pstats and snakeviz can read
+- the top tracemalloc allocations, plus their growth during the window
+The endpoint only exists when ADMIN_TOKEN is set, and needs
+"Authorization: Bearer <ADMIN_TOKEN>":
+    curl -X POST -H "Authorization: Bearer $ADMIN_TOKEN" \
+        'http://127.0.0.1:5005/admin/profile?seconds=30&format=collapsed' > profile.folded
+"""
+import base64
+import hmac
+import json
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+# Longest window, whether it is given in seconds or turns
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", 300))
+
+# Leaf frames in these files are threads waiting, not working
+IDLE_FILES = ('threading.py', 'selectors.py', 'queue.py', 'socketserver.py', 'base_events.py')
+
+FORMATS = {
+    'json': 'application/json',
+    'collapsed': 'text/plain; charset=utf-8',
+    'pstats': 'application/octet-stream',
+}
+
+
+class ProfilerBusy(Exception):
+    """Another profile window is already running"""
+
+
+def code_key(code):
+    """pstats function key of a code object: (file, first line, name)"""
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def code_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Stack sampler for one profile window at a time"""
+
+    def __init__(self):
+        self.window = threading.Lock()
+        self.turns_lock = threading.Lock()
+        self.turns_left = None  # counted down by turn_done() during a turns window
+        self.turns_done = threading.Event()
+
+    def turn_done(self):
+        """Called after every turn; ends a window given in turns"""
+        if self.turns_left is None:
+            return
+        with self.turns_lock:
+            if self.turns_left is not None:
+                self.turns_left -= 1
+                if self.turns_left <= 0:
+                    self.turns_done.set()
+
+    def profile(self, seconds=None, turns=None, interval=0.005, memory=True, include_idle=False, top=25):
+        """Sample for seconds, or until turns have been processed; returns the results"""
+        if not self.window.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            return self._profile(seconds, turns, interval, memory, include_idle, top)
+        finally:
+            with self.turns_lock:
+                self.turns_left = None
+            self.window.release()
+
+    def _profile(self, seconds, turns, interval, memory, include_idle, top):
+        started_tracing = memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot() if memory else None
+
+        self.turns_done.clear()
+        if turns:
+            with self.turns_lock:
+                self.turns_left = turns
+        own_thread = threading.get_ident()
+        samples = {}  # stack of code objects, outermost first -> [count, seconds]
+        sample_count = 0
+        started = last = time.perf_counter()
+        deadline = started + min(seconds or PROFILE_MAX_SECONDS, PROFILE_MAX_SECONDS)
+        while last < deadline and not self.turns_done.is_set():
+            # Under load the sampler gets the GIL back later than asked, so
+            # each sample stands for the time since the previous one
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if not include_idle and os.path.basename(stack[0].co_filename) in IDLE_FILES:
+                    continue
+                stack.reverse()
+                sample = samples.setdefault(tuple(stack), [0, 0.0])
+                sample[0] += 1
+                sample[1] += weight
+            sample_count += 1
+            time.sleep(interval)
+        elapsed = time.perf_counter() - started
+
+        result = {
+            'seconds': round(elapsed, 3),
+            'turns': turns - (self.turns_left or 0) if turns else None,
+            'samples': sample_count,
+            'interval_ms': interval * 1000,
+            'collapsed': collapsed_stacks(samples),
+            'pstats': sampled_pstats(samples),
+        }
+        if memory:
+            after = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            result['memory'] = allocation_report(before, after, top)
+        return result
+
+
+def collapsed_stacks(samples):
+    """Brendan Gregg's folded format: "outer;inner;leaf count" per line"""
+    lines = [';'.join(code_label(code) for code in stack) + f" {count}" for stack, (count, _) in samples.items()]
+    return '\n'.join(sorted(lines)) + '\n'
+
+
+def sampled_pstats(samples):
+    """Samples as a marshalled pstats table, timed by the sampled wall time
+
+    Call counts are sample counts, so they show how often a function was
+    on the stack, not how often it was called
+    """
+    stats = {}  # func -> [cc, nc, tt, ct, callers]
+    for stack, (count, seconds) in samples.items():
+        seen = set()
+        for depth, code in enumerate(stack):
+            func = code_key(code)
+            entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+            if func not in seen:  # recursion counts once per sample
+                seen.add(func)
+                entry[0] += count
+                entry[1] += count
+                entry[3] += seconds
+            if depth == len(stack) - 1:
+                entry[2] += seconds
+            if depth:
+                caller = code_key(stack[depth - 1])
+                cc, nc, tt, ct = entry[4].get(caller, (0, 0, 0.0, 0.0))
+                own = seconds if depth == len(stack) - 1 else 0.0
+                entry[4][caller] = (cc + count, nc + count, tt + own, ct + seconds)
+    return marshal.dumps({func: tuple(entry) for func, entry in stats.items()})
+
+
+def allocation_report(before, after, top):
+    """Largest allocation sites by line, and the ones that grew most in the window"""
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+
+    def site(stat):
+        frame = stat.traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+    return {
+        'top': [
+            {'site': site(stat), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+            for stat in after.statistics('lineno')[:top]
+        ],
+        'growth': [
+            {'site': site(stat), 'size_diff_kb': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff}
+            for stat in after.compare_to(before, 'lineno')[:top]
+        ],
+    }
+
+
+def profile_response(profiler, authorization, params):
+    """(HTTP status, content type, body) for POST /admin/profile
+
+    params: seconds or turns for the window, interval_ms, memory=0 to skip
+    tracemalloc, idle=1 to keep waiting threads, top, and format (json,
+    collapsed or pstats)
+    """
+    def error(status, message):
+        return status, FORMATS['json'], json.dumps({"error": message}).encode()
+
+    if not ADMIN_TOKEN:
+        return error(404, "Not found")
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        return error(401, "Admin token required")
+
+    try:
+        turns = int(params['turns']) if params.get('turns') else None
+        seconds = float(params['seconds']) if params.get('seconds') else (None if turns else 10.0)
+        interval_ms = float(params.get('interval_ms') or 5)
+        top = int(params.get('top') or 25)
+        output = params.get('format') or 'json'
+    except ValueError:
+        return error(400, "seconds, turns, interval_ms and top must be numbers")
+    # Written so NaN fails too
+    if seconds is not None and not 0 < seconds <= PROFILE_MAX_SECONDS:
+        return error(400, f"seconds must be more than 0 and at most {PROFILE_MAX_SECONDS:g}")
+    if turns is not None and turns <= 0:
+        return error(400, "turns must be more than 0")
+    if not 0 < interval_ms <= 1000 or top <= 0:
+        return error(400, "interval_ms must be more than 0 and at most 1000, and top more than 0")
+    interval = max(interval_ms, 1.0) / 1000
+    if output not in FORMATS:
+        return error(400, f"format must be one of: {', '.join(FORMATS)}")
+
+    try:
+        result = profiler.profile(
+            seconds, turns, interval, memory=params.get('memory', '1') != '0',
+            include_idle=params.get('idle') == '1', top=top,
+        )
+    except ProfilerBusy:
+        return error(409, "A profile is already running")
+
+    if output == 'collapsed':
+        body = result['collapsed'].encode()
+    elif output == 'pstats':
+        body = result['pstats']
+    else:
+        body = json.dumps(dict(result, pstats=base64.b64encode(result['pstats']).decode())).encode()
+    return 200, FORMATS[output], body
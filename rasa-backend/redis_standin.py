@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Redis
+Speaks the Redis protocol (RESP2) and implements the commands the session
+backend uses - PING, AUTH, SELECT, GET, SET with EX/PX/NX, DEL, EXISTS,
+TTL, DBSIZE and FLUSHDB - over in-memory databases with expiry, so several
+workers can share sessions without installing Redis. Run with:
+    python redis_standin.py --port 6379 --latency-ms 0.5
+    SESSION_BACKEND=redis://127.0.0.1:6379/0 gunicorn -w 4 'rasa_server:create_app()'
+"""
+import argparse
+import threading
+import time
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+
+class CommandError(Exception):
+    """Command Redis would answer with an error reply"""
+
+
+class Databases:
+    """Numbered key spaces of string values, each key with an optional deadline"""
+
+    def __init__(self):
+        self.dbs = {}  # db -> {key: (value, deadline or None)}
+        self.lock = threading.Lock()
+
+    def _live(self, db, key, now):
+        entry = self.dbs.get(db, {}).get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self.dbs[db][key]
+            return None
+        return entry
+
+    def get(self, db, key):
+        with self.lock:
+            entry = self._live(db, key, time.monotonic())
+            return entry[0] if entry else None
+
+    def set(self, db, key, value, ttl=None, only_new=False):
+        """Store a value; with only_new, only if the key is absent. True if stored"""
+        now = time.monotonic()
+        deadline = now + ttl if ttl is not None else None
+        with self.lock:
+            if only_new and self._live(db, key, now):
+                return False
+            self.dbs.setdefault(db, {})[key] = (value, deadline)
+            return True
+
+    def delete(self, db, keys):
+        now = time.monotonic()
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._live(db, key, now):
+                    del self.dbs[db][key]
+                    removed += 1
+            return removed
+
+    def exists(self, db, keys):
+        now = time.monotonic()
+        with self.lock:
+            return sum(1 for key in keys if self._live(db, key, now))
+
+    def ttl(self, db, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self._live(db, key, now)
+            if entry is None:
+                return -2
+            return -1 if entry[1] is None else max(0, round(entry[1] - now))
+
+    def size(self, db):
+        now = time.monotonic()
+        with self.lock:
+            keys = self.dbs.get(db, {})
+            for key in [key for key, (_, deadline) in keys.items() if deadline is not None and deadline <= now]:
+                del keys[key]
+            return len(keys)
+
+    def flush(self, db):
+        with self.lock:
+            self.dbs.pop(db, None)
+
+
+def encode_reply(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, CommandError):
+        return b'-ERR %s\r\n' % str(reply).encode()
+    if isinstance(reply, str):
+        return b'+%s\r\n' % reply.encode()
+    return b'$%d\r\n%s\r\n' % (len(reply), reply)
+
+
+class RespHandler(StreamRequestHandler):
+    """One client connection; commands are answered in the order they arrive"""
+
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.db = 0
+        server = self.server
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            server.delay()
+            try:
+                reply = self._run(args)
+            except CommandError as error:
+                reply = error
+            except (IndexError, ValueError):
+                reply = CommandError("wrong arguments")
+            self.wfile.write(encode_reply(reply))
+
+    def _read_command(self):
+        """Arguments of the next command as bytes, or None at end of stream"""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()  # inline command, as typed into telnet
+        args = []
+        for _ in range(int(line[1:])):
+            header = self.rfile.readline()
+            if not header.startswith(b'$'):
+                raise ValueError("Expected a bulk string")
+            args.append(self.rfile.read(int(header[1:]) + 2)[:-2])
+        return args
+
+    def _run(self, args):
+        if not args:
+            raise CommandError("empty command")
+        name, args = args[0].decode().upper(), args[1:]
+        self.server.count(name)
+        data = self.server.data
+        if name == 'PING':
+            return args[0] if args else 'PONG'
+        if name == 'AUTH':
+            return 'OK'
+        if name == 'SELECT':
+            self.db = int(args[0])
+            return 'OK'
+        if name == 'GET':
+            return data.get(self.db, args[0])
+        if name == 'SET':
+            return self._set(args)
+        if name == 'DEL':
+            return data.delete(self.db, args)
+        if name == 'EXISTS':
+            return data.exists(self.db, args)
+        if name == 'TTL':
+            return data.ttl(self.db, args[0])
+        if name == 'DBSIZE':
+            return data.size(self.db)
+        if name == 'FLUSHDB':
+            data.flush(self.db)
+            return 'OK'
+        raise CommandError(f"unknown command '{name}'")
+
+    def _set(self, args):
+        if len(args) < 2:
+            raise CommandError("wrong number of arguments for 'set' command")
+        key, value, options = args[0], args[1], [arg.decode().upper() for arg in args[2:]]
+        ttl, only_new = None, False
+        while options:
+            option = options.pop(0)
+            if option == 'NX':
+                only_new = True
+            elif option in ('EX', 'PX') and options and ttl is None:
+                ttl = float(options.pop(0)) / (1000 if option == 'PX' else 1)
+            else:
+                raise CommandError("syntax error")
+        # SET ... NX answers nil when the key already exists
+        return 'OK' if self.server.data.set(self.db, key, value, ttl, only_new) else None
+
+
+class RedisStandIn(ThreadingTCPServer):
+    """TCP server holding the databases, with optional added latency"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, address, latency_ms=0.0):
+        super().__init__(address, RespHandler)
+        self.data = Databases()
+        self.latency_ms = latency_ms
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def delay(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def count(self, name):
+        with self.counts_lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot_stats(self):
+        with self.counts_lock:
+            return dict(self.counts)
+
+    def start(self):
+        """Serve from a daemon thread, for benchmarks that run in-process"""
+        threading.Thread(target=self.serve_forever, name='redis-standin', daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="added to every command")
+    args = parser.parse_args()
+
+    server = RedisStandIn((args.host, args.port), args.latency_ms)
+    print(f"[OK] Redis stand-in on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Pre-encoded JSON for static bot replies
+Static templates differ only in recipient_id, so their JSON is encoded
+once and each webhook call only encodes the sender id in between
+"""
+import json
+import threading
+
+from response_templates import StaticReply
+
+# Same encoding as Flask's jsonify outside debug mode
+JSON_OPTIONS = {"ensure_ascii": True, "sort_keys": True, "separators": (",", ":")}
+
+
+def encode_json(obj):
+    """Compact, key-sorted JSON bytes, identical to jsonify's body"""
+    return json.dumps(obj, **JSON_OPTIONS).encode()
+
+
+class ResponseCache:
+    """Encoded JSON fragments for every template, keyed by template"""
+
+    def __init__(self, templates):
+        # template -> (bytes before recipient_id value, bytes after it)
+        self.fragments = {}
+        for template in templates:
+            self.fragments[template] = self._split(template)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # request threads share the counters
+
+    def _split(self, template):
+        """Encode a template with a placeholder recipient and cut around it"""
+        reply = {"recipient_id": None, "text": template.text}
+        if template.buttons:
+            reply["buttons"] = template.buttons
+        prefix, suffix = encode_json(reply).split(b'"recipient_id":null', 1)
+        return prefix + b'"recipient_id":', suffix
+
+    def fragment(self, response):
+        """Cached (prefix, suffix) for an untouched static reply, else None"""
+        if type(response) is not StaticReply:
+            return None
+        template = response.template
+        # Only trust the cache if nothing was changed after render()
+        if len(response) != (3 if template.buttons else 2) or response.get("text") is not template.text:
+            return None
+        if template.buttons and response.get("buttons") is not template.buttons:
+            return None
+        return self.fragments.get(template)
+
+    def encode_list(self, responses):
+        """JSON array of replies, reusing cached fragments"""
+        parts = []
+        hits = 0
+        for response in responses:
+            fragment = self.fragment(response)
+            if fragment:
+                hits += 1
+                prefix, suffix = fragment
+                parts.append(prefix + encode_json(response["recipient_id"]) + suffix)
+            else:
+                parts.append(encode_json(response))
+        with self.lock:
+            self.hits += hits
+            self.misses += len(parts) - hits
+        return b"[" + b",".join(parts) + b"]"
+
+    def encode(self, responses):
+        """JSON body for a list of replies"""
+        return self.encode_list(responses) + b"\n"
+
+    def encode_batch(self, responses_by_sender):
+        """JSON body mapping each sender to its list of replies"""
+        parts = [
+            encode_json(str(sender_id)) + b":" + self.encode_list(responses)
+            for sender_id, responses in responses_by_sender.items()
+        ]
+        return b"{" + b",".join(parts) + b"}\n"
+
+    def snapshot_stats(self):
+        """Replies served from cached fragments vs fully encoded"""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "templates": len(self.fragments)}
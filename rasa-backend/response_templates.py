@@ -0,0 +1,2034 @@
+"""
+Response template catalogue for the healthcare triage bot
+Every reply is built once at import: static replies are shared frozen
+objects, dynamic replies only fill in their slots per request
+"""
+
+
+class FrozenDict(dict):
+    """Read-only dict, so templates shared between requests cannot be changed"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read-only")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class StaticReply(dict):
+    """Reply rendered without slots or custom buttons, remembers its template"""
+
+    __slots__ = ('template',)
+
+
+class ResponseTemplate:
+    """A bot reply whose text and buttons are built once"""
+
+    __slots__ = ('text', 'buttons')
+
+    def __init__(self, text, buttons=()):
+        self.text = text
+        self.buttons = tuple(
+            FrozenDict(title=title, payload=payload) for title, payload in buttons
+        )
+
+    def render(self, sender_id, buttons=None, **slots):
+        """Reply for one recipient, filling the text's {slots} if any"""
+        if not slots and buttons is None:
+            response = StaticReply(recipient_id=sender_id, text=self.text)
+            response.template = self
+            if self.buttons:
+                response["buttons"] = self.buttons
+            return response
+
+        response = {
+            "recipient_id": sender_id,
+            "text": self.text.format(**slots) if slots else self.text
+        }
+        buttons = self.buttons if buttons is None else buttons
+        if buttons:
+            response["buttons"] = buttons
+        return response
+
+
+# One line per appointment in the cancel and view lists
+CANCEL_LIST_ITEM = (
+    "{number}. {date} at {time}\n"
+    "   Doctor: {doctor}\n"
+    "   ID: {id}"
+)
+APPOINTMENT_LIST_ITEM = (
+    "{number}. {date} at {time}\n"
+    "   Department: {department}\n"
+    "   Doctor: {doctor}\n"
+    "   ID: {id}"
+)
+APPOINTMENT_LIST_ITEM_NO_DEPARTMENT = (
+    "{number}. {date} at {time}\n"
+    "   Doctor: {doctor}\n"
+    "   ID: {id}"
+)
+
+# Symptom assessments: keyword -> (heading, advice)
+SYMPTOM_ADVICE = {
+    'fever': (
+        "FEVER",
+        "📊 Temperature Guide:\n"
+        "• 98-99°F - Normal\n"
+        "• 99-100.4°F - Low-grade fever\n"
+        "• 100.4-103°F - Moderate fever (see doctor)\n"
+        "• Above 103°F - High fever (urgent care)\n\n"
+        "Monitor temperature every 4 hours"
+    ),
+    'headache': (
+        "HEADACHE",
+        "📍 Location & Type:\n"
+        "• Tension: Band around head\n"
+        "• Migraine: One-sided, throbbing\n"
+        "• Cluster: Behind eye\n\n"
+        " Seek care if:\n"
+        "• Sudden severe headache\n"
+        "• With fever and stiff neck\n"
+        "• After head injury"
+    ),
+    'cough': (
+        "COUGH",
+        "🔍 Type of cough:\n"
+        "• Dry cough - No phlegm\n"
+        "• Productive - With phlegm\n\n"
+        "⏱ Duration:\n"
+        "• < 3 weeks: Acute (usually viral)\n"
+        "• > 3 weeks: Chronic (see doctor)\n\n"
+        "Self-care: Honey, warm fluids, humidifier"
+    ),
+    'stomach': (
+        "STOMACH PAIN",
+        "📍 Location matters:\n"
+        "• Upper right: Gallbladder\n"
+        "• Upper center: Stomach/ulcer\n"
+        "• Lower right: Appendix (URGENT)\n\n"
+        " URGENT if:\n"
+        "• Severe sudden pain\n"
+        "• With high fever\n"
+        "• Can't pass gas/stool"
+    ),
+}
+
+# Triage outcome -> (recommendation, buttons)
+SYMPTOM_TRIAGE = {
+    'urgent': (
+        "URGENT CARE NEEDED",
+        [
+            ("Go to urgent care", "/urgent_care"),
+            ("Call ambulance", "/call_ambulance"),
+        ],
+    ),
+    'gp': (
+        "GP APPOINTMENT RECOMMENDED",
+        [
+            ("Book GP appointment", "/schedule_appointment"),
+            ("Self-care advice", "/self_care"),
+        ],
+    ),
+}
+
+TEMPLATES = {
+    'ask_surname': ResponseTemplate(
+        "Please provide your last name:",
+    ),
+    'ask_phone': ResponseTemplate(
+        "Please provide your phone number:",
+    ),
+    'ask_department': ResponseTemplate(
+        "Which department would you like to visit?\n\n"
+        "🏥 Available Departments:\n"
+        "1. Cardiology - Heart & cardiovascular\n"
+        "2. Neurology - Brain & nervous system\n"
+        "3. General Medicine - Primary care\n"
+        "4. Orthopedics - Bones & joints\n"
+        "5. Pediatrics - Children's health\n"
+        "6. Emergency - Urgent care\n\n"
+        "Please select a department:",
+        buttons=[
+            ("Cardiology", "/select_Cardiology"),
+            ("Neurology", "/select_Neurology"),
+            ("General Medicine", "/select_General Medicine"),
+            ("Orthopedics", "/select_Orthopedics"),
+            ("Pediatrics", "/select_Pediatrics"),
+            ("Emergency", "/select_Emergency"),
+        ],
+    ),
+    'unknown_department': ResponseTemplate(
+        "I didn't understand that department. Please select one from the list above.",
+    ),
+    'emergency_protocol': ResponseTemplate(
+        " EMERGENCY PROTOCOL ACTIVATED\n\n"
+        "CALL 911 IMMEDIATELY\n\n"
+        "Your symptoms require immediate medical attention:\n"
+        "• Do NOT drive yourself to the hospital\n"
+        "• Stay calm and still\n"
+        "• Unlock your door for paramedics\n"
+        "• Have someone wait outside to guide them\n\n"
+        "Help is on the way!",
+    ),
+    'ambulance_dispatched': ResponseTemplate(
+        "🚑 AMBULANCE DISPATCHED\n\n"
+        " CALLING 911...\n\n"
+        "WHILE WAITING:\n"
+        "1. Stay calm\n"
+        "2. Unlock door if possible\n"
+        "3. Gather medications\n\n"
+        "ETA: 5-10 minutes\n"
+        "Nearest hospital: Memorial Medical Center (2.3 miles)",
+        buttons=[
+            ("Ambulance status", "/ambulance_status"),
+            ("Cancel ambulance", "/cancel_ambulance"),
+        ],
+    ),
+    'back_pain_prompt': ResponseTemplate(
+        "🔙 BACK PAIN ASSESSMENT\n\n"
+        "I understand you have back pain. Let me help assess this.\n\n"
+        "Location of pain:\n"
+        "• Upper back (between shoulders)\n"
+        "• Mid back\n"
+        "• Lower back (most common)\n"
+        "• Radiating to legs\n\n"
+        "How severe (1-10)?\n"
+        "When did it start?\n"
+        "Any recent injury or strain?",
+        buttons=[
+            ("Mild (1-3) manageable", "/mild_back_pain"),
+            ("Moderate (4-6) limiting", "/moderate_back_pain"),
+            ("Severe (7-10) debilitating", "/severe_back"),
+            ("With numbness/tingling", "/back_with_neuro"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'pain_prompt': ResponseTemplate(
+        "📍 I see you're experiencing pain.\n\n"
+        "To help you better, please tell me:\n\n"
+        "1. WHERE is the pain located?\n"
+        "2. HOW SEVERE is it (1-10)?\n"
+        "3. WHEN did it start?\n"
+        "4. WHAT TYPE of pain?\n"
+        "   • Sharp/stabbing\n"
+        "   • Dull/aching\n"
+        "   • Burning\n"
+        "   • Throbbing\n\n"
+        "Select the area that best matches:",
+        buttons=[
+            ("Head/neck pain", "/headache"),
+            ("Chest pain", "/chest_pain"),
+            ("Abdominal pain", "/stomach"),
+            ("Back pain", "/back_pain"),
+            ("Other location", "/other_pain"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'respiratory_prompt': ResponseTemplate(
+        "🫁 I see you have breathing/respiratory concerns.\n\n"
+        "How severe is your symptom?",
+        buttons=[
+            ("Mild - manageable", "/mild_cold_flu"),
+            ("Moderate - concerning", "/moderate_breathing"),
+            ("Severe - struggling", "/breathing_difficulty"),
+            ("Emergency - can't breathe", "/emergency_breathing"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'digestive_prompt': ResponseTemplate(
+        "🤢 I see you have digestive symptoms.\n\n"
+        "What are you experiencing?",
+        buttons=[
+            ("Nausea/vomiting", "/nausea_vomiting"),
+            ("Diarrhea", "/diarrhea"),
+            ("Constipation", "/constipation"),
+            ("Stomach pain", "/stomach"),
+            ("Multiple GI issues", "/mild_digestive"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'fatigue_prompt': ResponseTemplate(
+        "😴 FATIGUE ASSESSMENT\n\n"
+        "I see you're feeling tired. Let me help assess this.\n\n"
+        "How long have you been feeling fatigued?\n"
+        "• Just today\n"
+        "• Few days\n"
+        "• More than a week\n"
+        "• Chronic (months)\n\n"
+        "Is it accompanied by:",
+        buttons=[
+            ("Just tired, no other symptoms", "/mild_fatigue"),
+            ("With body aches", "/fatigue_with_aches"),
+            ("With fever", "/fatigue_with_fever"),
+            ("With other symptoms", "/moderate_multiple"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'unwell_prompt': ResponseTemplate(
+        "🌡 I understand you're not feeling well.\n\n"
+        "How severe are your symptoms overall?",
+        buttons=[
+            ("Mild - can manage", "/mild_symptoms"),
+            ("Moderate - need help", "/moderate_symptoms"),
+            ("Severe - very unwell", "/severe_symptoms"),
+            ("Not sure", "/describe_symptoms"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'food_poisoning_symptoms': ResponseTemplate(
+        "🤠 FOOD POISONING\n\n"
+        "SYMPTOMS:\n"
+        "• Nausea/vomiting\n"
+        "• Diarrhea\n"
+        "• Stomach cramps\n"
+        "• Fever\n\n"
+        "RECOVERY:\n"
+        "• Rest\n"
+        "• Stay hydrated\n"
+        "• BRAT diet when ready",
+        buttons=[
+            ("Hydration guide", "/hydration_tips"),
+            ("When to worry", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'see_doctor_if': ResponseTemplate(
+        "👨‍⛕ SEE A DOCTOR IF:\n\n"
+        "• Symptoms persist >1 week\n"
+        "• Getting worse\n"
+        "• Fever >39°C\n"
+        "• Unexplained weight loss\n"
+        "• Blood in urine/stool\n"
+        "• Persistent pain\n"
+        "• Breathing difficulties\n\n"
+        "Trust your instincts",
+        buttons=[
+            ("Book appointment", "/schedule_appointment"),
+            ("Call 111", "/call_111"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'headache_diary_log': ResponseTemplate(
+        "📓 HEADACHE DIARY\n\n"
+        "TRACK:\n"
+        "• Date/time\n"
+        "• Location of pain\n"
+        "• Severity (1-10)\n"
+        "• Triggers\n"
+        "• What helped\n\n"
+        "Share with your GP",
+        buttons=[
+            ("Start tracking", "/start_diary"),
+            ("Headache types", "/headache_types"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'urgent_care_options': ResponseTemplate(
+        "🏥 URGENT CARE OPTIONS\n\n"
+        "1. Walk-in Centre (8am-8pm)\n"
+        "2. Minor Injuries Unit\n"
+        "3. GP Out-of-hours\n"
+        "4. NHS 111 Service\n\n"
+        "No appointment needed",
+        buttons=[
+            ("Find nearest", "/find_urgent_care"),
+            ("Call 111", "/call_111"),
+            ("Go to A&E", "/go_to_ae"),
+        ],
+    ),
+    'type_symptoms': ResponseTemplate(
+        "Please type your symptoms in your own words. Describe:\n"
+        "- What you're feeling\n"
+        "- When it started\n"
+        "- How severe it is\n"
+        "- Any other relevant details",
+    ),
+    'no_appointments_to_cancel': ResponseTemplate(
+        "No appointments to cancel.",
+        buttons=[
+            ("Schedule appointment", "/schedule_appointment"),
+        ],
+    ),
+    'cancel_not_found': ResponseTemplate(
+        " Appointment not found. It may have been already cancelled.",
+    ),
+    'no_appointments_found': ResponseTemplate(
+        "No appointments found.",
+    ),
+    'reschedule_not_found': ResponseTemplate(
+        " Appointment not found.",
+    ),
+    'no_appointments_to_reschedule': ResponseTemplate(
+        "No appointments to reschedule.",
+    ),
+    'no_reschedule_selected': ResponseTemplate(
+        " No appointment selected for rescheduling.",
+    ),
+    'no_appointments_scheduled': ResponseTemplate(
+        " No appointments scheduled.\n\n"
+        "Would you like to schedule one?",
+        buttons=[
+            ("Schedule appointment", "/schedule_appointment"),
+        ],
+    ),
+    'schedule_appointment': ResponseTemplate(
+        " APPOINTMENT SCHEDULING\n\n"
+        "Available slots:\n"
+        "• Today 4:30 PM\n"
+        "• Tomorrow 9:00 AM\n"
+        "• Tomorrow 2:00 PM\n\n"
+        "Please select your preferred time:",
+        buttons=[
+            ("Today 4:30 PM", "/book_today_430pm"),
+            ("Tomorrow 9:00 AM", "/book_tomorrow_9am"),
+            ("Tomorrow 2:00 PM", "/book_tomorrow_2pm"),
+            (" Open Calendar", "/open_calendar"),
+        ],
+    ),
+    'ask_first_name': ResponseTemplate(
+        "Great! I'll help you book an appointment for {date} at {time}.\n\n"
+        "Please provide your first name:",
+    ),
+    'appointment_confirmed': ResponseTemplate(
+        " APPOINTMENT CONFIRMED\n\n"
+        "Patient: {patient_name} {patient_surname}\n"
+        "Phone: {patient_phone}\n"
+        "Confirmation: {confirmation}\n"
+        "Department: {department}\n"
+        "Doctor: {doctor}\n"
+        "Date: {date} at {time}\n"
+        "Location: Main Clinic, Building A\n\n"
+        "Please arrive 15 minutes early and bring:\n"
+        "• Photo ID\n"
+        "• Insurance card\n"
+        "• List of current medications\n\n"
+        "To cancel or reschedule, reference your confirmation number: {confirmation}",
+        buttons=[
+            ("View my appointments", "/view_appointments"),
+            (" Open calendar", "/open_calendar"),
+            ("Start new conversation", "/greet"),
+        ],
+    ),
+    'appointment_cancelled': ResponseTemplate(
+        " APPOINTMENT CANCELLED\n\n"
+        "Cancelled: {date} at {time}\n"
+        "Doctor: {doctor}\n"
+        "Confirmation: {id}\n\n"
+        "Would you like to reschedule?",
+        buttons=[
+            ("Schedule new appointment", "/schedule_appointment"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'selected_appointment_cancelled': ResponseTemplate(
+        " APPOINTMENT CANCELLED\n\n"
+        "Cancelled: {date} at {time}\n"
+        "Doctor: {doctor}\n"
+        "Confirmation: {id}\n\n"
+        "Would you like to reschedule?",
+        buttons=[
+            ("Schedule new appointment", "/schedule_appointment"),
+            ("View my appointments", "/view_appointments"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'which_appointment_to_cancel': ResponseTemplate(
+        " WHICH APPOINTMENT TO CANCEL?\n\n"
+        "{appointments}",
+    ),
+    'slot_unavailable': ResponseTemplate(
+        " SLOT UNAVAILABLE\n\n"
+        "No {department} doctor is free on {date} at {time}.\n\n"
+        "Please select another time:",
+    ),
+    'reschedule_slot_unavailable': ResponseTemplate(
+        " SLOT UNAVAILABLE\n\n"
+        "{doctor} is not free on {date} at {time}.\n\n"
+        "Select new time:",
+        buttons=[
+            ("Today 4:30 PM", "/reschedule_today_430pm"),
+            ("Tomorrow 9:00 AM", "/reschedule_tomorrow_9am"),
+            ("Tomorrow 2:00 PM", "/reschedule_tomorrow_2pm"),
+        ],
+    ),
+    'rescheduling_appointment': ResponseTemplate(
+        " RESCHEDULING APPOINTMENT\n\n"
+        "Current: {date} at {time}\n"
+        "Doctor: {doctor}\n\n"
+        "Select new time:",
+        buttons=[
+            ("Today 4:30 PM", "/reschedule_today_430pm"),
+            ("Tomorrow 9:00 AM", "/reschedule_tomorrow_9am"),
+            ("Tomorrow 2:00 PM", "/reschedule_tomorrow_2pm"),
+        ],
+    ),
+    'appointment_rescheduled': ResponseTemplate(
+        " APPOINTMENT RESCHEDULED\n\n"
+        "Old time: {old_time}\n"
+        "New time: {date} at {time}\n"
+        "Department: {department}\n"
+        "Doctor: {doctor}\n"
+        "Confirmation: {id}",
+        buttons=[
+            ("View my appointments", "/view_appointments"),
+            ("Start new conversation", "/greet"),
+        ],
+    ),
+    'your_appointments': ResponseTemplate(
+        " YOUR APPOINTMENTS:\n\n"
+        "{appointments}",
+        buttons=[
+            ("Cancel appointment", "/cancel_appointment"),
+            ("Add new appointment", "/schedule_appointment"),
+        ],
+    ),
+    'add_to_calendar': ResponseTemplate(
+        " ADD TO CALENDAR\n\n"
+        "Copy these details:\n\n"
+        "Event: Medical Appointment\n"
+        "Date: {date}\n"
+        "Time: {time}\n"
+        "Doctor: {doctor}\n\n"
+        "SET REMINDERS:\n"
+        "• 1 day before\n"
+        "• 2 hours before",
+        buttons=[
+            ("View appointment", "/view_appointments"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'self_care_cold': ResponseTemplate(
+        "🤧 COLD & FLU SELF-CARE\n\n"
+        " RECOMMENDED ACTIONS:\n\n"
+        "💊 MEDICATION:\n"
+        "• Paracetamol for fever/pain (max 4g daily)\n"
+        "• Ibuprofen for inflammation (with food)\n"
+        "• Throat lozenges for sore throat\n"
+        "• Decongestants for blocked nose\n\n"
+        "🏠 HOME REMEDIES:\n"
+        "• Warm salt water gargle (3x daily)\n"
+        "• Steam inhalation with eucalyptus\n"
+        "• Honey and lemon in warm water\n"
+        "• Chicken soup for nutrition\n\n"
+        "💧 HYDRATION:\n"
+        "• 2-3 liters of fluids daily\n"
+        "• Warm herbal teas\n"
+        "• Avoid alcohol completely\n\n"
+        "🛌 REST:\n"
+        "• Sleep 8-10 hours\n"
+        "• Stay home from work/school\n"
+        "• Avoid spreading to others\n\n"
+        " SEE DOCTOR IF:\n"
+        "• Fever >39°C for 3+ days\n"
+        "• Difficulty breathing\n"
+        "• Chest pain or pressure\n"
+        "• Severe headache or confusion",
+        buttons=[
+            ("Track my symptoms", "/symptom_tracker"),
+            ("When to see doctor", "/when_to_see_doctor"),
+            ("Book appointment", "/schedule_appointment"),
+        ],
+    ),
+    'self_care_headache': ResponseTemplate(
+        "🤕 HEADACHE SELF-CARE\n\n"
+        " IMMEDIATE RELIEF:\n\n"
+        "💊 MEDICATION:\n"
+        "• Paracetamol 1g (first choice)\n"
+        "• Ibuprofen 400mg (if needed)\n"
+        "• Aspirin 900mg (alternative)\n"
+        "• Avoid overuse (max 10 days/month)\n\n"
+        "🏠 NON-DRUG RELIEF:\n"
+        "• Apply cold compress to head/neck\n"
+        "• Rest in dark, quiet room\n"
+        "• Gentle neck stretches\n"
+        "• Scalp/temple massage\n\n"
+        "💧 LIFESTYLE:\n"
+        "• Drink 2L water immediately\n"
+        "• Regular meal times\n"
+        "• Limit screen time\n"
+        "• Avoid bright lights\n\n"
+        "😴 PREVENTION:\n"
+        "• Sleep 7-9 hours nightly\n"
+        "• Manage stress levels\n"
+        "• Regular exercise\n"
+        "• Identify triggers\n\n"
+        " SEEK HELP IF:\n"
+        "• Sudden, severe headache\n"
+        "• With fever and stiff neck\n"
+        "• Vision changes\n"
+        "• After head injury",
+        buttons=[
+            ("Headache diary", "/headache_diary"),
+            ("Migraine assessment", "/migraine_check"),
+            ("Book appointment", "/schedule_appointment"),
+        ],
+    ),
+    'self_care_stomach': ResponseTemplate(
+        "🤢 STOMACH UPSET SELF-CARE\n\n"
+        " RELIEF MEASURES:\n\n"
+        "🍽 DIET (BRAT):\n"
+        "• Bananas (potassium)\n"
+        "• Rice (plain, white)\n"
+        "• Applesauce (pectin)\n"
+        "• Toast (dry, plain)\n\n"
+        "💊 MEDICATION:\n"
+        "• Antacids for heartburn\n"
+        "• Buscopan for cramps\n"
+        "• Imodium for diarrhea\n"
+        "• Avoid NSAIDs\n\n"
+        "💧 HYDRATION:\n"
+        "• Small, frequent sips\n"
+        "• Electrolyte solutions\n"
+        "• Ginger or peppermint tea\n"
+        "• Avoid dairy products\n\n"
+        "🚫 AVOID:\n"
+        "• Fatty/fried foods\n"
+        "• Spicy foods\n"
+        "• Caffeine & alcohol\n"
+        "• Large meals\n\n"
+        " SEE DOCTOR IF:\n"
+        "• Blood in vomit/stool\n"
+        "• Severe dehydration\n"
+        "• Pain lasting >24 hours\n"
+        "• High fever (>38.5°C)",
+        buttons=[
+            ("Food poisoning info", "/food_poisoning"),
+            ("When to see doctor", "/when_to_see_doctor"),
+            ("Book appointment", "/schedule_appointment"),
+        ],
+    ),
+    'self_care_back': ResponseTemplate(
+        "🔙 BACK PAIN SELF-CARE\n\n"
+        " PAIN MANAGEMENT:\n\n"
+        "💊 MEDICATION:\n"
+        "• Ibuprofen 400mg (3x daily with food)\n"
+        "• Paracetamol 1g (4x daily max)\n"
+        "• Topical heat/cold gel\n"
+        "• Muscle relaxants (if prescribed)\n\n"
+        "🏃 MOVEMENT:\n"
+        "• Stay active - bed rest delays recovery\n"
+        "• Gentle stretching exercises\n"
+        "• Walking 10-15 minutes hourly\n"
+        "• Swimming if possible\n\n"
+        "🔥❄ TEMPERATURE THERAPY:\n"
+        "• Ice first 48 hours (20 min sessions)\n"
+        "• Heat after 48 hours\n"
+        "• Warm baths with Epsom salt\n"
+        "• Alternating hot/cold\n\n"
+        "😴 SLEEPING POSITION:\n"
+        "• Side: pillow between knees\n"
+        "• Back: pillow under knees\n"
+        "• Avoid stomach sleeping\n"
+        "• Firm mattress support\n\n"
+        " RED FLAGS - A&E NOW:\n"
+        "• Loss of bladder/bowel control\n"
+        "• Leg weakness or numbness\n"
+        "• Severe pain at night\n"
+        "• After significant trauma",
+        buttons=[
+            ("Back exercises", "/back_exercises"),
+            ("Physiotherapy referral", "/physio_referral"),
+            ("Book appointment", "/schedule_appointment"),
+        ],
+    ),
+    'self_care_options': ResponseTemplate(
+        "🏠 SELF-CARE OPTIONS\n\n"
+        "Select specific guidance for your condition:\n\n"
+        "Common conditions we can help with:\n"
+        "• Cold & flu symptoms\n"
+        "• Headaches & migraines\n"
+        "• Stomach upset & nausea\n"
+        "• Back pain & muscle aches\n\n"
+        "Or choose general self-care advice below.",
+        buttons=[
+            ("Cold & flu care", "/self_care_cold"),
+            ("Headache relief", "/self_care_headache"),
+            ("Stomach upset", "/self_care_stomach"),
+            ("Back pain help", "/self_care_back"),
+        ],
+    ),
+    'self_care_general': ResponseTemplate(
+        "📋 GENERAL SELF-CARE GUIDELINES\n\n"
+        "💊 SAFE MEDICATION USE:\n"
+        "• Read labels carefully\n"
+        "• Don't exceed recommended doses\n"
+        "• Check drug interactions\n"
+        "• Keep medication list updated\n\n"
+        "💧 HYDRATION:\n"
+        "• 8-10 glasses water daily\n"
+        "• More if fever/vomiting\n"
+        "• Clear fluids preferred\n\n"
+        "🛌 REST & RECOVERY:\n"
+        "• 7-9 hours sleep\n"
+        "• Take time off if needed\n"
+        "• Gradual return to activity\n\n"
+        "🌡 MONITORING:\n"
+        "• Keep symptom diary\n"
+        "• Check temperature 2x daily\n"
+        "• Note any changes\n\n"
+        " Seek medical help if symptoms worsen or persist!",
+        buttons=[
+            ("When to see doctor", "/when_to_see_doctor"),
+            ("Schedule appointment", "/schedule_appointment"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'describe_symptoms': ResponseTemplate(
+        "📋 SYMPTOM ASSESSMENT\n\n"
+        "Please describe your symptoms. I can help with:\n\n"
+        "• Pain (head, chest, stomach, back)\n"
+        "• Respiratory (cough, breathing issues)\n"
+        "• Fever/chills\n"
+        "• Nausea/vomiting\n"
+        "• Dizziness/fatigue\n"
+        "• Rash/skin issues\n\n"
+        "Tell me:\n"
+        "1. What symptoms are you experiencing?\n"
+        "2. How long have you had them?\n"
+        "3. Rate severity (1-10)\n"
+        "4. Any other symptoms?",
+        buttons=[
+            ("Mild symptoms", "/mild_symptoms"),
+            ("Moderate symptoms", "/moderate_symptoms"),
+            ("Severe symptoms", "/severe_symptoms"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'mild_symptoms': ResponseTemplate(
+        "🟢 MILD SYMPTOMS ASSESSMENT\n\n"
+        "Let me help you determine the best care approach.\n\n"
+        "What type of mild symptoms are you experiencing?\n\n"
+        "Common mild symptoms:\n"
+        "• Runny nose / congestion\n"
+        "• Mild headache\n"
+        "• Sore throat\n"
+        "• Minor aches and pains\n"
+        "• Mild fatigue\n"
+        "• Low-grade fever (<100.4°F)\n\n"
+        "How long have you had these symptoms?",
+        buttons=[
+            ("Cold/flu symptoms", "/mild_cold_flu"),
+            ("Mild headache", "/mild_headache"),
+            ("Minor digestive issues", "/mild_digestive"),
+            ("General fatigue", "/mild_fatigue"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'mild_cold_flu': ResponseTemplate(
+        "🤧 MILD COLD/FLU CARE\n\n"
+        "Your symptoms suggest a common cold or mild flu.\n\n"
+        "HOME CARE PLAN:\n\n"
+        "💊 Medications:\n"
+        "• Acetaminophen for fever/aches\n"
+        "• Decongestants for stuffy nose\n"
+        "• Throat lozenges for sore throat\n\n"
+        "🏠 Self-care:\n"
+        "• Rest - get 8+ hours sleep\n"
+        "• Fluids - drink warm tea, soup\n"
+        "• Steam inhalation for congestion\n"
+        "• Wash hands frequently\n\n"
+        " See doctor if:\n"
+        "• Fever > 103°F for 3+ days\n"
+        "• Difficulty breathing\n"
+        "• Chest pain\n"
+        "• Symptoms worsen after 7 days",
+        buttons=[
+            ("More self-care tips", "/self_care"),
+            ("When to see doctor", "/when_to_see_doctor"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'mild_digestive': ResponseTemplate(
+        "🤢 MILD DIGESTIVE ISSUES\n\n"
+        "Common digestive discomfort management:\n\n"
+        "IMMEDIATE RELIEF:\n"
+        "• Small sips of water\n"
+        "• Ginger tea or peppermint tea\n"
+        "• BRAT diet (Bananas, Rice, Applesauce, Toast)\n"
+        "• Avoid fatty/spicy foods\n\n"
+        "MEDICATIONS:\n"
+        "• Antacids for heartburn\n"
+        "• Simethicone for gas\n"
+        "• Loperamide for diarrhea\n\n"
+        " See doctor if:\n"
+        "• Blood in stool/vomit\n"
+        "• Severe dehydration\n"
+        "• Pain lasting > 24 hours\n"
+        "• Fever with symptoms",
+        buttons=[
+            ("Hydration tips", "/hydration_tips"),
+            ("When to worry", "/when_to_see_doctor"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'mild_fatigue': ResponseTemplate(
+        "😴 MILD FATIGUE ASSESSMENT\n\n"
+        "Fatigue can have many causes. Let's explore:\n\n"
+        "LIFESTYLE FACTORS:\n"
+        "• Sleep: Are you getting 7-9 hours?\n"
+        "• Hydration: Drinking enough water?\n"
+        "• Diet: Eating balanced meals?\n"
+        "• Exercise: Too much or too little?\n\n"
+        "SELF-CARE PLAN:\n"
+        "• Maintain regular sleep schedule\n"
+        "• Limit caffeine after 2 PM\n"
+        "• Take short walks\n"
+        "• Manage stress\n\n"
+        " See doctor if:\n"
+        "• Fatigue > 2 weeks\n"
+        "• With unexplained weight loss\n"
+        "• With fever or pain\n"
+        "• Affecting daily life",
+        buttons=[
+            ("Sleep hygiene tips", "/sleep_tips"),
+            ("Energy boosting tips", "/energy_tips"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'mild_headache': ResponseTemplate(
+        "🤕 MILD HEADACHE MANAGEMENT\n\n"
+        "Most mild headaches can be managed at home.\n\n"
+        "IMMEDIATE RELIEF:\n"
+        "• Take ibuprofen or acetaminophen\n"
+        "• Apply cold compress to head\n"
+        "• Rest in dark, quiet room\n"
+        "• Stay hydrated\n\n"
+        "COMMON TRIGGERS TO AVOID:\n"
+        "• Dehydration\n"
+        "• Eye strain (screens)\n"
+        "• Poor posture\n"
+        "• Stress\n"
+        "• Skipping meals\n\n"
+        " Seek care if:\n"
+        "• Sudden severe headache\n"
+        "• With fever and stiff neck\n"
+        "• After head injury\n"
+        "• Vision changes",
+        buttons=[
+            ("Track symptoms", "/symptom_diary"),
+            ("Relaxation techniques", "/relaxation"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'moderate_breathing': ResponseTemplate(
+        "🫁 MODERATE BREATHING CONCERNS\n\n"
+        "Breathing issues need careful monitoring.\n\n"
+        "ASSESSMENT:\n"
+        "• Can you walk and talk normally?\n"
+        "• Is it worse with activity?\n"
+        "• Any wheezing or coughing?\n"
+        "• History of asthma/allergies?\n\n"
+        "IMMEDIATE ACTIONS:\n"
+        "• Sit upright\n"
+        "• Use inhaler if prescribed\n"
+        "• Avoid triggers (smoke, allergens)\n"
+        "• Monitor oxygen if available\n\n"
+        "SEE DOCTOR TODAY if:\n"
+        "• Not improving with rest\n"
+        "• New onset without clear cause\n"
+        "• With chest pain or fever",
+        buttons=[
+            ("Book urgent appointment", "/schedule_appointment"),
+            ("Breathing exercises", "/breathing_exercises"),
+            ("When to call 911", "/emergency_signs"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'moderate_multiple': ResponseTemplate(
+        "📋 MULTIPLE SYMPTOMS ASSESSMENT\n\n"
+        "Having several symptoms may indicate systemic illness.\n\n"
+        "PLEASE LIST YOUR SYMPTOMS:\n"
+        "Type all symptoms you're experiencing\n"
+        "(e.g., fever, headache, cough, fatigue)\n\n"
+        "IMPORTANT TO NOTE:\n"
+        "• When symptoms started\n"
+        "• Order of appearance\n"
+        "• Severity of each (1-10)\n"
+        "• What makes better/worse\n\n"
+        "Multiple symptoms often need medical evaluation\n"
+        "to rule out infection or other conditions.",
+        buttons=[
+            ("See doctor today", "/schedule_appointment"),
+            ("Speak to nurse now", "/nurse"),
+            ("Emergency signs", "/emergency_signs"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'moderate_symptoms': ResponseTemplate(
+        "🟡 MODERATE SYMPTOMS ASSESSMENT\n\n"
+        "Your symptoms need careful evaluation.\n\n"
+        "Which best describes your condition?\n\n"
+        "🔸 PERSISTENT SYMPTOMS:\n"
+        "• Symptoms lasting 3-7 days\n"
+        "• Not improving with self-care\n"
+        "• Moderate pain (4-6/10)\n\n"
+        "🔸 WORSENING SYMPTOMS:\n"
+        "• Started mild, getting worse\n"
+        "• New symptoms developing\n"
+        "• Interfering with daily activities\n\n"
+        "🔸 CONCERNING SIGNS:\n"
+        "• Moderate fever (101-103°F)\n"
+        "• Persistent cough\n"
+        "• Moderate breathing difficulty",
+        buttons=[
+            ("Persistent fever/infection", "/moderate_infection"),
+            ("Worsening pain", "/moderate_pain"),
+            ("Breathing concerns", "/moderate_breathing"),
+            ("Multiple symptoms", "/moderate_multiple"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'moderate_infection': ResponseTemplate(
+        "🦠 MODERATE INFECTION ASSESSMENT\n\n"
+        "Your symptoms suggest possible infection needing treatment.\n\n"
+        "RECOMMENDATION: See doctor within 24 hours\n\n"
+        "Why you need medical care:\n"
+        "• May need antibiotics\n"
+        "• Risk of complications\n"
+        "• Need proper diagnosis\n\n"
+        "Meanwhile:\n"
+        "• Continue fever management\n"
+        "• Stay hydrated\n"
+        "• Rest completely\n"
+        "• Isolate from others\n\n"
+        " Go to ER if:\n"
+        "• Fever > 104°F\n"
+        "• Difficulty breathing\n"
+        "• Confusion\n"
+        "• Severe dehydration",
+        buttons=[
+            ("Book urgent appointment", "/schedule_appointment"),
+            ("Find walk-in clinic", "/urgent_care"),
+            ("Video consultation", "/telemedicine"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'moderate_pain': ResponseTemplate(
+        "😰 MODERATE PAIN EVALUATION\n\n"
+        "Pain that's worsening needs medical attention.\n\n"
+        "PAIN ASSESSMENT:\n"
+        "Please rate your pain level below:\n\n"
+        "IMMEDIATE STEPS:\n"
+        "1. Take prescribed pain medication\n"
+        "2. Apply ice/heat as appropriate\n"
+        "3. Rest affected area\n"
+        "4. Document pain patterns\n\n"
+        "SEE DOCTOR TODAY IF:\n"
+        "• Pain increasing despite medication\n"
+        "• New numbness or tingling\n"
+        "• Swelling or redness\n"
+        "• Can't perform daily tasks",
+        buttons=[
+            ("Book same-day appointment", "/schedule_appointment"),
+            ("Pain management tips", "/pain_management"),
+            ("Speak to nurse", "/nurse"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'severe_symptoms': ResponseTemplate(
+        " SEVERE SYMPTOMS - DETAILED ASSESSMENT\n\n"
+        "I need to ask you some important questions to determine the right care:\n\n"
+        "Which of these are you experiencing?\n\n"
+        "🔴 EMERGENCY SYMPTOMS:\n"
+        "• Chest pain or pressure\n"
+        "• Difficulty breathing\n"
+        "• Loss of consciousness\n"
+        "• Severe bleeding\n\n"
+        "🟡 URGENT SYMPTOMS:\n"
+        "• Severe pain (8-10/10)\n"
+        "• High fever (>103°F)\n"
+        "• Persistent vomiting\n"
+        "• Confusion or disorientation\n\n"
+        "Please select your primary symptom:",
+        buttons=[
+            ("Chest pain", "/chest_pain"),
+            ("Breathing difficulty", "/breathing_difficulty"),
+            ("Severe pain", "/severe_pain"),
+            ("High fever", "/high_fever"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'chest_pain': ResponseTemplate(
+        "🔴 CHEST PAIN ASSESSMENT\n\n"
+        "This could be serious. Please answer:\n\n"
+        "How long have you had chest pain?\n"
+        "• Just started (< 15 minutes)\n"
+        "• Less than 1 hour\n"
+        "• Several hours\n"
+        "• More than a day\n\n"
+        "What does it feel like?\n"
+        "• Crushing/pressure\n"
+        "• Sharp/stabbing\n"
+        "• Burning sensation\n\n"
+        "Associated symptoms?\n"
+        "• Shortness of breath\n"
+        "• Sweating\n"
+        "• Nausea\n"
+        "• Pain in arm/jaw",
+        buttons=[
+            ("It's crushing with sweating", "/emergency_chest_pain"),
+            ("Sharp when breathing", "/pleuritic_pain"),
+            ("Burning after eating", "/gerd_pain"),
+            ("I'm not sure", "/unsure_chest_pain"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'emergency_chest_pain': ResponseTemplate(
+        " EMERGENCY - POSSIBLE HEART ATTACK\n\n"
+        "CALL 911 IMMEDIATELY!\n\n"
+        "While waiting for ambulance:\n"
+        "1. Chew aspirin (325mg) if available\n"
+        "2. Sit upright, stay calm\n"
+        "3. Unlock your door\n"
+        "4. Have someone wait outside\n\n"
+        "Do NOT drive yourself!\n\n"
+        "If symptoms worsen, call 911 again.",
+        buttons=[
+            ("Call 911 now", "/call_911"),
+            ("I called 911", "/called_911"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'pleuritic_pain': ResponseTemplate(
+        "📋 PLEURITIC CHEST PAIN\n\n"
+        "Your pain pattern suggests possible:\n"
+        "• Pleurisy (lung lining inflammation)\n"
+        "• Muscle strain\n"
+        "• Rib injury\n\n"
+        "Recommendation: See doctor TODAY\n\n"
+        "Go to ER if:\n"
+        "• Sudden severe shortness of breath\n"
+        "• Coughing blood\n"
+        "• Fever > 103°F\n"
+        "• Pain worsens rapidly\n\n"
+        "Meanwhile:\n"
+        "• Rest\n"
+        "• Anti-inflammatory medicine\n"
+        "• Monitor breathing",
+        buttons=[
+            ("Book urgent appointment", "/schedule_appointment"),
+            ("Find urgent care", "/urgent_care"),
+            ("Speak to nurse", "/nurse"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'gerd_pain': ResponseTemplate(
+        "💊 LIKELY HEARTBURN/GERD\n\n"
+        "Your symptoms suggest acid reflux.\n\n"
+        "Try these immediately:\n"
+        "• Antacids (Tums, Mylanta)\n"
+        "• Sit upright\n"
+        "• Loosen tight clothing\n"
+        "• Sip water slowly\n\n"
+        "See doctor if:\n"
+        "• Pain doesn't improve in 30 min\n"
+        "• Frequent episodes (>2x/week)\n"
+        "• Difficulty swallowing\n"
+        "• Unexplained weight loss\n\n"
+        "Avoid:\n"
+        "• Lying down\n"
+        "• Spicy/acidic foods\n"
+        "• Coffee and alcohol",
+        buttons=[
+            ("Book GP appointment", "/schedule_appointment"),
+            ("Self-care tips", "/self_care"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'breathing_difficulty': ResponseTemplate(
+        "🫁 BREATHING ASSESSMENT\n\n"
+        "How severe is your breathing difficulty?\n\n"
+        "Can you:\n"
+        "• Speak in full sentences?\n"
+        "• Walk across the room?\n"
+        "• Lie flat?\n\n"
+        "When did it start?\n"
+        "• Suddenly (minutes ago)\n"
+        "• Gradually (hours/days)\n\n"
+        "Associated symptoms:\n"
+        "• Chest pain?\n"
+        "• Wheezing?\n"
+        "• Fever?\n"
+        "• Swollen legs?",
+        buttons=[
+            ("Can't speak full sentences", "/emergency_breathing"),
+            ("Wheezing, known asthma", "/asthma_attack"),
+            ("Gradual with fever", "/respiratory_infection"),
+            ("Anxiety/panic feeling", "/anxiety_breathing"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'emergency_breathing': ResponseTemplate(
+        " EMERGENCY - SEVERE BREATHING DIFFICULTY\n\n"
+        "CALL 911 NOW!\n\n"
+        "While waiting:\n"
+        "• Sit upright, lean forward\n"
+        "• Use rescue inhaler if you have one\n"
+        "• Stay calm, breathe slowly\n"
+        "• Open windows for fresh air\n"
+        "• Loosen tight clothing\n\n"
+        "Someone should stay with you!",
+        buttons=[
+            ("Call 911", "/call_911"),
+            ("I called 911", "/called_911"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'respiratory_infection': ResponseTemplate(
+        "🦠 RESPIRATORY INFECTION ASSESSMENT\n\n"
+        "Gradual breathing difficulty with fever suggests possible:\n"
+        "• Pneumonia\n"
+        "• Bronchitis\n"
+        "• Severe flu\n\n"
+        "⚠️ SEE DOCTOR TODAY if:\n"
+        "• Fever > 101°F (38.3°C)\n"
+        "• Breathing getting worse\n"
+        "• Coughing up colored mucus\n"
+        "• Chest pain when breathing\n\n"
+        "IMMEDIATE CARE:\n"
+        "• Rest and stay hydrated\n"
+        "• Monitor temperature\n"
+        "• Use humidifier\n"
+        "• Avoid cold air\n\n"
+        "What would you like to do?",
+        buttons=[
+            ("Book urgent GP appointment", "/urgent_appointment"),
+            ("Self-care advice", "/respiratory_self_care"),
+            ("When to go to A&E", "/respiratory_emergency_signs"),
+            ("Speak to nurse", "/nurse"),
+        ],
+    ),
+    'respiratory_self_care': ResponseTemplate(
+        "🏠 RESPIRATORY INFECTION SELF-CARE\n\n"
+        "HYDRATION:\n"
+        "• Drink 8-10 glasses of fluids daily\n"
+        "• Warm liquids (tea, soup, broth)\n"
+        "• Avoid alcohol and caffeine\n\n"
+        "BREATHING SUPPORT:\n"
+        "• Use humidifier or steam inhalation\n"
+        "• Sleep with head elevated\n"
+        "• Practice deep breathing exercises\n\n"
+        "REST:\n"
+        "• Stay home from work/school\n"
+        "• Sleep 8-10 hours\n"
+        "• Avoid strenuous activity\n\n"
+        "FEVER MANAGEMENT:\n"
+        "• Paracetamol/Ibuprofen as directed\n"
+        "• Cool compress on forehead\n"
+        "• Monitor temperature 2x daily",
+        buttons=[
+            ("Book GP appointment", "/schedule_appointment"),
+            ("When to seek emergency care", "/respiratory_emergency_signs"),
+            ("Main menu", "/main_menu"),
+        ],
+    ),
+    'respiratory_emergency_signs': ResponseTemplate(
+        "🚨 GO TO A&E IMMEDIATELY IF:\n\n"
+        "SEVERE BREATHING:\n"
+        "• Can't speak full sentences\n"
+        "• Gasping for air\n"
+        "• Blue lips or face\n"
+        "• Chest pulling in with breaths\n\n"
+        "HIGH FEVER:\n"
+        "• Temperature > 104°F (40°C)\n"
+        "• Fever with severe headache\n"
+        "• Stiff neck + confusion\n\n"
+        "OTHER RED FLAGS:\n"
+        "• Coughing up blood\n"
+        "• Severe chest pain\n"
+        "• Drowsiness/confusion\n"
+        "• Can't keep fluids down\n\n"
+        "CALL 999 if any of the above!",
+        buttons=[
+            ("Find nearest A&E", "/find_ae"),
+            ("Call 999", "/call_999"),
+            ("Speak to nurse now", "/nurse"),
+        ],
+    ),
+    'severe_pain': ResponseTemplate(
+        "😣 SEVERE PAIN ASSESSMENT\n\n"
+        "Where is your severe pain located?\n\n"
+        "Common areas:\n"
+        "• Head (severe headache)\n"
+        "• Abdomen (stomach area)\n"
+        "• Back (upper/lower)\n"
+        "• Joint/limb\n\n"
+        "Rate your pain (1-10):\n"
+        "• 7-8: Severe\n"
+        "• 9-10: Unbearable\n\n"
+        "How long have you had this pain?",
+        buttons=[
+            ("Severe headache", "/severe_headache"),
+            ("Severe abdominal", "/severe_abdominal"),
+            ("Severe back pain", "/severe_back"),
+            ("Other location", "/other_severe_pain"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'high_fever': ResponseTemplate(
+        "🌡 HIGH FEVER ASSESSMENT\n\n"
+        "Current temperature?\n"
+        "• 101-102°F: Moderate\n"
+        "• 103-104°F: High\n"
+        "• Above 104°F: Very high\n\n"
+        "Duration:\n"
+        "• Just started today\n"
+        "• 1-2 days\n"
+        "• More than 3 days\n\n"
+        "Other symptoms:\n"
+        "• Severe headache?\n"
+        "• Stiff neck?\n"
+        "• Confusion?\n"
+        "• Rash?\n"
+        "• Difficulty breathing?",
+        buttons=[
+            ("Fever with stiff neck", "/meningitis_concern"),
+            ("Above 104°F", "/very_high_fever"),
+            ("Fever 3+ days", "/persistent_fever"),
+            ("Fever with other symptoms", "/fever_with_symptoms"),
+            ("Type my symptoms", "/type_symptoms"),
+        ],
+    ),
+    'urgent_care': ResponseTemplate(
+        "🏥 URGENT CARE INFORMATION\n\n"
+        "Nearest Urgent Care Centers:\n\n"
+        "📍 MedExpress Urgent Care\n"
+        "   123 Main St • 0.5 miles\n"
+        "   Open until 9 PM\n\n"
+        "📍 CityMD Urgent Care\n"
+        "   456 Oak Ave • 1.2 miles\n"
+        "   Open 24/7\n\n"
+        "📍 MinuteClinic\n"
+        "   789 Pine Rd • 2.0 miles\n"
+        "   Open until 7 PM\n\n"
+        "Bring: ID, insurance card, medication list",
+        buttons=[
+            ("Get directions", "/directions"),
+            ("Call ahead", "/call_urgent_care"),
+        ],
+    ),
+    'symptom_tracker': ResponseTemplate(
+        "📊 SYMPTOM TRACKER\n\n"
+        "Let's track your symptoms over time:\n\n"
+        "📝 CURRENT SYMPTOMS:\n"
+        "Rate each symptom (0-10):\n"
+        "• Pain level: ___\n"
+        "• Fatigue: ___\n"
+        "• Nausea: ___\n"
+        "• Temperature: ___°C\n\n"
+        "⏰ TRACKING SCHEDULE:\n"
+        "• Morning (8 AM)\n"
+        "• Afternoon (2 PM)\n"
+        "• Evening (8 PM)\n\n"
+        "📈 PATTERNS TO WATCH:\n"
+        "• Worsening symptoms\n"
+        "• New symptoms appearing\n"
+        "• Symptoms not improving after 48h\n\n"
+        "💡 TIP: Keep a written log or use a health app",
+        buttons=[
+            ("Log symptoms now", "/log_symptoms"),
+            ("View my history", "/symptom_history"),
+            ("When to worry", "/when_to_see_doctor"),
+        ],
+    ),
+    'headache_diary': ResponseTemplate(
+        "📓 HEADACHE DIARY\n\n"
+        "Track your headaches to identify patterns:\n\n"
+        "📝 RECORD THESE DETAILS:\n"
+        "• Date and time started\n"
+        "• Duration (minutes/hours)\n"
+        "• Location (temples/forehead/back)\n"
+        "• Type (throbbing/sharp/dull)\n"
+        "• Severity (1-10 scale)\n\n"
+        "🔍 POTENTIAL TRIGGERS:\n"
+        "• Foods consumed\n"
+        "• Sleep quality\n"
+        "• Stress levels\n"
+        "• Weather changes\n"
+        "• Screen time\n"
+        "• Menstrual cycle\n\n"
+        "📊 AFTER 2 WEEKS:\n"
+        "Review patterns with your GP",
+        buttons=[
+            ("Start diary entry", "/log_headache"),
+            ("Common triggers", "/headache_triggers"),
+            ("Book GP appointment", "/schedule_appointment"),
+        ],
+    ),
+    'migraine_check': ResponseTemplate(
+        "🔍 MIGRAINE ASSESSMENT\n\n"
+        "Do you experience these symptoms?\n\n"
+        "⚡ MIGRAINE INDICATORS:\n"
+        "□ Moderate to severe pain\n"
+        "□ Throbbing or pulsing sensation\n"
+        "□ Usually one side of head\n"
+        "□ Nausea or vomiting\n"
+        "□ Sensitivity to light/sound\n"
+        "□ Visual disturbances (aura)\n\n"
+        "⏱ DURATION:\n"
+        "□ Lasts 4-72 hours\n"
+        "□ Worsens with physical activity\n\n"
+        "If you checked 3+ boxes, you may have migraines.\n\n"
+        "🏥 NEXT STEPS:\n"
+        "• See GP for diagnosis\n"
+        "• Consider preventive treatment\n"
+        "• Identify personal triggers",
+        buttons=[
+            ("Book GP appointment", "/schedule_appointment"),
+            ("Migraine treatments", "/migraine_treatment"),
+            ("Emergency signs", "/emergency_headache"),
+        ],
+    ),
+    'food_poisoning': ResponseTemplate(
+        "🦠 FOOD POISONING GUIDANCE\n\n"
+        "⏰ TYPICAL TIMELINE:\n"
+        "• Symptoms start: 1-72 hours after eating\n"
+        "• Duration: 24-48 hours usually\n"
+        "• Full recovery: 3-5 days\n\n"
+        " IMMEDIATE CARE:\n"
+        "• Stop eating solid food\n"
+        "• Sip water every 15 minutes\n"
+        "• Oral rehydration salts\n"
+        "• Rest completely\n\n"
+        " A&E IF:\n"
+        "• Blood in vomit/stool\n"
+        "• Signs of severe dehydration\n"
+        "• High fever (>38.5°C)\n"
+        "• Symptoms >48 hours\n"
+        "• Confusion or dizziness\n\n"
+        " Report to local health authority if suspect restaurant/takeaway",
+        buttons=[
+            ("Dehydration signs", "/dehydration_check"),
+            ("When to call 111", "/call_111"),
+            ("Recovery diet", "/recovery_diet"),
+        ],
+    ),
+    'back_exercises': ResponseTemplate(
+        "🤸 BACK PAIN EXERCISES\n\n"
+        " Stop if pain worsens!\n\n"
+        "🔄 GENTLE STRETCHES (hold 30 sec):\n\n"
+        "1⃣ KNEE TO CHEST:\n"
+        "• Lie on back\n"
+        "• Pull one knee to chest\n"
+        "• Repeat other side\n\n"
+        "2⃣ CAT-COW STRETCH:\n"
+        "• On hands and knees\n"
+        "• Arch and round back slowly\n\n"
+        "3⃣ CHILD'S POSE:\n"
+        "• Kneel and sit back on heels\n"
+        "• Reach arms forward\n\n"
+        "💪 STRENGTHENING (10 reps):\n"
+        "• Pelvic tilts\n"
+        "• Partial crunches\n"
+        "• Wall sits (30 seconds)\n\n"
+        " Do 2-3 times daily",
+        buttons=[
+            ("Video tutorials", "/exercise_videos"),
+            ("Physiotherapy", "/physio_referral"),
+            ("Pain still bad", "/persistent_back_pain"),
+        ],
+    ),
+    'physio_referral': ResponseTemplate(
+        "🏥 PHYSIOTHERAPY REFERRAL\n\n"
+        "OPTIONS FOR PHYSIOTHERAPY:\n\n"
+        "1⃣ NHS REFERRAL:\n"
+        "• See your GP first\n"
+        "• Waiting time: 4-12 weeks\n"
+        "• Free at point of care\n\n"
+        "2⃣ SELF-REFERRAL (some areas):\n"
+        "• Direct booking available\n"
+        "• Check local NHS website\n"
+        "• Usually faster access\n\n"
+        "3⃣ PRIVATE PHYSIO:\n"
+        "• No referral needed\n"
+        "• Cost: £40-80 per session\n"
+        "• Immediate availability\n\n"
+        "📋 BRING TO FIRST APPOINTMENT:\n"
+        "• Pain diary\n"
+        "• List of medications\n"
+        "• Previous scan results",
+        buttons=[
+            ("Book GP for referral", "/schedule_appointment"),
+            ("Find local physio", "/find_physio"),
+            ("What to expect", "/physio_info"),
+        ],
+    ),
+    'pain_mild': ResponseTemplate(
+        " MILD PAIN (1-3/10)\n\n"
+        "Good news - your pain is manageable.\n\n"
+        "SELF-CARE RECOMMENDATIONS:\n"
+        "• Rest the affected area\n"
+        "• Apply ice for 20 minutes\n"
+        "• Take OTC pain relief (as directed)\n"
+        "• Gentle stretching\n\n"
+        "MONITOR FOR:\n"
+        "• Pain increasing\n"
+        "• New symptoms\n"
+        "• Swelling or redness\n\n"
+        "Usually resolves in 2-3 days with care.",
+        buttons=[
+            ("Pain management tips", "/pain_management"),
+            ("When to see doctor", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'pain_moderate': ResponseTemplate(
+        " MODERATE PAIN (4-6/10)\n\n"
+        "This level needs attention.\n\n"
+        "IMMEDIATE ACTIONS:\n"
+        "• Take prescribed pain medication\n"
+        "• Alternate ice and heat\n"
+        "• Limit activity\n"
+        "• Document when pain is worst\n\n"
+        "SEE GP WITHIN 48 HOURS IF:\n"
+        "• Not improving after 2 days\n"
+        "• Affecting sleep\n"
+        "• Limiting daily activities\n\n"
+        "Consider booking an appointment.",
+        buttons=[
+            ("Book GP appointment", "/schedule_appointment"),
+            ("Pain relief options", "/pain_management"),
+            ("Call 111 advice", "/call_111"),
+        ],
+    ),
+    'pain_severe': ResponseTemplate(
+        "🔴 SEVERE PAIN (7-8/10)\n\n"
+        "This requires medical attention TODAY.\n\n"
+        "IMMEDIATE STEPS:\n"
+        "1. Take maximum safe dose of pain relief\n"
+        "2. Call GP for same-day appointment\n"
+        "3. If unavailable, go to urgent care\n\n"
+        "GO TO A&E IF:\n"
+        "• Sudden onset severe pain\n"
+        "• With fever or vomiting\n"
+        "• After injury or fall\n"
+        "• Chest, abdomen or head pain\n\n"
+        "Don't wait if pain is unbearable.",
+        buttons=[
+            ("Book urgent appointment", "/urgent_appointment"),
+            ("Find urgent care", "/urgent_care"),
+            ("Call 111 now", "/call_111"),
+        ],
+    ),
+    'pain_extreme': ResponseTemplate(
+        " EXTREME PAIN (9-10/10)\n\n"
+        " SEEK EMERGENCY CARE NOW\n\n"
+        "This level of pain is a medical emergency.\n\n"
+        "CALL 999 IF:\n"
+        "• Unbearable pain\n"
+        "• Can't move or function\n"
+        "• Suspected broken bone\n"
+        "• Severe injury\n\n"
+        "GO TO A&E IMMEDIATELY IF:\n"
+        "• Severe abdominal pain\n"
+        "• Chest pain\n"
+        "• Head injury pain\n\n"
+        "Don't drive yourself - call ambulance.",
+        buttons=[
+            ("Call 999", "/call_999"),
+            ("Go to A&E", "/go_to_ae"),
+            ("Call 111 for advice", "/call_111"),
+        ],
+    ),
+    'emergency_help': ResponseTemplate(
+        " EMERGENCY GUIDANCE\n\n"
+        " CALL 999 IMMEDIATELY IF:\n\n"
+        "🔴 Life-threatening symptoms:\n"
+        "• Chest pain or pressure\n"
+        "• Difficulty breathing\n"
+        "• Severe bleeding\n"
+        "• Loss of consciousness\n"
+        "• Stroke symptoms (FAST)\n"
+        "• Severe allergic reaction\n\n"
+        " WHAT TO DO:\n"
+        "1. Call 999 now\n"
+        "2. Stay calm\n"
+        "3. Follow operator instructions\n"
+        "4. Don't hang up\n\n"
+        "🏥 IF LESS URGENT:\n"
+        "Call 111 for urgent medical advice\n\n"
+        "Is this a life-threatening emergency?",
+        buttons=[
+            ("Yes - Call 999", "/call_999"),
+            ("No - Describe symptoms", "/describe_symptoms"),
+            ("Call 111 for advice", "/call_111"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'when_to_see_doctor': ResponseTemplate(
+        "🩺 WHEN TO SEE A DOCTOR\n\n"
+        "See doctor TODAY if:\n"
+        "• Fever > 103°F\n"
+        "• Severe pain (7-10/10)\n"
+        "• Difficulty breathing\n"
+        "• Persistent vomiting\n"
+        "• Signs of infection\n\n"
+        "Within 24-48 hours if:\n"
+        "• Symptoms worsen\n"
+        "• No improvement after 3 days\n"
+        "• Moderate pain (4-6/10)\n"
+        "• Recurring symptoms\n\n"
+        "Emergency room if:\n"
+        "• Chest pain\n"
+        "• Stroke symptoms\n"
+        "• Severe bleeding\n"
+        "• Loss of consciousness",
+        buttons=[
+            ("Book appointment", "/schedule_appointment"),
+            ("Emergency help", "/emergency_help"),
+        ],
+    ),
+    'energy_tips': ResponseTemplate(
+        "⚡ ENERGY BOOSTING TIPS\n\n"
+        "IMMEDIATE ENERGY BOOST:\n"
+        "• Take a 5-minute walk\n"
+        "• Drink a glass of cold water\n"
+        "• Do 10 jumping jacks\n"
+        "• Eat a healthy snack\n\n"
+        "NUTRITION FOR ENERGY:\n"
+        "• Complex carbs (oatmeal, whole grains)\n"
+        "• Protein (nuts, eggs, yogurt)\n"
+        "• Iron-rich foods (spinach, beans)\n"
+        "• B vitamins (bananas, avocados)\n\n"
+        "LIFESTYLE CHANGES:\n"
+        "• Sleep 7-9 hours nightly\n"
+        "• Exercise 30 min daily\n"
+        "• Limit caffeine after 2pm\n"
+        "• Stay hydrated\n\n"
+        "AVOID ENERGY DRAINS:\n"
+        "• Skipping meals\n"
+        "• Too much sugar\n"
+        "• Dehydration\n"
+        "• Excessive screen time",
+        buttons=[
+            ("Sleep improvement", "/sleep_tips"),
+            ("Fatigue assessment", "/mild_fatigue"),
+            ("Book GP appointment", "/schedule_appointment"),
+        ],
+    ),
+    'sleep_tips': ResponseTemplate(
+        "😴 SLEEP HYGIENE TIPS\n\n"
+        "BEDTIME ROUTINE:\n"
+        "• Same sleep/wake time daily\n"
+        "• Wind down 1 hour before bed\n"
+        "• No screens 30 min before sleep\n"
+        "• Keep bedroom cool (65-68°F)\n\n"
+        "IMPROVE SLEEP QUALITY:\n"
+        "• Dark, quiet room\n"
+        "• Comfortable mattress/pillows\n"
+        "• White noise if needed\n\n"
+        "DAYTIME HABITS:\n"
+        "• Morning sunlight exposure\n"
+        "• Exercise (not late evening)\n"
+        "• Limit naps to 20 min\n"
+        "• No caffeine after 2pm",
+        buttons=[
+            ("Relaxation techniques", "/relaxation"),
+            ("When to see doctor", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'call_emergency_services': ResponseTemplate(
+        " CALLING EMERGENCY SERVICES\n\n"
+        " DIAL 999 (UK) or 911 (US) NOW\n\n"
+        "TELL THE OPERATOR:\n"
+        "1. Your exact location/address\n"
+        "2. Main symptom (e.g., 'chest pain')\n"
+        "3. Patient's age\n"
+        "4. Consciousness level\n"
+        "5. Breathing status\n\n"
+        "WHILE WAITING:\n"
+        "• Stay calm\n"
+        "• Don't hang up\n"
+        "• Follow operator instructions\n"
+        "• Unlock door if possible\n"
+        "• Gather medications list",
+        buttons=[
+            ("I called 999", "/called_911"),
+            ("First aid guidance", "/first_aid"),
+        ],
+    ),
+    'nurse': ResponseTemplate(
+        "NURSE TRIAGE ASSESSMENT\n\n"
+        "I'll connect you with a nurse for assessment.\n\n"
+        "OPTIONS:\n"
+        " Call 111 (24/7 NHS nurse)\n"
+        " Online nurse chat\n"
+        " Video consultation\n\n"
+        "Average wait: 5-10 minutes",
+        buttons=[
+            ("Call 111 now", "/call_111"),
+            ("Describe symptoms", "/describe_symptoms"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'severe_headache': ResponseTemplate(
+        "🤕 SEVERE HEADACHE ASSESSMENT\n\n"
+        " CALL 999 IF:\n"
+        "• Sudden 'thunderclap' headache\n"
+        "• With fever and stiff neck\n"
+        "• After head injury\n"
+        "• With confusion/vision loss\n\n"
+        "Is this an emergency headache?",
+        buttons=[
+            ("Yes - Emergency", "/call_999"),
+            ("No - Still severe", "/headache_severe_care"),
+            ("Migraine history", "/migraine_check"),
+        ],
+    ),
+    'hydration_tips': ResponseTemplate(
+        "💧 HYDRATION GUIDE\n\n"
+        "DAILY WATER INTAKE:\n"
+        "• Men: 3.7 liters (15.5 cups)\n"
+        "• Women: 2.7 liters (11.5 cups)\n"
+        "• More if exercising/hot weather\n\n"
+        "SIGNS OF DEHYDRATION:\n"
+        "• Dark yellow urine\n"
+        "• Headache\n"
+        "• Fatigue\n"
+        "• Dry mouth/lips\n"
+        "• Dizziness",
+        buttons=[
+            ("Dehydration check", "/dehydration_check"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'breathing_exercises': ResponseTemplate(
+        "🫁 BREATHING EXERCISES\n\n"
+        "CALM BREATHING (4-7-8):\n"
+        "1. Exhale completely\n"
+        "2. Inhale through nose - 4 counts\n"
+        "3. Hold breath - 7 counts\n"
+        "4. Exhale through mouth - 8 counts\n"
+        "5. Repeat 3-4 times\n\n"
+        "BENEFITS:\n"
+        "✓ Reduces anxiety\n"
+        "✓ Lowers blood pressure\n"
+        "✓ Improves focus",
+        buttons=[
+            ("Relaxation techniques", "/relaxation"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'relaxation': ResponseTemplate(
+        "🧘 RELAXATION TECHNIQUES\n\n"
+        "QUICK TECHNIQUES:\n"
+        "• Deep breathing (5 min)\n"
+        "• Visualization (imagine calm place)\n"
+        "• Body scan meditation\n"
+        "• Gentle stretching\n\n"
+        "DAILY PRACTICE:\n"
+        "• Morning: 5 min breathing\n"
+        "• Lunch: Quick stretch\n"
+        "• Evening: Full relaxation",
+        buttons=[
+            ("Breathing exercises", "/breathing_exercises"),
+            ("Sleep better", "/sleep_tips"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'severe_abdominal': ResponseTemplate(
+        "🔴 SEVERE ABDOMINAL PAIN\n\n"
+        " SEEK EMERGENCY CARE IF:\n"
+        "• Sudden, severe pain\n"
+        "• Pain with fever\n"
+        "• Vomiting blood\n"
+        "• Black/bloody stools\n"
+        "• Rigid/hard abdomen\n\n"
+        "How severe is your pain?",
+        buttons=[
+            ("Unbearable - Call 999", "/call_999"),
+            ("Severe but stable", "/urgent_care"),
+            ("With other symptoms", "/abdominal_symptoms"),
+        ],
+    ),
+    'called_emergency_services': ResponseTemplate(
+        " HELP IS ON THE WAY\n\n"
+        "Average arrival: 7-10 minutes\n\n"
+        "WHILE WAITING:\n"
+        "• Keep patient calm\n"
+        "• Monitor breathing\n"
+        "• Note any changes\n"
+        "• Gather medications\n"
+        "• Unlock front door\n\n"
+        "Stay on line with 999 if requested.",
+        buttons=[
+            ("First aid tips", "/first_aid"),
+            ("What to tell paramedics", "/paramedic_info"),
+        ],
+    ),
+    'go_to_ae': ResponseTemplate(
+        "🏥 A&E DEPARTMENTS\n\n"
+        "NEAREST A&E:\n"
+        "📍 City General Hospital\n"
+        "   24/7 Emergency Department\n"
+        "   Average wait: 2-4 hours\n\n"
+        "BRING WITH YOU:\n"
+        "• Photo ID\n"
+        "• List of medications\n"
+        "• Insurance details\n"
+        "• Phone charger\n\n"
+        " Call 999 if you can't get there safely",
+        buttons=[
+            ("Get directions", "/directions"),
+            ("Call 999 instead", "/call_999"),
+        ],
+    ),
+    'urgent_appointment': ResponseTemplate(
+        " URGENT APPOINTMENT\n\n"
+        "For same-day urgent care:\n\n"
+        " CALL YOUR GP NOW\n"
+        "Say it's urgent - they keep slots\n\n"
+        "ALTERNATIVES:\n"
+        "• Walk-in centres\n"
+        "• Urgent care clinics\n"
+        "• 111 service\n\n"
+        "If can't wait: Go to A&E",
+        buttons=[
+            ("Find urgent care", "/urgent_care"),
+            ("Call 111", "/call_111"),
+            ("Go to A&E", "/go_to_ae"),
+        ],
+    ),
+    'dehydration_check': ResponseTemplate(
+        "💧 DEHYDRATION CHECK\n\n"
+        "MILD SIGNS:\n"
+        "• Thirst\n"
+        "• Dry mouth\n"
+        "• Dark yellow urine\n"
+        "• Tiredness\n\n"
+        "SEVERE SIGNS:\n"
+        "• Dizziness\n"
+        "• Rapid heartbeat\n"
+        "• Sunken eyes\n"
+        "• No urination 8+ hours\n\n"
+        "Treatment: Sip water slowly",
+        buttons=[
+            ("Hydration tips", "/hydration_tips"),
+            ("When to worry", "/when_to_see_doctor"),
+        ],
+    ),
+    'mild_back_pain': ResponseTemplate(
+        "💚 MILD BACK PAIN RELIEF\n\n"
+        "IMMEDIATE STEPS:\n"
+        "• Keep moving gently\n"
+        "• Apply heat or ice\n"
+        "• Over-counter painkillers\n"
+        "• Gentle stretches\n\n"
+        "Usually improves in few days",
+        buttons=[
+            ("Back exercises", "/back_exercises"),
+            ("When to worry", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'moderate_back_pain': ResponseTemplate(
+        " MODERATE BACK PAIN\n\n"
+        "MANAGEMENT:\n"
+        "• Regular painkillers\n"
+        "• Alternate heat/ice\n"
+        "• Gentle movement\n"
+        "• Avoid heavy lifting\n\n"
+        "SEE GP IF:\n"
+        "• Pain >1 week\n"
+        "• Getting worse\n"
+        "• Numbness/tingling",
+        buttons=[
+            ("Book appointment", "/schedule_appointment"),
+            ("Physiotherapy", "/physio_referral"),
+            ("Pain management", "/pain_management"),
+        ],
+    ),
+    'severe_back': ResponseTemplate(
+        "🔴 SEVERE BACK PAIN WARNING\n\n"
+        " SEEK URGENT CARE IF:\n"
+        "• Loss of bladder/bowel control\n"
+        "• Leg weakness\n"
+        "• Numbness in groin\n"
+        "• Can't walk\n\n"
+        "These are RED FLAGS - A&E NOW",
+        buttons=[
+            ("Go to A&E", "/go_to_ae"),
+            ("Call 999", "/call_999"),
+            ("Urgent GP", "/urgent_appointment"),
+        ],
+    ),
+    'nausea_vomiting': ResponseTemplate(
+        "🤮 NAUSEA & VOMITING CARE\n\n"
+        "IMMEDIATE HELP:\n"
+        "• Small sips of water\n"
+        "• Ginger tea\n"
+        "• Fresh air\n"
+        "• Sit upright\n\n"
+        " SEEK HELP IF:\n"
+        "• Blood in vomit\n"
+        "• Can't keep fluids down 24h\n"
+        "• Signs of dehydration",
+        buttons=[
+            ("Dehydration check", "/dehydration_check"),
+            ("When to worry", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'diarrhea': ResponseTemplate(
+        "💩 DIARRHEA MANAGEMENT\n\n"
+        "IMMEDIATE CARE:\n"
+        "• Oral rehydration salts\n"
+        "• Clear fluids frequently\n"
+        "• Avoid dairy products\n"
+        "• Rest\n\n"
+        " SEE DOCTOR IF:\n"
+        "• Blood in stool\n"
+        "• High fever\n"
+        "• Lasts >3 days",
+        buttons=[
+            ("Hydration tips", "/hydration_tips"),
+            ("Food poisoning", "/food_poisoning"),
+            ("When to worry", "/when_to_see_doctor"),
+        ],
+    ),
+    'constipation': ResponseTemplate(
+        "🚽 CONSTIPATION RELIEF\n\n"
+        "IMMEDIATE HELP:\n"
+        "• Drink warm water\n"
+        "• Gentle exercise\n"
+        "• Abdominal massage\n"
+        "• Prune juice\n\n"
+        "DIETARY CHANGES:\n"
+        "• More fiber\n"
+        "• 8+ glasses water daily",
+        buttons=[
+            ("Dietary advice", "/diet_fiber"),
+            ("When to worry", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'abdominal_symptoms': ResponseTemplate(
+        "🤒 STOMACH PAIN ASSESSMENT\n\n"
+        "LOCATION HELPS DIAGNOSIS:\n"
+        "• Upper right: Gallbladder\n"
+        "• Upper center: Stomach\n"
+        "• Around navel: Small intestine\n"
+        "• Lower right: Appendix\n\n"
+        "DESCRIBE YOUR PAIN:",
+        buttons=[
+            ("Sharp/stabbing", "/sharp_abdominal"),
+            ("Cramping", "/cramping_abdominal"),
+            ("Burning", "/burning_abdominal"),
+            ("Constant ache", "/aching_abdominal"),
+        ],
+    ),
+    'sharp_abdominal': ResponseTemplate(
+        "🔪 SHARP ABDOMINAL PAIN\n\n"
+        "This could be serious.\n\n"
+        "POSSIBLE CAUSES:\n"
+        "• Appendicitis\n"
+        "• Gallstones\n"
+        "• Kidney stones\n\n"
+        "Seek urgent care if severe",
+        buttons=[
+            ("Go to A&E", "/go_to_ae"),
+            ("Call 111", "/call_111"),
+            ("See more symptoms", "/abdominal_symptoms"),
+        ],
+    ),
+    'cramping_abdominal': ResponseTemplate(
+        "〰 CRAMPING PAIN\n\n"
+        "COMMON CAUSES:\n"
+        "• IBS\n"
+        "• Gas/bloating\n"
+        "• Food intolerance\n"
+        "• Period cramps\n\n"
+        "Usually not serious but monitor",
+        buttons=[
+            ("Self-care tips", "/digestive_self_care"),
+            ("When to worry", "/when_to_see_doctor"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'burning_abdominal': ResponseTemplate(
+        "🔥 BURNING PAIN\n\n"
+        "LIKELY CAUSES:\n"
+        "• Heartburn/GERD\n"
+        "• Stomach ulcer\n"
+        "• Gastritis\n\n"
+        "Try antacids for relief",
+        buttons=[
+            ("Heartburn relief", "/heartburn_relief"),
+            ("Diet advice", "/diet_advice"),
+            ("Book GP", "/schedule_appointment"),
+        ],
+    ),
+    'aching_abdominal': ResponseTemplate(
+        "😣 CONSTANT ACHE\n\n"
+        "POSSIBLE CAUSES:\n"
+        "• Constipation\n"
+        "• Viral infection\n"
+        "• Stress\n\n"
+        "Monitor for changes",
+        buttons=[
+            ("Track symptoms", "/symptom_diary"),
+            ("Self-care", "/self_care"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'other_pain': ResponseTemplate(
+        "📍 OTHER PAIN LOCATION\n\n"
+        "Please describe:\n"
+        "• Where is the pain?\n"
+        "• How long have you had it?\n"
+        "• Rate severity (1-10)\n\n"
+        "Common areas we can help with:",
+        buttons=[
+            ("Joint pain", "/joint_pain"),
+            ("Muscle pain", "/muscle_pain"),
+            ("Nerve pain", "/nerve_pain"),
+            ("Type symptoms", "/type_symptoms"),
+        ],
+    ),
+    'joint_pain': ResponseTemplate(
+        "🦴 JOINT PAIN ASSESSMENT\n\n"
+        "SYMPTOMS TO WATCH:\n"
+        "• Swelling\n"
+        "• Redness\n"
+        "• Warmth\n"
+        "• Stiffness\n\n"
+        "Could be arthritis, injury, or infection",
+        buttons=[
+            ("Self-care", "/joint_care"),
+            ("Book GP", "/schedule_appointment"),
+            ("When urgent", "/when_to_see_doctor"),
+        ],
+    ),
+    'muscle_pain': ResponseTemplate(
+        "💪 MUSCLE PAIN CARE\n\n"
+        "RICE METHOD:\n"
+        "• Rest\n"
+        "• Ice (first 48h)\n"
+        "• Compression\n"
+        "• Elevation\n\n"
+        "Usually improves in few days",
+        buttons=[
+            ("Stretches", "/muscle_stretches"),
+            ("Pain relief", "/pain_management"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'nerve_pain': ResponseTemplate(
+        "⚡ NERVE PAIN\n\n"
+        "CHARACTERISTICS:\n"
+        "• Shooting/burning\n"
+        "• Numbness\n"
+        "• Tingling\n"
+        "• Weakness\n\n"
+        "Often needs medical assessment",
+        buttons=[
+            ("Book GP urgently", "/urgent_appointment"),
+            ("Pain management", "/pain_management"),
+            ("Call 111", "/call_111"),
+        ],
+    ),
+    'telemedicine': ResponseTemplate(
+        "💻 VIDEO CONSULTATION\n\n"
+        "AVAILABLE SERVICES:\n"
+        "• NHS Video Consults\n"
+        "• Private GP services\n"
+        "• Specialist referrals\n\n"
+        "Average wait: 30 minutes",
+        buttons=[
+            ("Book video consult", "/book_video"),
+            ("Call 111 instead", "/call_111"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'symptom_diary': ResponseTemplate(
+        "📝 SYMPTOM DIARY\n\n"
+        "TRACK DAILY:\n"
+        "• Time symptoms occur\n"
+        "• Severity (1-10 scale)\n"
+        "• Duration\n"
+        "• Triggers\n"
+        "• What helped\n\n"
+        "Keep for at least 2 weeks",
+        buttons=[
+            ("Start logging", "/start_diary"),
+            ("View tips", "/diary_tips"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'first_aid': ResponseTemplate(
+        "🚑 FIRST AID BASICS\n\n"
+        "CHECK FOR:\n"
+        "• Danger\n"
+        "• Response\n"
+        "• Airway\n"
+        "• Breathing\n"
+        "• Circulation\n\n"
+        "What's the emergency?",
+        buttons=[
+            ("Not breathing", "/cpr_guide"),
+            ("Bleeding", "/bleeding_control"),
+            ("Choking", "/choking_help"),
+            ("Burns", "/burn_care"),
+        ],
+    ),
+    'paramedic_info': ResponseTemplate(
+        "🚑 WHAT TO TELL PARAMEDICS\n\n"
+        "KEY INFORMATION:\n"
+        "• Main symptoms\n"
+        "• When it started\n"
+        "• Medical conditions\n"
+        "• Current medications\n"
+        "• Allergies\n"
+        "• Last food/drink\n\n"
+        "Have medications ready to show",
+        buttons=[
+            ("Emergency checklist", "/emergency_checklist"),
+            ("Main menu", "/greet"),
+        ],
+    ),
+    'directions': ResponseTemplate(
+        "📏 NEAREST A&E\n\n"
+        "City General Hospital\n"
+        "123 Hospital Road\n"
+        "Open 24/7\n\n"
+        "BY CAR: 15 minutes\n"
+        "BY BUS: Routes 12, 45\n"
+        "BY TAXI: £15-20\n\n"
+        "Call ahead: 0800-123-456",
+        buttons=[
+            ("Open in maps", "/open_maps"),
+            ("Call taxi", "/call_taxi"),
+            ("Back", "/go_to_ae"),
+        ],
+    ),
+    'greet': ResponseTemplate(
+        "HEALTHCARE TRIAGE SYSTEM\n\n"
+        "I can help you with:\n\n"
+        "• Symptom assessment & triage\n"
+        "• Appointment scheduling\n"
+        "• Emergency assistance\n"
+        "• Medical guidance\n\n"
+        "How can I assist you today?",
+        buttons=[
+            ("I have symptoms", "/describe_symptoms"),
+            ("Schedule appointment", "/schedule_appointment"),
+            ("Emergency help", "/emergency_help"),
+            ("Speak to nurse", "/nurse"),
+        ],
+    ),
+}
+
+# e.g. 'fever_assessment_urgent', 'cough_assessment_gp'
+TEMPLATES.update({
+    f'{keyword}_assessment_{triage}': ResponseTemplate(
+        f"{symptom} ASSESSMENT\n\n{advice}\n\nRecommendation: {recommendation}",
+        buttons=buttons,
+    )
+    for keyword, (symptom, advice) in SYMPTOM_ADVICE.items()
+    for triage, (recommendation, buttons) in SYMPTOM_TRIAGE.items()
+})
@@ -0,0 +1,491 @@
+"""
+Conversation state shared between worker processes
+A sender's booking state, partial booking, story position and the
+appointment being rescheduled are kept together in one Session record.
+The record is read once at the start of a turn and written once at the
+end, and only if the turn changed it, so a turn costs one lookup in the
+backend chosen by SESSION_BACKEND:
+- memory:// (default) keeps sessions in this process, for a single worker
+- sqlite:///path/to/sessions.db shares them between workers on one host
+- redis://[:password@]host:port/db shares them between hosts
+Records expire SESSION_TTL seconds after their last change. The shared
+backends also hold each sender's appointments and the booked slots, so
+every worker sees the same bookings and a slot can only be reserved once.
+Turn locks only cover one process: turns of one sender are expected one
+at a time, as a chat client waits for each reply
+"""
+import itertools
+import json
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+from appointment_index import AppointmentIndex, SharedAppointmentIndex
+from dialogue_engine import ROOT
+from session_store import ShardedSessionStore, check_limits
+from slot_inventory import SharedSlotInventory, SlotInventory
+
+# Prefixes of session, appointment and slot keys in Redis, so the database can be shared
+SESSION_KEY_PREFIX = 'healthbot:session:'
+APPOINTMENTS_KEY_PREFIX = 'healthbot:appointments:'
+SLOT_KEY_PREFIX = 'healthbot:slot:'
+# Idle connections kept per backend; busier moments open more
+POOL_SIZE = 32
+# SQLite drops expired records once per this many writes
+PURGE_EVERY = 1000
+# Commands sent to Redis at once when restoring appointments and slots
+RESTORE_BATCH = 1000
+
+
+class SessionBackendError(Exception):
+    """The session backend answered with an error"""
+
+
+class Session:
+    """One sender's conversation state for the length of a turn"""
+
+    __slots__ = ('sender_id', 'state', 'temp', 'dialogue', 'reschedule_id', 'loaded')
+
+    def __init__(self, sender_id, data=None):
+        record = json.loads(data) if data else {}
+        self.sender_id = sender_id
+        self.loaded = data
+        # Booking step, e.g. 'waiting_for_name'
+        self.state = record.get('state')
+        # Partial booking: date, time, department and patient details
+        self.temp = record.get('temp')
+        # Position in the current domain story
+        self.dialogue = record.get('dialogue', ROOT)
+        # Appointment being rescheduled
+        self.reschedule_id = record.get('reschedule_id')
+
+    def encode(self):
+        """Compact JSON of the record, or None when there is nothing to keep"""
+        record = {}
+        if self.state:
+            record['state'] = self.state
+        if self.temp:
+            record['temp'] = self.temp
+        if self.dialogue != ROOT:
+            record['dialogue'] = self.dialogue
+        if self.reschedule_id is not None:
+            record['reschedule_id'] = self.reschedule_id
+        if not record:
+            return None
+        return json.dumps(record, separators=(',', ':'), sort_keys=True)
+
+
+class SessionBackend:
+    """Loads and saves Session records; subclasses store the encoded JSON"""
+
+    kind = None
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'deletes': 0, 'unchanged': 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, counter):
+        with self.stats_lock:
+            self.stats[counter] += 1
+
+    def load(self, sender_id):
+        data = self.get(sender_id)
+        self.count('hits' if data else 'misses')
+        return Session(sender_id, data)
+
+    def save(self, session):
+        """Write the session back if the turn changed it"""
+        data = session.encode()
+        if data == session.loaded:
+            self.count('unchanged')
+        elif data is None:
+            self.count('deletes')
+            self.delete(session.sender_id)
+        else:
+            self.count('writes')
+            self.put(session.sender_id, data)
+
+    def snapshot_stats(self):
+        with self.stats_lock:
+            return dict(self.stats, backend=self.kind, ttl=self.ttl)
+
+    def appointment_index(self, retention_days):
+        """Where this worker keeps appointments: in the process itself"""
+        return AppointmentIndex(retention_days)
+
+    def slot_inventory(self, slot_minutes):
+        return SlotInventory(slot_minutes)
+
+    def close(self):
+        pass
+
+
+class SharedSessionBackend(SessionBackend):
+    """A backend shared by workers, which also holds appointments and booked slots
+
+    Subclasses store a sender's appointments as one JSON record
+    (get_appointments, put_appointments, and add_appointments for records
+    that don't exist yet) and booked slots as keys created only if absent
+    (reserve_slots, release_slot, slot_taken)
+    """
+
+    def appointment_index(self, retention_days):
+        return SharedAppointmentIndex(self, retention_days)
+
+    def slot_inventory(self, slot_minutes):
+        return SharedSlotInventory(self, slot_minutes)
+
+
+class MemorySessionBackend(SessionBackend):
+    """Sessions in this process, with idle expiry and a size cap"""
+
+    kind = 'memory'
+
+    def __init__(self, ttl, max_size):
+        super().__init__(ttl)
+        self.store = ShardedSessionStore('sessions', ttl, max_size)
+
+    def get(self, sender_id):
+        return self.store.get(sender_id)
+
+    def put(self, sender_id, data):
+        self.store[sender_id] = data
+
+    def delete(self, sender_id):
+        self.store.pop(sender_id)
+
+    def snapshot_stats(self):
+        return dict(super().snapshot_stats(), store=self.store.snapshot_stats())
+
+
+class ConnectionPool:
+    """Idle connections to a backend, most recently used first"""
+
+    def __init__(self, connect, size=POOL_SIZE):
+        self.connect = connect
+        self.idle = queue.LifoQueue(size)
+
+    def acquire(self):
+        """(connection, whether it was idle in the pool)"""
+        try:
+            return self.idle.get_nowait(), True
+        except queue.Empty:
+            return self.connect(), False
+
+    def release(self, connection):
+        try:
+            self.idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLiteSessionBackend(SharedSessionBackend):
+    """Sessions in a SQLite file shared by the workers on one host
+
+    WAL mode lets readers run alongside the one writer, and
+    synchronous=NORMAL commits without an fsync; a crash loses at most the
+    last few changes to conversations, never a booking, which the
+    appointment log holds. A slot is reserved by an INSERT OR IGNORE of its
+    key, which only one writer can win
+    """
+
+    kind = 'sqlite'
+
+    def __init__(self, path, ttl):
+        super().__init__(ttl)
+        self.path = path
+        self.pool = ConnectionPool(self._connect)
+        self.writes = itertools.count(1)
+        connection = self._connect()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS sessions '
+            '(sender TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL) WITHOUT ROWID'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS appointments (sender TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS slots (slot TEXT PRIMARY KEY, expires REAL NOT NULL) WITHOUT ROWID'
+        )
+        self.pool.release(connection)
+
+    def _connect(self):
+        # Autocommit; connections move between request threads through the pool
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _execute(self, sql, params):
+        connection, _ = self.pool.acquire()
+        try:
+            rows = connection.execute(sql, params).fetchall()
+        except Exception:
+            connection.close()
+            raise
+        self.pool.release(connection)
+        return rows
+
+    def _execute_each(self, sql, params_list):
+        """Run sql once per params in one transaction; rows changed by each"""
+        connection, _ = self.pool.acquire()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                changed = [connection.execute(sql, params).rowcount for params in params_list]
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        except Exception:
+            connection.close()
+            raise
+        self.pool.release(connection)
+        return changed
+
+    def get(self, sender_id):
+        rows = self._execute('SELECT data FROM sessions WHERE sender = ? AND expires > ?', (sender_id, time.time()))
+        return rows[0][0] if rows else None
+
+    def put(self, sender_id, data):
+        now = time.time()
+        self._execute(
+            'INSERT INTO sessions (sender, data, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (sender) DO UPDATE SET data = excluded.data, expires = excluded.expires',
+            (sender_id, data, now + self.ttl),
+        )
+        if next(self.writes) % PURGE_EVERY == 0:
+            self._execute('DELETE FROM sessions WHERE expires <= ?', (now,))
+            self._execute('DELETE FROM slots WHERE expires <= ?', (now,))
+
+    def delete(self, sender_id):
+        self._execute('DELETE FROM sessions WHERE sender = ?', (sender_id,))
+
+    def get_appointments(self, sender_id):
+        rows = self._execute('SELECT data FROM appointments WHERE sender = ?', (sender_id,))
+        return rows[0][0] if rows else None
+
+    def put_appointments(self, sender_id, data):
+        self._execute(
+            'INSERT INTO appointments (sender, data) VALUES (?, ?) '
+            'ON CONFLICT (sender) DO UPDATE SET data = excluded.data',
+            (sender_id, data),
+        )
+
+    def add_appointments(self, records):
+        """Store (sender id, data) records whose sender has none; whether each was stored"""
+        changed = self._execute_each('INSERT OR IGNORE INTO appointments (sender, data) VALUES (?, ?)', records)
+        return [bool(count) for count in changed]
+
+    def reserve_slots(self, slots):
+        """Create (slot key, expiry) keys that don't exist yet; whether each was created"""
+        now = time.time()
+        # A key whose day is over is taken back as if it were absent
+        changed = self._execute_each(
+            'INSERT INTO slots (slot, expires) VALUES (?, ?) '
+            'ON CONFLICT (slot) DO UPDATE SET expires = excluded.expires WHERE slots.expires <= ?',
+            [(key, expires, now) for key, expires in slots],
+        )
+        return [bool(count) for count in changed]
+
+    def release_slot(self, key):
+        self._execute('DELETE FROM slots WHERE slot = ?', (key,))
+
+    def slot_taken(self, key):
+        return bool(self._execute('SELECT 1 FROM slots WHERE slot = ? AND expires > ?', (key, time.time())))
+
+    def snapshot_stats(self):
+        size = self._execute('SELECT COUNT(*) FROM sessions WHERE expires > ?', (time.time(),))[0][0]
+        return dict(super().snapshot_stats(), size=size, path=self.path)
+
+    def close(self):
+        self.pool.close()
+
+
+def encode_command(args):
+    """A command as a RESP array of bulk strings"""
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+class RespConnection:
+    """One connection speaking the Redis protocol (RESP2)"""
+
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def call(self, *args):
+        """Send a command and return its reply"""
+        return self.call_many([args])[0]
+
+    def call_many(self, commands):
+        """Send commands together and return their replies, in order"""
+        self.sock.sendall(b''.join(encode_command(args) for args in commands))
+        replies = [self.read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, SessionBackendError):
+                raise reply
+        return replies
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("Redis closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            return SessionBackendError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            return self.reader.read(length + 2)[:-2].decode()
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self.read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from Redis: {line[:40]!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisSessionBackend(SharedSessionBackend):
+    """Sessions in Redis, or anything speaking its protocol
+
+    Each turn reads with one GET and, if it changed the session, saves it
+    with a SET or DEL whose reply is awaited, so a turn that returns has
+    its session stored for the sender's next turn on any worker. A slot is
+    reserved with SET NX on its key, which only one client can win
+    """
+
+    kind = 'redis'
+
+    def __init__(self, host, port, db, password, ttl, timeout=2.0):
+        super().__init__(ttl)
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self.pool = ConnectionPool(self._connect)
+        self._call('PING')  # fail at startup, not on the first turn
+
+    def _connect(self):
+        connection = RespConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                connection.call('AUTH', self.password)
+            if self.db:
+                connection.call('SELECT', self.db)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _call(self, *args):
+        return self._call_many([args])[0]
+
+    def _call_many(self, commands):
+        """Run commands; a pooled connection that went stale is replaced once"""
+        while True:
+            connection, pooled = self.pool.acquire()
+            try:
+                replies = connection.call_many(commands)
+            except SessionBackendError:
+                self.pool.release(connection)
+                raise
+            except OSError:
+                connection.close()
+                if pooled:
+                    continue
+                raise
+            self.pool.release(connection)
+            return replies
+
+    def get(self, sender_id):
+        return self._call('GET', SESSION_KEY_PREFIX + sender_id)
+
+    def put(self, sender_id, data):
+        self._call('SET', SESSION_KEY_PREFIX + sender_id, data, 'EX', self.ttl)
+
+    def delete(self, sender_id):
+        self._call('DEL', SESSION_KEY_PREFIX + sender_id)
+
+    def _set_new(self, commands):
+        """Replies to SET ... NX commands, sent in batches, as whether each key was set"""
+        replies = []
+        for start in range(0, len(commands), RESTORE_BATCH):
+            replies.extend(self._call_many(commands[start:start + RESTORE_BATCH]))
+        return [reply == 'OK' for reply in replies]
+
+    def get_appointments(self, sender_id):
+        return self._call('GET', APPOINTMENTS_KEY_PREFIX + sender_id)
+
+    def put_appointments(self, sender_id, data):
+        self._call('SET', APPOINTMENTS_KEY_PREFIX + sender_id, data)
+
+    def add_appointments(self, records):
+        """Store (sender id, data) records whose sender has none; whether each was stored"""
+        return self._set_new([('SET', APPOINTMENTS_KEY_PREFIX + sender_id, data, 'NX') for sender_id, data in records])
+
+    def reserve_slots(self, slots):
+        """Create (slot key, expiry) keys that don't exist yet; whether each was created"""
+        now = time.time()
+        return self._set_new([
+            ('SET', SLOT_KEY_PREFIX + key, 1, 'NX', 'EX', max(1, int(expires - now))) for key, expires in slots
+        ])
+
+    def release_slot(self, key):
+        self._call('DEL', SLOT_KEY_PREFIX + key)
+
+    def slot_taken(self, key):
+        return bool(self._call('EXISTS', SLOT_KEY_PREFIX + key))
+
+    def snapshot_stats(self):
+        return dict(super().snapshot_stats(), keys=self._call('DBSIZE'))
+
+    def close(self):
+        self.pool.close()
+
+
+def open_backend(url, ttl, max_size):
+    """Session backend for a SESSION_BACKEND URL"""
+    check_limits('sessions', ttl, max_size)
+    parts = urlsplit(url)
+    if parts.query or parts.fragment:
+        raise ValueError(f"SESSION_BACKEND '{url}' takes no query or fragment")
+    if url == '' or (parts.scheme == 'memory' and not parts.netloc and not parts.path):
+        return MemorySessionBackend(ttl, max_size)
+    if parts.scheme == 'sqlite':
+        # sqlite:///relative.db or sqlite:////absolute/path.db, as SQLAlchemy has it
+        path = unquote(parts.path[1:])
+        if parts.netloc or not path:
+            raise ValueError(f"SESSION_BACKEND '{url}' needs the form sqlite:///<path>")
+        return SQLiteSessionBackend(path, ttl)
+    if parts.scheme == 'redis':
+        db = int(parts.path.strip('/') or 0)
+        password = unquote(parts.password) if parts.password else None
+        return RedisSessionBackend(parts.hostname or '127.0.0.1', parts.port or 6379, db, password, ttl)
+    raise ValueError(
+        f"Unknown SESSION_BACKEND '{url}': use memory://, sqlite:///<path> or redis://<host>:<port>/<db>"
+    )
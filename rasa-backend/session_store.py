@@ -0,0 +1,218 @@
+"""
+Per-sender session storage with idle expiry and a size cap
+Least recently used entries are evicted past max_size; idle entries expire
+through a timing wheel, so expiry only ever touches the keys that are due.
+The sharded variant and turn locks make the stores safe to share between
+request threads
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def check_limits(name, ttl, max_size):
+    """Reject TTLs and sizes the timing wheel and LRU can't work with"""
+    if not ttl > 0:
+        raise ValueError(f"Session store '{name}' needs a TTL above 0 seconds, got {ttl}")
+    if not max_size > 0:
+        raise ValueError(f"Session store '{name}' needs a max size above 0, got {max_size}")
+
+
+class SessionStore:
+    """Dict-like store keyed by sender id, with idle TTL and LRU eviction"""
+
+    def __init__(self, name, ttl, max_size, wheel_slots=600, clock=time.monotonic):
+        check_limits(name, ttl, max_size)
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+
+        self._data = OrderedDict()  # key -> value, least recently used first
+        self._deadlines = {}  # key -> tick at which the key expires
+        # The TTL is split into wheel_slots ticks, so expiry is accurate to one
+        # tick; a key sits in the slot of its deadline
+        self.tick = ttl / wheel_slots
+        self._ttl_ticks = wheel_slots
+        self._slots = [set() for _ in range(wheel_slots + 1)]
+        self._now_tick = self._current_tick()
+
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    def _current_tick(self):
+        return int(self.clock() / self.tick)
+
+    def _advance(self):
+        """Expire the keys in every wheel slot that came due since the last call"""
+        now_tick = self._current_tick()
+        if now_tick == self._now_tick:
+            return
+        # After a long pause every slot is due, but each only needs one visit
+        first = max(self._now_tick + 1, now_tick - len(self._slots) + 1)
+        for tick in range(first, now_tick + 1):
+            slot = self._slots[tick % len(self._slots)]
+            for key in [key for key in slot if self._deadlines[key] <= now_tick]:
+                self._remove(key)
+                self.stats['expired'] += 1
+        self._now_tick = now_tick
+
+    def _schedule(self, key):
+        """Push the key's deadline one TTL past now and mark it most recently used"""
+        old_deadline = self._deadlines.get(key)
+        deadline = self._now_tick + self._ttl_ticks
+        if old_deadline != deadline:
+            if old_deadline is not None:
+                self._slots[old_deadline % len(self._slots)].discard(key)
+            self._slots[deadline % len(self._slots)].add(key)
+            self._deadlines[key] = deadline
+        self._data.move_to_end(key)
+
+    def _remove(self, key):
+        del self._data[key]
+        deadline = self._deadlines.pop(key)
+        self._slots[deadline % len(self._slots)].discard(key)
+
+    def get(self, key, default=None):
+        self._advance()
+        if key not in self._data:
+            self.stats['misses'] += 1
+            return default
+        self.stats['hits'] += 1
+        self._schedule(key)
+        return self._data[key]
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._advance()
+        self._data[key] = value
+        self._schedule(key)
+        while len(self._data) > self.max_size:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.stats['evicted'] += 1
+
+    def __delitem__(self, key):
+        self._advance()
+        self._remove(key)
+
+    def __contains__(self, key):
+        # Counts as an access, so a key found here cannot expire before the
+        # caller reads it
+        self._advance()
+        if key not in self._data:
+            return False
+        self._schedule(key)
+        return True
+
+    def __len__(self):
+        self._advance()
+        return len(self._data)
+
+    def pop(self, key, default=None):
+        self._advance()
+        if key not in self._data:
+            return default
+        value = self._data[key]
+        self._remove(key)
+        return value
+
+    def setdefault(self, key, default=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self[key] = value = default
+        return value
+
+    def snapshot_stats(self):
+        """Hit, miss, expiry and eviction counters plus the current size"""
+        return dict(self.stats, size=len(self), ttl=self.ttl, max_size=self.max_size)
+
+
+class ShardedSessionStore:
+    """SessionStore split into shards by key hash, each behind its own lock"""
+
+    def __init__(self, name, ttl, max_size, shards=16, wheel_slots=600):
+        check_limits(name, ttl, max_size)
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        # LRU order is kept per shard, so each shard gets its share of max_size
+        shard_size = max(1, -(-max_size // shards))
+        self.shards = [SessionStore(name, ttl, shard_size, wheel_slots) for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+
+    def _shard(self, key):
+        index = hash(key) % len(self.shards)
+        return self.locks[index], self.shards[index]
+
+    def get(self, key, default=None):
+        lock, shard = self._shard(key)
+        with lock:
+            return shard.get(key, default)
+
+    def __getitem__(self, key):
+        lock, shard = self._shard(key)
+        with lock:
+            return shard[key]
+
+    def __setitem__(self, key, value):
+        lock, shard = self._shard(key)
+        with lock:
+            shard[key] = value
+
+    def __delitem__(self, key):
+        lock, shard = self._shard(key)
+        with lock:
+            del shard[key]
+
+    def __contains__(self, key):
+        lock, shard = self._shard(key)
+        with lock:
+            return key in shard
+
+    def __len__(self):
+        total = 0
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                total += len(shard)
+        return total
+
+    def pop(self, key, default=None):
+        lock, shard = self._shard(key)
+        with lock:
+            return shard.pop(key, default)
+
+    def setdefault(self, key, default=None):
+        lock, shard = self._shard(key)
+        with lock:
+            return shard.setdefault(key, default)
+
+    def snapshot_stats(self):
+        """Counters summed over all shards"""
+        totals = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'size': 0}
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                stats = shard.snapshot_stats()
+            for counter in totals:
+                totals[counter] += stats[counter]
+        return dict(totals, ttl=self.ttl, max_size=self.max_size, shards=len(self.shards))
+
+
+class TurnLocks:
+    """Striped locks that serialize the turns of each sender
+
+    Senders map onto a fixed set of locks by hash, so unrelated
+    conversations almost always run in parallel without one global lock
+    """
+
+    def __init__(self, stripes=256):
+        self.locks = [threading.RLock() for _ in range(stripes)]
+
+    def for_sender(self, sender_id):
+        return self.locks[hash(sender_id) % len(self.locks)]
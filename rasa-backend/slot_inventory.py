@@ -0,0 +1,194 @@
+"""
+Bookable slots per doctor
+SlotInventory keeps each doctor's day in this process as one integer used
+as a bitmap, a bit per slot, so checking a slot is a shift and a mask and
+a whole day costs a few bytes. Reserving tests and sets the bit under a
+lock, so two bookings racing for the same doctor and time can't both get
+it. SharedSlotInventory reserves through a shared session backend
+instead, one key per doctor and slot created only if absent, so the
+guarantee holds across workers
+"""
+import datetime
+import random
+import threading
+
+TIME_FORMATS = ('%I:%M %p', '%H:%M')
+
+
+def slot_of(time, slot_minutes=15):
+    """Slot number of a time such as "4:30 PM" or "14:30", or None if unparseable"""
+    for time_format in TIME_FORMATS:
+        try:
+            parsed = datetime.datetime.strptime((time or '').strip().upper(), time_format)
+        except ValueError:
+            continue
+        return (parsed.hour * 60 + parsed.minute) // slot_minutes
+    return None
+
+
+class SlotInventory:
+    """Booked slots by day and doctor"""
+
+    def __init__(self, slot_minutes=15):
+        self.slot_minutes = slot_minutes
+        self.lock = threading.Lock()
+        self.days = {}  # ISO day -> {doctor: bitmap of booked slots}
+        self.pruned_on = None
+        self.stats = {'reserved': 0, 'released': 0, 'conflicts': 0}
+
+    def slot(self, time):
+        return slot_of(time, self.slot_minutes)
+
+    def is_free(self, doctor, day, slot):
+        with self.lock:
+            return not self.days.get(day, {}).get(doctor, 0) >> slot & 1
+
+    def reserve(self, doctor, day, slot, force=False):
+        """Book a slot if it is free; True on success
+
+        force books it regardless, for appointments already confirmed
+        """
+        bit = 1 << slot
+        with self.lock:
+            self._prune_daily()
+            booked = self.days.setdefault(day, {})
+            if booked.get(doctor, 0) & bit:
+                self.stats['conflicts'] += 1
+                if not force:
+                    return False
+            booked[doctor] = booked.get(doctor, 0) | bit
+            self.stats['reserved'] += 1
+            return True
+
+    def reserve_any(self, doctors, day, slot):
+        """Book the slot with any free doctor of a department's doctors; the doctor, or None"""
+        if not doctors:
+            return None
+        bit = 1 << slot
+        # Start at a random doctor so bookings spread across the department
+        start = random.randrange(len(doctors))
+        with self.lock:
+            self._prune_daily()
+            booked = self.days.setdefault(day, {})
+            for i in range(len(doctors)):
+                doctor = doctors[(start + i) % len(doctors)]
+                if not booked.get(doctor, 0) & bit:
+                    booked[doctor] = booked.get(doctor, 0) | bit
+                    self.stats['reserved'] += 1
+                    return doctor
+            self.stats['conflicts'] += 1
+        return None
+
+    def hold(self, bookings):
+        """Book (doctor, day, slot) of appointments already confirmed, even where they clash"""
+        for doctor, day, slot in bookings:
+            self.reserve(doctor, day, slot, force=True)
+
+    def has_free_doctor(self, doctors, day, slot):
+        with self.lock:
+            booked = self.days.get(day, {})
+            return any(not booked.get(doctor, 0) >> slot & 1 for doctor in doctors)
+
+    def release(self, doctor, day, slot):
+        """Free a slot, e.g. on cancellation or reschedule"""
+        with self.lock:
+            booked = self.days.get(day)
+            if booked is None or doctor not in booked:
+                return
+            booked[doctor] &= ~(1 << slot)
+            if not booked[doctor]:
+                del booked[doctor]
+            if not booked:
+                del self.days[day]
+            self.stats['released'] += 1
+
+    def _prune_daily(self):
+        """Once a day, forget days that are over; called with the lock held"""
+        today = datetime.date.today()
+        if self.pruned_on == today:
+            return
+        self.pruned_on = today
+        for day in [day for day in self.days if day < today.isoformat()]:
+            del self.days[day]
+
+    def snapshot_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['days'] = len(self.days)
+            stats['booked'] = sum(bin(bitmap).count('1') for booked in self.days.values() for bitmap in booked.values())
+        return stats
+
+
+class SharedSlotInventory:
+    """Booked slots as keys in a shared session backend, one per doctor, day and slot
+
+    The backend creates a key only if it is absent, in one atomic step, so
+    bookings racing on different workers can't both get a slot. Keys expire
+    the day after their slot's day
+    """
+
+    def __init__(self, store, slot_minutes=15):
+        self.store = store  # a backend with reserve_slots, release_slot and slot_taken
+        self.slot_minutes = slot_minutes
+        self.stats = {'reserved': 0, 'released': 0, 'conflicts': 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, counter, amount=1):
+        with self.stats_lock:
+            self.stats[counter] += amount
+
+    def slot(self, time):
+        return slot_of(time, self.slot_minutes)
+
+    def key(self, doctor, day, slot):
+        return f"{day}:{slot}:{doctor}"
+
+    def expires(self, day):
+        """Epoch seconds at the end of the day after day"""
+        end = datetime.datetime.combine(datetime.date.fromisoformat(day) + datetime.timedelta(days=2), datetime.time())
+        return end.timestamp()
+
+    def is_free(self, doctor, day, slot):
+        return not self.store.slot_taken(self.key(doctor, day, slot))
+
+    def reserve(self, doctor, day, slot, force=False):
+        """Book a slot if it is free; True on success
+
+        force reports success regardless, for appointments already confirmed
+        """
+        if self.store.reserve_slots([(self.key(doctor, day, slot), self.expires(day))])[0]:
+            self.count('reserved')
+            return True
+        self.count('conflicts')
+        return force
+
+    def reserve_any(self, doctors, day, slot):
+        """Book the slot with any free doctor of a department's doctors; the doctor, or None"""
+        if not doctors:
+            return None
+        # Start at a random doctor so bookings spread across the department
+        start = random.randrange(len(doctors))
+        for i in range(len(doctors)):
+            doctor = doctors[(start + i) % len(doctors)]
+            if self.store.reserve_slots([(self.key(doctor, day, slot), self.expires(day))])[0]:
+                self.count('reserved')
+                return doctor
+        self.count('conflicts')
+        return None
+
+    def hold(self, bookings):
+        """Book (doctor, day, slot) of appointments already confirmed, in one batch"""
+        held = self.store.reserve_slots([(self.key(doctor, day, slot), self.expires(day)) for doctor, day, slot in bookings])
+        self.count('reserved', sum(held))
+
+    def has_free_doctor(self, doctors, day, slot):
+        return any(self.is_free(doctor, day, slot) for doctor in doctors)
+
+    def release(self, doctor, day, slot):
+        """Free a slot, e.g. on cancellation or reschedule"""
+        self.store.release_slot(self.key(doctor, day, slot))
+        self.count('released')
+
+    def snapshot_stats(self):
+        with self.stats_lock:
+            return dict(self.stats, shared=True)
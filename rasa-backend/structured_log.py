@@ -0,0 +1,139 @@
+"""
+Structured logging off the request path
+Events are logged as JSON lines. A request thread only drops the record on
+a bounded queue, and a background listener formats and writes it, so a
+slow stdout never holds up a reply. When the queue is full, records are
+dropped and counted rather than waited on. High-volume events are sampled
+by key, which keeps or drops a sender's whole conversation. Patient
+details and message text are redacted before the record is made
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import zlib
+
+ROOT_LOGGER = 'healthbot'
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Share of per-request events that are logged; warnings are always logged
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 0.01))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+# Fields never written out, wherever they appear in an event
+REDACTED_FIELDS = frozenset({'patient_name', 'patient_surname', 'patient_phone', 'message', 'text'})
+
+
+def redact(fields):
+    """Copy of an event's fields with patient details and message text masked"""
+    clean = {}
+    for key, value in fields.items():
+        if key in REDACTED_FIELDS and value:
+            clean[key] = f"[redacted, {len(str(value))} chars]"
+        elif isinstance(value, dict):
+            clean[key] = redact(value)
+        else:
+            clean[key] = value
+    return clean
+
+
+def sampled(rate, key=None):
+    """Whether to log a sampled event; the same key always gets the same answer"""
+    if rate >= 1.0:
+        return True
+    if key is None:
+        return zlib.crc32(os.urandom(4)) % 10000 < rate * 10000
+    return zlib.crc32(str(key).encode()) % 10000 < rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, event and its fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: a full queue drops the record
+
+    Records are queued as they are; formatting happens on the listener
+    thread
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class EventLogger:
+    """Logs named events with keyword fields"""
+
+    def __init__(self, name, sample_rate=1.0):
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+        self.sample_rate = sample_rate
+
+    def info(self, event, sample_key=None, **fields):
+        """Log an event, subject to this logger's sampling"""
+        if self.logger.isEnabledFor(logging.INFO) and sampled(self.sample_rate, sample_key):
+            self.logger.info(event, extra={'fields': redact(fields)})
+
+    def warning(self, event, **fields):
+        self.logger.warning(event, extra={'fields': redact(fields)})
+
+
+def get_logger(name, sample=False):
+    """Event logger under healthbot.<name>; sample=True applies LOG_SAMPLE_RATE"""
+    return EventLogger(name, LOG_SAMPLE_RATE if sample else 1.0)
+
+
+_lock = threading.Lock()
+_handler = None
+_listener = None
+
+
+def configure(stream=None):
+    """Route healthbot.* loggers through the queue to JSON on stream (stdout); idempotent"""
+    global _handler, _listener
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter())
+        _handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        root = logging.getLogger(ROOT_LOGGER)
+        root.addHandler(_handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(_handler.queue, output)
+        _listener.start()
+        # Write out what is still queued at exit
+        atexit.register(_listener.stop)
+
+
+def snapshot_stats():
+    """Records waiting to be written and records dropped on a full queue"""
+    if _handler is None:
+        return {'queued': 0, 'dropped': 0, 'sample_rate': LOG_SAMPLE_RATE}
+    return {'queued': _handler.queue.qsize(), 'dropped': _handler.dropped, 'sample_rate': LOG_SAMPLE_RATE}
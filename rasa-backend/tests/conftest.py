@@ -0,0 +1,70 @@
+"""
+Shared fixtures
+The backend modules are flat, so the tests import them from the parent
+directory. Every bot talks to an in-process Firebase stand-in and keeps
+its appointment log in a temporary directory; the environment is set
+before rasa_server is imported, since it reads its settings at import
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+sys.path.insert(0, BACKEND_DIR)
+
+from firebase_standin import FirebaseStandIn  # noqa: E402
+
+STANDIN = FirebaseStandIn(('127.0.0.1', 0)).start()
+os.environ['FIREBASE_URL'] = STANDIN.url
+os.environ['APPOINTMENT_WAL_DIR'] = tempfile.mkdtemp(prefix='healthbot-wal-')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+import pytest  # noqa: E402
+
+from appointment_wal import AppointmentWAL  # noqa: E402
+
+
+class RecordingOutbox:
+    """Firebase outbox that records writes instead of sending them"""
+
+    def __init__(self):
+        self.writes = []
+
+    def save_appointment(self, appointment_id, appointment_data, wal_seq=None):
+        self.writes.append(('save', appointment_id, appointment_data))
+
+    def reschedule_appointment(self, appointment_id, date, time, day=None, wal_seq=None):
+        self.writes.append(('reschedule', appointment_id, {'date': date, 'time': time, 'day': day}))
+
+    def cancel_appointment(self, appointment_id, wal_seq=None):
+        self.writes.append(('cancel', appointment_id, None))
+
+    def snapshot_stats(self):
+        return {'queued': 0, 'written': len(self.writes)}
+
+    def close(self, timeout=10.0):
+        pass
+
+
+@pytest.fixture
+def make_bot(tmp_path):
+    """Build warmed-up bots; each gets its own log directory unless one is given"""
+    import rasa_server
+    bots = []
+
+    def make(wal_dir=None):
+        wal_dir = wal_dir or str(tmp_path / f"wal-{len(bots)}")
+        bot = rasa_server.HealthcareBot(firebase=RecordingOutbox(), wal=AppointmentWAL(wal_dir))
+        bot.warm_up()
+        bots.append(bot)
+        return bot
+
+    yield make
+    for bot in bots:
+        bot.wal.close()
+
+
+@pytest.fixture
+def bot(make_bot):
+    return make_bot()
@@ -0,0 +1,23 @@
+"""Paged appointment load against the stand-in's orderBy="$key" queries"""
+from appointment_loader import LoadProgress, load_appointments, page_starts
+from firebase_client import FirebaseClient
+from firebase_standin import FirebaseStandIn
+
+
+def test_page_starts_follow_key_order():
+    keys = ['HC2', '10', 'HC10', '9', '1234567890', 'a']
+    assert page_starts(keys, 1) == ['9', '10', '1234567890', 'HC10', 'HC2', 'a']
+    assert page_starts(keys, 4) == ['9', 'HC2']
+
+
+def test_every_page_is_loaded_once():
+    # Integer-like and string keys mixed, so a page boundary falls between them
+    appointments = {key: {'id': key} for key in [str(n) for n in range(1, 40)] + [f"HC{n}" for n in range(60)]}
+    standin = FirebaseStandIn(('127.0.0.1', 0), data={'appointments': appointments}).start()
+    progress = LoadProgress()
+    try:
+        loaded = load_appointments(FirebaseClient(standin.url), page_size=7, workers=4, progress=progress)
+    finally:
+        standin.shutdown()
+    assert loaded == appointments
+    assert (progress.pages, progress.pages_done, progress.loaded) == (15, 15, 99)
@@ -0,0 +1,120 @@
+"""AppointmentWAL replay, compaction and adoption of orphaned segments"""
+import os
+import threading
+
+from appointment_wal import AppointmentWAL, read_segment
+
+
+def booking(apt_id, created_at, **fields):
+    return dict({'id': apt_id, 'doctor': 'Dr. A', 'time': '09:00', 'status': 'confirmed',
+                 'created_at': created_at}, **fields)
+
+
+def replayed(wal):
+    return {data['id']: (sender, data, unsent) for sender, data, unsent in wal.replay()}
+
+
+def test_replay_restores_mutations_and_unsent_writes(tmp_path):
+    wal = AppointmentWAL(str(tmp_path))
+    first = wal.append('create', 'HC1', 'alice', booking('HC1', '2025-01-01T09:00'))
+    wal.append('create', 'HC2', 'bob', booking('HC2', '2025-01-01T10:00'))
+    rescheduled = wal.append('reschedule', 'HC2', data={'time': '14:00'})
+    wal.mark_sent([('HC1', first)])
+    wal.close()
+
+    reopened = AppointmentWAL(str(tmp_path))
+    entries = replayed(reopened)
+    assert entries['HC1'] == ('alice', booking('HC1', '2025-01-01T09:00'), None)
+    assert entries['HC2'] == ('bob', booking('HC2', '2025-01-01T10:00', time='14:00'), rescheduled)
+    assert reopened.append('cancel', 'HC1') > rescheduled
+    reopened.close()
+
+
+def test_compaction_drops_cancellations_firebase_has(tmp_path):
+    wal = AppointmentWAL(str(tmp_path))
+    wal.append('create', 'HC1', 'alice', booking('HC1', '2025-01-01T09:00'))
+    cancelled = wal.append('cancel', 'HC1')
+    wal.append('create', 'HC2', 'bob', booking('HC2', '2025-01-01T10:00'))
+    unsent_cancel = wal.append('cancel', 'HC2')
+    wal.mark_sent([('HC1', cancelled)])
+    wal.close()
+
+    reopened = AppointmentWAL(str(tmp_path))
+    entries, _ = read_segment(reopened.path)
+    assert set(entries) == {'HC2'}
+    with open(reopened.path, 'rb') as f:
+        assert len(f.readlines()) == 1
+    assert replayed(reopened)['HC2'][2] == unsent_cancel
+    reopened.close()
+
+
+def test_torn_last_record_is_dropped(tmp_path):
+    wal = AppointmentWAL(str(tmp_path))
+    wal.append('create', 'HC1', 'alice', booking('HC1', '2025-01-01T09:00'))
+    wal.close()
+    with open(wal.path, 'ab') as f:
+        f.write(b'{"seq":2,"op":"cre')
+
+    reopened = AppointmentWAL(str(tmp_path))
+    assert list(replayed(reopened)) == ['HC1']
+    reopened.close()
+
+
+def test_concurrent_appends_share_syncs(tmp_path):
+    wal = AppointmentWAL(str(tmp_path))
+    seqs = []
+
+    def book(worker):
+        for n in range(50):
+            apt_id = f"HC{worker}-{n}"
+            seqs.append(wal.append('create', apt_id, 'alice', booking(apt_id, f"{worker:02d}{n:03d}")))
+
+    threads = [threading.Thread(target=book, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = wal.snapshot_stats()
+    wal.close()
+    assert sorted(seqs) == list(range(1, 401))
+    assert stats['appends'] == 400 and stats['syncs'] <= 400
+    assert len(read_segment(wal.path)[0]) == 400
+
+
+def test_orphaned_segment_is_adopted(tmp_path):
+    first = AppointmentWAL(str(tmp_path))
+    second = AppointmentWAL(str(tmp_path))
+    assert (first.index, second.index) == (0, 1)
+    first.append('create', 'HC1', 'alice', booking('HC1', '2025-01-01T09:00'))
+    sent = second.append('create', 'HC2', 'bob', booking('HC2', '2025-01-01T10:00'))
+    second.append('create', 'HC3', 'carol', booking('HC3', '2025-01-01T11:00'))
+    second.mark_sent([('HC2', sent)])
+    first.close()
+    second.close()
+
+    # One worker after scaling down: it claims segment 0 and merges segment 1
+    survivor = AppointmentWAL(str(tmp_path))
+    assert survivor.index == 0
+    assert not os.path.exists(second.path)
+    assert survivor.snapshot_stats()['adopted'] == 2
+    entries = replayed(survivor)
+    assert entries['HC2'][2] is None
+    assert entries['HC3'][2] is not None
+    assert entries['HC3'][2] != entries['HC1'][2]
+    survivor.close()
+
+    # The merged entries survive another restart
+    restarted = AppointmentWAL(str(tmp_path))
+    assert set(replayed(restarted)) == {'HC1', 'HC2', 'HC3'}
+    restarted.close()
+
+
+def test_live_workers_segment_is_left_alone(tmp_path):
+    live = AppointmentWAL(str(tmp_path))
+    live.append('create', 'HC1', 'alice', booking('HC1', '2025-01-01T09:00'))
+    other = AppointmentWAL(str(tmp_path))
+    assert other.index == 1
+    assert other.snapshot_stats()['adopted'] == 0
+    assert os.path.exists(live.path)
+    other.close()
+    live.close()
@@ -0,0 +1,70 @@
+"""Confirmation numbers: unique, ordered by time, and node numbers that can't collide"""
+import threading
+
+import pytest
+
+from confirmation_ids import MAX_HOST, MAX_SEQUENCE, MAX_WORKER, ConfirmationIds, default_node, parse
+
+
+def test_ids_from_one_generator_are_unique_and_sorted():
+    generator = ConfirmationIds(node=5)
+    ids = [generator.next_id() for _ in range(20000)] + generator.next_ids(5000)
+    assert len(set(ids)) == len(ids)
+    # Fixed width and time first, so text order is generation order
+    assert ids == sorted(ids)
+    assert all(len(confirmation) == 14 and parse(confirmation)[1] == 5 for confirmation in ids)
+
+
+def test_ids_stay_unique_across_threads():
+    generator = ConfirmationIds(node=1)
+    results = [None] * 8
+
+    def generate(n):
+        results[n] = [generator.next_id() for _ in range(10000)] + generator.next_ids(3000)
+
+    threads = [threading.Thread(target=generate, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [confirmation for batch in results for confirmation in batch]
+    assert len(set(ids)) == len(ids)
+    for batch in results:
+        assert batch == sorted(batch)
+
+
+def test_sequence_overflow_borrows_the_next_millisecond():
+    generator = ConfirmationIds()
+    ids = generator.next_ids(3 * (MAX_SEQUENCE + 1))
+    parsed = [parse(confirmation) for confirmation in ids]
+    assert parsed == sorted(parsed)
+    assert len({ms for ms, _, _ in parsed}) >= 3
+
+
+def test_nodes_keep_generators_apart():
+    first, second = ConfirmationIds(node=default_node(0)), ConfirmationIds(node=default_node(1))
+    ids = first.next_ids(2000) + second.next_ids(2000)
+    assert len(set(ids)) == len(ids)
+
+
+def test_default_node_combines_host_and_worker(monkeypatch):
+    monkeypatch.setenv('NODE_ID', '3')
+    assert default_node(0) == 3 << 4
+    assert default_node(MAX_WORKER) == 3 << 4 | MAX_WORKER
+    assert len({default_node(worker) for worker in range(MAX_WORKER + 1)}) == MAX_WORKER + 1
+    monkeypatch.setenv('NODE_ID', str(MAX_HOST + 1))
+    with pytest.raises(ValueError):
+        default_node(0)
+    monkeypatch.delenv('NODE_ID')
+    assert default_node(2) & MAX_WORKER == 2
+
+
+def test_default_node_refuses_a_worker_index_that_overflows():
+    with pytest.raises(ValueError):
+        default_node(MAX_WORKER + 1)
+
+
+def test_parse_rejects_other_text():
+    for text in ['HC123', 'XX' + 'A' * 12, 'HC' + 'U' * 12]:
+        with pytest.raises(ValueError):
+            parse(text)
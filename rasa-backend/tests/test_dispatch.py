@@ -0,0 +1,76 @@
+"""
+Button payload dispatch against the baseline server
+golden/baseline_payloads.json holds the baseline's reply to every
+registered payload, each sent as the first turn of a new conversation.
+The handler table must give the same replies, except where the baseline
+sent a payload to the wrong branch
+"""
+import json
+import os
+
+import pytest
+
+from conftest import GOLDEN_DIR
+
+with open(os.path.join(GOLDEN_DIR, 'baseline_payloads.json'), encoding='utf-8') as f:
+    BASELINE = json.load(f)
+
+# Payloads whose baseline reply came from a keyword or prefix match on the
+# payload text rather than from the payload's own branch
+REROUTED = {
+    # "headache" or "stomach" in the payload hit the generic assessment
+    '/self_care_headache', '/self_care_stomach', '/mild_headache', '/headache_diary',
+    '/severe_headache', '/stomach',
+    # "fever" hit the fever assessment, "appointment" the booking menu
+    '/high_fever', '/urgent_appointment',
+    # "/pain_1" is a prefix of "/pain_10"
+    '/pain_10',
+    # symptom words added an "I see you have ..." prompt or replaced the reply
+    '/severe_pain', '/breathing_exercises', '/mild_back_pain', '/moderate_back_pain',
+    '/nausea_vomiting', '/diarrhea', '/constipation',
+    '/other_pain', '/other_severe_pain', '/joint_pain', '/muscle_pain', '/nerve_pain',
+    # two branches answered; the table keeps the first
+    '/urgent_care', '/food_poisoning', '/when_to_see_doctor',
+    # the baseline raised on an empty appointment list and answered nothing
+    '/add_to_calendar',
+}
+
+
+def reply(bot, sender_id, payload):
+    """Responses as they are sent, so tuples and lists compare equal"""
+    return json.loads(json.dumps(bot.process_message(payload, sender_id)))
+
+
+def test_every_registered_payload_is_recorded(bot):
+    prefixed = {prefix for prefix, _ in bot.payload_prefix_handlers}
+    recorded = {payload for _, payload, _ in BASELINE}
+    assert set(bot.payload_handlers) <= recorded
+    assert all(any(payload.startswith(prefix) for payload in recorded) for prefix in prefixed)
+
+
+@pytest.mark.parametrize('sender_id, payload, expected', [
+    entry for entry in BASELINE if entry[1] not in REROUTED
+], ids=lambda value: value if isinstance(value, str) and value.startswith('/') else '')
+def test_payload_matches_baseline(bot, sender_id, payload, expected):
+    assert reply(bot, sender_id, payload) == expected
+
+
+@pytest.mark.parametrize('sender_id, payload', [
+    entry[:2] for entry in BASELINE if entry[1] in REROUTED
+], ids=lambda value: value if value.startswith('/') else '')
+def test_rerouted_payload_reaches_its_handler(make_bot, sender_id, payload):
+    direct = make_bot()
+    with direct.turn_locks.for_sender(sender_id):
+        direct.active_sessions[sender_id] = direct.sessions.load(sender_id)
+        expected = json.loads(json.dumps(direct.payload_handlers[payload](payload, sender_id)))
+    assert reply(make_bot(), sender_id, payload) == expected
+
+
+def test_unregistered_payload_falls_through_to_free_text(bot):
+    responses = reply(bot, 'parity-unknown', '/unknown_payload')
+    assert responses and responses[0]['recipient_id'] == 'parity-unknown'
+
+
+def test_prefix_payloads_without_appointments(bot):
+    assert 'No appointments' in reply(bot, 'parity-prefix', '/cancel_apt_HC0')[0]['text']
+    assert 'No appointments' in reply(bot, 'parity-prefix', '/reschedule_apt_HC0')[0]['text']
@@ -0,0 +1,67 @@
+"""FirebaseOutbox retries: logged writes are never dropped, unlogged ones give up"""
+import threading
+import time
+
+from firebase_outbox import FirebaseOutbox
+
+
+class FlakyClient:
+    """Fails every PATCH until healed"""
+
+    def __init__(self):
+        self.failing = True
+        self.patches = []
+        self.lock = threading.Lock()
+
+    def patch(self, path, updates):
+        with self.lock:
+            if self.failing:
+                raise ConnectionError("Firebase unavailable")
+            self.patches.append(updates)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def make_outbox(client, flushed):
+    return FirebaseOutbox(client, flush_interval=0.001, max_attempts=3, retry_delay=0.005,
+                          max_retry_delay=0.02, on_flushed=flushed.extend)
+
+
+def test_logged_write_is_retried_past_max_attempts():
+    client, flushed = FlakyClient(), []
+    outbox = make_outbox(client, flushed)
+    outbox.save_appointment('HC1', {'doctor': 'Dr. A'}, wal_seq=7)
+    assert wait_for(lambda: outbox.snapshot_stats()['retrying'] == 1)
+    assert outbox.snapshot_stats()['dropped'] == 0
+
+    client.failing = False
+    assert wait_for(lambda: flushed == [('HC1', 7)])
+    assert client.patches == [{'HC1': {'doctor': 'Dr. A'}}]
+    assert outbox.snapshot_stats()['queue_depth'] == 0
+    outbox.close()
+
+
+def test_unlogged_write_is_dropped_after_max_attempts():
+    client, flushed = FlakyClient(), []
+    outbox = make_outbox(client, flushed)
+    outbox.save_appointment('HC2', {'doctor': 'Dr. B'})
+    assert wait_for(lambda: outbox.snapshot_stats()['dropped'] == 1)
+    assert outbox.snapshot_stats()['queue_depth'] == 0
+    outbox.close()
+
+
+def test_close_leaves_failing_logged_writes_to_the_log():
+    client, flushed = FlakyClient(), []
+    outbox = make_outbox(client, flushed)
+    outbox.save_appointment('HC3', {'doctor': 'Dr. C'}, wal_seq=3)
+    outbox.close(timeout=5)
+    assert not outbox.thread.is_alive()
+    assert outbox.snapshot_stats()['left_in_log'] == 1
+    assert flushed == []
@@ -0,0 +1,65 @@
+"""KeywordMatcher against plain substring search"""
+import random
+import string
+
+from keyword_matcher import KeywordMatcher
+
+
+def naive_search(vocabularies, text):
+    return {
+        category: {keyword.lower() for keyword in keywords if keyword.lower() in text}
+        for category, keywords in vocabularies.items()
+    }
+
+
+def naive_first(vocabularies, category, text):
+    return next((keyword.lower() for keyword in vocabularies[category] if keyword.lower() in text), None)
+
+
+def assert_same(matcher, vocabularies, text):
+    hits = matcher.search(text)
+    expected = naive_search(vocabularies, text)
+    for category in vocabularies:
+        assert hits.keywords(category) == expected[category], (category, text)
+        assert (category in hits) == bool(expected[category])
+        assert hits.first(category) == naive_first(vocabularies, category, text)
+    assert bool(hits) == any(expected.values())
+
+
+def test_overlapping_and_nested_keywords():
+    vocabularies = {
+        'a': ['he', 'she', 'his', 'hers'],
+        'b': ['pain', 'back pain', 'chest pain', 'ache', 'headache'],
+        'c': ['she', 'a'],
+    }
+    matcher = KeywordMatcher(vocabularies)
+    for text in ['ushers', 'she has back pain and a headache', 'chest pain', 'hishershe', '', 'xyz', 'aaaa']:
+        assert_same(matcher, vocabularies, text)
+
+
+def test_random_texts_match_substring_search():
+    rng = random.Random(2)
+    alphabet = 'abcde '
+    vocabularies = {
+        f"v{index}": [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))).strip() or 'a'
+                      for _ in range(rng.randint(1, 12))]
+        for index in range(6)
+    }
+    matcher = KeywordMatcher(vocabularies)
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert_same(matcher, vocabularies, text)
+
+
+def test_bot_vocabularies_match_substring_search(bot):
+    vocabularies = {category: list(order) for category, order in bot.keyword_matcher.order.items()}
+    rng = random.Random(7)
+    keywords = [keyword for words in vocabularies.values() for keyword in words]
+    filler = ['i have', 'my', 'and', 'since yesterday', 'really', 'the', 'xx']
+    for _ in range(1000):
+        words = [rng.choice(keywords if rng.random() < 0.4 else filler) for _ in range(rng.randint(1, 8))]
+        # Glue some words together so keywords also appear inside other words
+        text = ''.join(word + rng.choice(['', ' ', ' ', ' ']) for word in words)
+        assert_same(bot.keyword_matcher, vocabularies, text)
+    for text in ['', string.punctuation, "i can't breathe", 'severe bleeding from my knee pain']:
+        assert_same(bot.keyword_matcher, vocabularies, text)
@@ -0,0 +1,65 @@
+"""POST /admin/profile parameter checks and a short profile window"""
+import json
+import threading
+import time
+
+import pytest
+
+import profiler
+from profiler import SamplingProfiler, profile_response
+
+AUTH = 'Bearer secret'
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(profiler, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(profiler, 'PROFILE_MAX_SECONDS', 60.0)
+
+
+def status(params, authorization=AUTH):
+    return profile_response(SamplingProfiler(), authorization, params)[0]
+
+
+def test_token_is_required(monkeypatch):
+    assert status({'seconds': '0.01'}, authorization=None) == 401
+    assert status({'seconds': '0.01'}, authorization='Bearer wrong') == 401
+    monkeypatch.setattr(profiler, 'ADMIN_TOKEN', '')
+    assert status({'seconds': '0.01'}) == 404
+
+
+@pytest.mark.parametrize('params', [
+    {'seconds': '0'}, {'seconds': '-5'}, {'seconds': '61'}, {'seconds': 'nan'}, {'seconds': 'inf'},
+    {'seconds': 'ten'}, {'turns': '0'}, {'turns': '-3'}, {'turns': '1.5'},
+    {'seconds': '1', 'interval_ms': '0'}, {'seconds': '1', 'interval_ms': 'nan'},
+    {'seconds': '1', 'top': '0'}, {'seconds': '1', 'format': 'svg'},
+])
+def test_out_of_range_parameters_are_rejected(params):
+    assert status(params) == 400
+
+
+def test_short_window_returns_every_format():
+    code, content_type, body = profile_response(SamplingProfiler(), AUTH, {'seconds': '0.05', 'interval_ms': '1'})
+    assert (code, content_type) == (200, 'application/json')
+    result = json.loads(body)
+    assert result['samples'] > 0 and 'memory' in result and result['pstats']
+    code, content_type, body = profile_response(SamplingProfiler(), AUTH, {'seconds': '0.02', 'format': 'collapsed', 'memory': '0'})
+    assert code == 200 and content_type.startswith('text/plain')
+
+
+def test_turns_window_ends_after_the_turns():
+    sampler = SamplingProfiler()
+
+    def serve_turns():
+        while sampler.turns_left is None:
+            time.sleep(0.001)
+        for _ in range(3):
+            sampler.turn_done()
+
+    thread = threading.Thread(target=serve_turns)
+    thread.start()
+    code, _, body = profile_response(sampler, AUTH, {'turns': '3', 'memory': '0'})
+    thread.join()
+    assert code == 200
+    result = json.loads(body)
+    assert result['turns'] == 3 and result['seconds'] < 10
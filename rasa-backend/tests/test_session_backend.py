@@ -0,0 +1,99 @@
+"""Session backends: round trip, skipped writes, expiry and sharing between workers"""
+import time
+
+import pytest
+
+from redis_standin import RedisStandIn
+from session_backend import open_backend
+
+
+@pytest.fixture(scope='module')
+def redis_url():
+    standin = RedisStandIn(('127.0.0.1', 0)).start()
+    yield standin.url
+    standin.shutdown()
+    standin.server_close()
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend_url(request, tmp_path):
+    if request.param == 'memory':
+        return 'memory://'
+    if request.param == 'sqlite':
+        return f"sqlite:///{tmp_path / 'sessions.db'}"
+    return request.getfixturevalue('redis_url')
+
+
+def open_url(url, ttl=60):
+    return open_backend(url, ttl, 1000)
+
+
+def test_round_trip(backend_url):
+    backend = open_url(backend_url)
+    session = backend.load('alice')
+    assert session.loaded is None and session.state is None
+    session.state = 'waiting_for_name'
+    session.temp = {'date': '2025-03-01', 'time': '9:00 AM'}
+    session.dialogue = 'story:headache:2'
+    session.reschedule_id = 'HC1'
+    backend.save(session)
+
+    again = backend.load('alice')
+    assert (again.state, again.temp, again.dialogue, again.reschedule_id) == (
+        'waiting_for_name', {'date': '2025-03-01', 'time': '9:00 AM'}, 'story:headache:2', 'HC1')
+    backend.save(again)
+    again.state = again.temp = again.reschedule_id = None
+    again.dialogue = backend.load('bob').dialogue
+    backend.save(again)
+    assert backend.load('alice').loaded is None
+
+    stats = backend.snapshot_stats()
+    assert (stats['writes'], stats['unchanged'], stats['deletes']) == (1, 1, 1)
+    assert (stats['hits'], stats['misses']) == (1, 3)
+    backend.close()
+
+
+def test_shared_backends_see_each_others_writes(backend_url):
+    if backend_url == 'memory://':
+        pytest.skip("memory sessions belong to one worker")
+    first, second = open_url(backend_url), open_url(backend_url)
+    session = first.load('carol')
+    session.state = 'waiting_for_phone'
+    first.save(session)
+    # The save has been acknowledged, so the other worker's very next read sees it
+    assert second.load('carol').state == 'waiting_for_phone'
+    first.close()
+    second.close()
+
+
+def test_sessions_expire(backend_url):
+    # Redis expiry is in whole seconds
+    ttl = 1 if backend_url.startswith('redis') else 0.2
+    backend = open_url(backend_url, ttl=ttl)
+    session = backend.load('dave')
+    session.state = 'waiting_for_name'
+    backend.save(session)
+    assert backend.load('dave').state == 'waiting_for_name'
+    time.sleep(ttl + 0.2)
+    assert backend.load('dave').state is None
+    backend.close()
+
+
+
+@pytest.mark.parametrize('url', [
+    'postgres://localhost/sessions', 'sqlite://', 'sqlite:///', 'sqlite://host/sessions.db',
+    'sqlite:///sessions.db?mode=ro', 'sessions.db', 'memory://elsewhere',
+])
+def test_unusable_urls_are_rejected(url):
+    with pytest.raises(ValueError):
+        open_url(url)
+
+
+def test_sqlite_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    relative = open_url('sqlite:///data%20dir.db')
+    assert relative.path == 'data dir.db' and (tmp_path / 'data dir.db').exists()
+    absolute = open_url(f"sqlite:///{tmp_path / 'absolute.db'}")
+    assert absolute.path == str(tmp_path / 'absolute.db')
+    relative.close()
+    absolute.close()
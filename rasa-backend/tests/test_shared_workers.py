@@ -0,0 +1,116 @@
+"""
+Two workers sharing a session backend
+Each bot stands for a worker process: its own log segment, turn locks and
+caches, with sessions, appointments and booked slots in the shared
+backend, so a sender's turns can land on either worker
+"""
+import re
+import threading
+
+import pytest
+
+from redis_standin import RedisStandIn
+
+
+@pytest.fixture(scope='module')
+def redis_url():
+    standin = RedisStandIn(('127.0.0.1', 0)).start()
+    yield standin.url
+    standin.shutdown()
+    standin.server_close()
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def workers(request, make_bot, tmp_path, monkeypatch):
+    import rasa_server
+    if request.param == 'sqlite':
+        url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    else:
+        url = request.getfixturevalue('redis_url')
+        # Each test starts from an empty database
+        request.addfinalizer(lambda: rasa_server.open_backend(url, 60, 10)._call('FLUSHDB'))
+    monkeypatch.setattr(rasa_server, 'SESSION_BACKEND', url)
+    wal_dir = str(tmp_path / 'wal')
+    return make_bot(wal_dir), make_bot(wal_dir)
+
+
+def text(bot, sender_id, message):
+    return '\n'.join(response.get('text', '') for response in bot.process_message(message, sender_id))
+
+
+def book(workers, sender_id, booking='/book_tomorrow_9am', department='/select_Cardiology'):
+    """Run a booking with its turns alternating between the workers; the last reply"""
+    messages = [booking, 'Ann', 'Lee', '0711', department]
+    for turn, message in enumerate(messages):
+        reply = text(workers[turn % 2], sender_id, message)
+    return reply
+
+
+def confirmation(reply):
+    return re.search(r'Confirmation: (HC[0-9A-Z]+)', reply).group(1)
+
+
+def test_booking_is_seen_and_cancelled_on_the_other_worker(workers):
+    first, second = workers
+    apt_id = confirmation(book(workers, 'ann'))
+    assert first.wal.index != second.wal.index
+
+    assert apt_id in text(second, 'ann', '/view_appointments')
+    assert 'APPOINTMENT CANCELLED' in text(second, 'ann', f"/cancel_apt_{apt_id}")
+    assert 'No appointments scheduled' in text(first, 'ann', '/view_appointments')
+    # The slot went back, so another patient can take it
+    assert 'Confirmation:' in book(workers, 'bob')
+
+
+def test_reschedule_started_on_one_worker_finishes_on_the_other(workers):
+    first, second = workers
+    apt_id = confirmation(book(workers, 'ann'))
+    assert 'Select new time' in text(first, 'ann', f"/reschedule_apt_{apt_id}")
+    assert 'New time: Tomorrow at 2:00 PM' in text(second, 'ann', '/reschedule_tomorrow_2pm')
+    assert 'Tomorrow' in text(first, 'ann', '/view_appointments')
+    assert '2:00 PM' in text(first, 'ann', '/view_appointments')
+
+
+def test_no_double_booking_across_workers(workers):
+    # Cardiology has two doctors, so the third booking of the slot is refused
+    replies = [book(workers, sender_id) for sender_id in ('ann', 'bob', 'cid')]
+    assert [('Confirmation:' in reply) for reply in replies] == [True, True, False]
+    assert 'SLOT UNAVAILABLE' in replies[2]
+
+
+def test_racing_bookings_on_both_workers_get_one_doctor_each(workers):
+    first, second = workers
+    senders = [f"patient-{n}" for n in range(12)]
+    for n, sender_id in enumerate(senders):
+        for turn, message in enumerate(['/book_today_430pm', 'Ann', 'Lee', '0711']):
+            text(workers[(n + turn) % 2], sender_id, message)
+
+    barrier = threading.Barrier(len(senders))
+    replies = {}
+
+    def confirm(n, sender_id):
+        barrier.wait()
+        replies[sender_id] = text(workers[n % 2], sender_id, '/select_Neurology')
+
+    threads = [threading.Thread(target=confirm, args=(n, sender_id)) for n, sender_id in enumerate(senders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    booked = [reply for reply in replies.values() if 'Confirmation:' in reply]
+    doctors = [re.search(r'Doctor: (Dr\. [A-Za-z]+ [A-Za-z]+)', reply).group(1) for reply in booked]
+    assert len(booked) == 2 and len(set(doctors)) == 2
+    for bot in (first, second):
+        bot.metrics.flush()
+
+
+def test_restarted_worker_keeps_shared_records(workers, make_bot, tmp_path):
+    first, second = workers
+    apt_id = confirmation(book(workers, 'ann'))
+    text(second, 'ann', f"/cancel_apt_{apt_id}")
+    # A worker whose log still has the booking starts later: the shared
+    # record, written by the cancelling turn, wins
+    restarted = make_bot(first.wal.directory)
+    restarted.restore_appointments([('ann', {'id': apt_id, 'date': 'Tomorrow', 'time': '9:00 AM',
+                                             'doctor': 'Dr. Sarah Johnson', 'created_at': '2025-01-01T09:00'})])
+    assert 'No appointments scheduled' in text(restarted, 'ann', '/view_appointments')
@@ -0,0 +1,105 @@
+"""SlotInventory: one booking per doctor and slot, even when threads race"""
+import datetime
+import threading
+
+from session_backend import open_backend
+from slot_inventory import SlotInventory, slot_of
+
+DAY = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+
+
+def race(count, target):
+    """Run target(n) on count threads released together; results by n"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(n):
+        barrier.wait()
+        results[n] = target(n)
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_slot_of_parses_both_time_formats():
+    assert slot_of('9:00 AM') == slot_of('09:00') == 36
+    assert slot_of('4:30 PM') == slot_of('16:30') == 66
+    assert slot_of('4:44 pm') == 66
+    assert slot_of('16:30', slot_minutes=30) == 33
+    assert slot_of('noon') is None and slot_of(None) is None
+
+
+def test_one_of_many_racing_bookings_gets_the_slot():
+    slots = SlotInventory()
+    results = race(32, lambda n: slots.reserve('Dr. A', DAY, 36))
+    assert results.count(True) == 1
+    assert not slots.is_free('Dr. A', DAY, 36)
+    assert slots.is_free('Dr. A', DAY, 37) and slots.is_free('Dr. B', DAY, 36)
+    assert slots.snapshot_stats()['conflicts'] == 31
+
+
+def test_force_books_a_taken_slot():
+    slots = SlotInventory()
+    assert slots.reserve('Dr. A', DAY, 36)
+    assert slots.reserve('Dr. A', DAY, 36, force=True)
+    assert slots.snapshot_stats()['booked'] == 1
+
+
+def test_department_bookings_take_each_doctor_once():
+    slots = SlotInventory()
+    doctors = ['Dr. A', 'Dr. B', 'Dr. C', 'Dr. D']
+    results = race(16, lambda n: slots.reserve_any(doctors, DAY, 40))
+    booked = [doctor for doctor in results if doctor]
+    assert sorted(booked) == doctors
+    assert not slots.has_free_doctor(doctors, DAY, 40)
+    slots.release('Dr. C', DAY, 40)
+    assert slots.has_free_doctor(doctors, DAY, 40)
+    assert slots.reserve_any(doctors, DAY, 40) == 'Dr. C'
+
+
+def test_reserve_and_release_under_threads_leave_nothing_booked():
+    slots = SlotInventory()
+
+    def churn(n):
+        doctor = f"Dr. {n % 3}"
+        held = 0
+        for _ in range(300):
+            for slot in range(n % 4, 96, 4):
+                if slots.reserve(doctor, DAY, slot):
+                    held += 1
+                    slots.release(doctor, DAY, slot)
+        return held
+
+    held = race(12, churn)
+    stats = slots.snapshot_stats()
+    assert stats['booked'] == 0 and stats['days'] == 0
+    assert stats['reserved'] == stats['released'] == sum(held)
+
+
+def test_past_days_are_pruned():
+    slots = SlotInventory()
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    slots.reserve('Dr. A', yesterday, 36)
+    slots.pruned_on = None
+    slots.reserve('Dr. A', DAY, 36)
+    assert slots.is_free('Dr. A', yesterday, 36)
+    assert slots.snapshot_stats()['days'] == 1
+
+
+def test_shared_inventory_gives_a_slot_to_one_of_many_workers(tmp_path):
+    # Each backend stands for a worker process with its own connections
+    url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    inventories = [open_backend(url, 60, 10).slot_inventory(15) for _ in range(4)]
+    results = race(16, lambda n: inventories[n % 4].reserve('Dr. A', DAY, 36))
+    assert results.count(True) == 1
+    assert not inventories[0].is_free('Dr. A', DAY, 36)
+
+    doctors = ['Dr. B', 'Dr. C']
+    booked = race(8, lambda n: inventories[n % 4].reserve_any(doctors, DAY, 40))
+    assert sorted(doctor for doctor in booked if doctor) == doctors
+    inventories[1].release('Dr. B', DAY, 40)
+    assert inventories[2].reserve_any(doctors, DAY, 40) == 'Dr. B'
@@ -0,0 +1,93 @@
+"""
+A recorded multi-turn transcript replayed through both servers
+golden/webhook_transcript.json holds 49 turns from five senders - triage,
+booking, viewing, rescheduling and cancelling - and one batch request.
+Confirmation numbers are recorded as ID0, ID1, ... in order of first
+appearance and doctors as DR, since both vary between runs
+"""
+import asyncio
+import json
+import os
+import re
+
+import pytest
+
+from conftest import GOLDEN_DIR, RecordingOutbox
+
+WEBHOOK = '/webhooks/rest/webhook'
+
+with open(os.path.join(GOLDEN_DIR, 'webhook_transcript.json'), encoding='utf-8') as f:
+    TRANSCRIPT = json.load(f)
+
+
+class Transcript:
+    """Swaps confirmation numbers for placeholders and back"""
+
+    def __init__(self):
+        self.ids = []
+
+    def message(self, text):
+        for index, apt_id in enumerate(self.ids):
+            text = text.replace(f"ID{index}", apt_id)
+        return text
+
+    def body(self, body):
+        for apt_id in re.findall(r'Confirmation: (HC[0-9A-Z]+)', body):
+            if apt_id not in self.ids:
+                self.ids.append(apt_id)
+        for index, apt_id in enumerate(self.ids):
+            body = body.replace(apt_id, f"ID{index}")
+        return json.loads(re.sub(r'Dr\. [A-Z][a-z]+ [A-Z][a-z]+', 'DR', body))
+
+
+def replay(post):
+    """Send every turn and the batch through post(path, payload) -> (status, body text)"""
+    transcript = Transcript()
+    for sender_id, message, status, body in TRANSCRIPT['turns']:
+        got_status, got_body = post(WEBHOOK, {'sender': sender_id, 'message': transcript.message(message)})
+        assert (got_status, transcript.body(got_body)) == (status, json.loads(body)), (sender_id, message)
+    batch = TRANSCRIPT['batch']
+    got_status, got_body = post(WEBHOOK + '/batch', batch['request'])
+    assert (got_status, json.loads(got_body)) == (batch['status'], json.loads(batch['body']))
+
+
+def test_flask_replays_transcript(monkeypatch, tmp_path):
+    import rasa_server
+    monkeypatch.setattr(rasa_server, 'APPOINTMENT_WAL_DIR', str(tmp_path))
+    app = rasa_server.create_app(firebase=RecordingOutbox())
+    assert rasa_server.bot.ready.wait(30)
+    app.testing = True
+    client = app.test_client()
+
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        return response.status_code, response.get_data(as_text=True)
+
+    replay(post)
+    rasa_server.bot.wal.close()
+
+
+@pytest.fixture(scope='module')
+def asgi_app():
+    import asgi_server
+    assert asgi_server.bot.ready.wait(30)
+    return asgi_server.app
+
+
+def asgi_post(app, path, payload):
+    """One POST through the ASGI app, without a server"""
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'headers': [], 'query_string': b''}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': json.dumps(payload).encode(), 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]['status'], sent[1]['body'].decode()
+
+
+def test_asgi_replays_transcript(asgi_app):
+    replay(lambda path, payload: asgi_post(asgi_app, path, payload))